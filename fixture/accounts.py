@@ -0,0 +1,36 @@
+"""
+Canonical forms of the identifiers people log in with. Phone numbers are
+stored the way normalize_phone() writes them, so a lookup is one equality
+on the unique index; emails keep their case and are matched through a
+unique index on LOWER(email).
+"""
+import re
+
+COUNTRY_CODE = '91'
+# What people type between digits: spaces, dashes, dots, brackets and a leading +.
+PHONE_SEPARATORS = re.compile(r'[\s\-().+]')
+# E.164 allows at most 15 digits; anything much shorter is not a phone number.
+MIN_PHONE_DIGITS, MAX_PHONE_DIGITS = 7, 15
+
+
+def normalize_phone(value):
+    """
+    The canonical form of a phone number, or None if `value` is not one.
+    Separators go, and an Indian mobile number loses its +91 or trunk 0, so
+    '+91 98450-12345', '098450 12345' and '9845012345' are all '9845012345'.
+    """
+    if not value:
+        return None
+    digits = PHONE_SEPARATORS.sub('', value)
+    if not digits.isdigit() or not MIN_PHONE_DIGITS <= len(digits) <= MAX_PHONE_DIGITS:
+        return None
+    if len(digits) == 12 and digits.startswith(COUNTRY_CODE):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+
+def normalize_email(value):
+    """The form emails are compared in: lowercased, surrounding blanks dropped."""
+    return (value or '').strip().lower()
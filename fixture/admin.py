@@ -2,9 +2,22 @@ from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 from .models import (
     User, UserProfile, Category, Service, ServiceProfessional,
-    ProfessionalDocuments, Booking, JobTracking, Payment, Invoice,
+    ProfessionalDocuments, Booking, BookingQuerySet, JobTracking, Payment, Invoice, InvoiceLineItem,
     Review, Complaint, Notification
 )
+from .fulltext import matching
+
+
+class FullTextSearchMixin:
+    """Admin search through the FTS index instead of LIKE scans; falls back to search_fields."""
+    fulltext_kind = None
+
+    def get_search_results(self, request, queryset, search_term):
+        matches = matching(self.fulltext_kind, search_term) if search_term else None
+        if matches is None:
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(pk__in=matches), False
+
 
 class CustomUserAdmin(UserAdmin):
     list_display = ('username', 'email', 'role', 'is_verified', 'is_staff')
@@ -20,19 +33,24 @@ class UserProfileAdmin(admin.ModelAdmin):
     list_display = ('user', 'full_name', 'latitude', 'longitude')
 
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'description')
+    search_fields = ('name', 'description')
+    fulltext_kind = 'category'
 
 @admin.register(Service)
-class ServiceAdmin(admin.ModelAdmin):
+class ServiceAdmin(FullTextSearchMixin, admin.ModelAdmin):
     list_display = ('name', 'category', 'base_price', 'duration')
     list_filter = ('category',)
+    search_fields = ('name', 'description')
+    fulltext_kind = 'service'
 
 @admin.register(ServiceProfessional)
-class ServiceProfessionalAdmin(admin.ModelAdmin):
-    list_display = ('user', 'category', 'experience_years', 'safety_score', 'availability_status', 'is_verified')
+class ServiceProfessionalAdmin(FullTextSearchMixin, admin.ModelAdmin):
+    list_display = ('user', 'category', 'experience_years', 'rating', 'safety_score', 'availability_status', 'is_verified')
     list_filter = ('category', 'is_verified', 'availability_status')
     search_fields = ('user__username', 'bio')
+    fulltext_kind = 'professional'
 
 @admin.register(ProfessionalDocuments)
 class ProfessionalDocumentsAdmin(admin.ModelAdmin):
@@ -44,6 +62,7 @@ class BookingAdmin(admin.ModelAdmin):
     list_display = ('id', 'customer', 'professional', 'service', 'booking_date', 'status')
     list_filter = ('status', 'booking_date')
     search_fields = ('customer__username', 'professional__user__username')
+    list_select_related = BookingQuerySet.LIST_RELATED
 
 @admin.register(JobTracking)
 class JobTrackingAdmin(admin.ModelAdmin):
@@ -54,9 +73,15 @@ class PaymentAdmin(admin.ModelAdmin):
     list_display = ('booking', 'amount', 'payment_method', 'payment_status', 'paid_at')
     list_filter = ('payment_method', 'payment_status')
 
+class InvoiceLineItemInline(admin.TabularInline):
+    model = InvoiceLineItem
+    extra = 0
+
 @admin.register(Invoice)
 class InvoiceAdmin(admin.ModelAdmin):
-    list_display = ('invoice_number', 'booking', 'total_amount', 'generated_at')
+    list_display = ('invoice_number', 'booking', 'subtotal', 'tax_amount', 'total_amount', 'generated_at')
+    list_filter = ('period',)
+    inlines = (InvoiceLineItemInline,)
 
 @admin.register(Review)
 class ReviewAdmin(admin.ModelAdmin):
@@ -0,0 +1,120 @@
+from datetime import datetime, time, timedelta
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import SlotReservation
+
+# Bookable windows offered by BookingForm, as (start, end) minutes past midnight.
+TIME_SLOTS = {
+    'Morning': (8 * 60, 12 * 60),
+    'Afternoon': (12 * 60, 16 * 60),
+    'Evening': (16 * 60, 20 * 60),
+}
+# Calendar granularity. A booking holds every unit its service duration spans.
+SLOT_MINUTES = 30
+RESERVE_ATTEMPTS = 3
+
+
+class SlotUnavailable(Exception):
+    pass
+
+
+class SlotContended(SlotUnavailable):
+    """Every attempt lost its race for free units: the window was not full, just busy."""
+
+
+def units_needed(service):
+    duration = service.duration if service and service.duration else SLOT_MINUTES
+    return -(-duration // SLOT_MINUTES)
+
+
+def window_units(time_slot):
+    start, end = TIME_SLOTS[time_slot]
+    return list(range(start, end, SLOT_MINUTES))
+
+
+def reserved_units(professional_id, date):
+    return set(
+        SlotReservation.objects.filter(professional_id=professional_id, date=date).values_list('start_minute', flat=True)
+    )
+
+
+def first_free_run(units, taken, length):
+    """Start index of the first `length` consecutive units not in `taken`, else None."""
+    run = 0
+    for i, unit in enumerate(units):
+        run = 0 if unit in taken else run + 1
+        if run == length:
+            return i - length + 1
+    return None
+
+
+def slot_calendar(professional, date, service=None):
+    """Map each window to the number of `service`-sized jobs still free on `date`."""
+    taken = reserved_units(professional.id, date)
+    length = units_needed(service)
+    calendar = {}
+    for name in TIME_SLOTS:
+        units = window_units(name)
+        free, run = 0, 0
+        for unit in units:
+            run = 0 if unit in taken else run + 1
+            if run == length:
+                free += 1
+                run = 0
+        calendar[name] = free
+    return calendar
+
+
+def reserve_slot(booking):
+    """
+    Claim consecutive calendar units for `booking` in its professional's chosen
+    window and pin `booking_date` to the start time. The unique constraint on
+    (professional, date, start_minute) arbitrates races: a losing insert raises
+    IntegrityError, the savepoint rolls back and the next free run is tried.
+    Raises SlotUnavailable when the window has no room left, and SlotContended
+    when there was room but RESERVE_ATTEMPTS inserts in a row lost their race.
+    """
+    if booking.time_slot not in TIME_SLOTS:
+        raise SlotUnavailable(f"Unknown time slot {booking.time_slot!r}.")
+    date = timezone.localtime(booking.booking_date).date() if timezone.is_aware(booking.booking_date) else booking.booking_date.date()
+    units = window_units(booking.time_slot)
+    length = units_needed(booking.service)
+    if length > len(units):
+        raise SlotUnavailable("This service is longer than the selected time slot.")
+
+    for _ in range(RESERVE_ATTEMPTS):
+        start = first_free_run(units, reserved_units(booking.professional_id, date), length)
+        if start is None:
+            break
+        claimed = units[start:start + length]
+        try:
+            with transaction.atomic():
+                SlotReservation.objects.bulk_create([
+                    SlotReservation(professional_id=booking.professional_id, date=date, start_minute=unit, booking=booking)
+                    for unit in claimed
+                ])
+        except IntegrityError:
+            continue
+        start_at = datetime.combine(date, time()) + timedelta(minutes=claimed[0])
+        booking.booking_date = timezone.make_aware(start_at) if timezone.is_aware(booking.booking_date) else start_at
+        booking.save(update_fields=['booking_date'])
+        return claimed
+    else:
+        raise SlotContended(
+            f"The {booking.time_slot} slot on {date:%b %d, %Y} is being booked by others right now; please try again."
+        )
+    raise SlotUnavailable(f"The {booking.time_slot} slot is fully booked on {date:%b %d, %Y}.")
+
+
+def book_slot(booking):
+    """Save a new booking and reserve its calendar units in one transaction."""
+    with transaction.atomic():
+        booking.save()
+        reserve_slot(booking)
+    return booking
+
+
+def release_slot(booking):
+    SlotReservation.objects.filter(booking=booking).delete()
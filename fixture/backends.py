@@ -0,0 +1,60 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+from .accounts import normalize_email, normalize_phone
+
+
+def with_email(email):
+    """
+    Users whose email matches `email` in any case. The lookup repeats the
+    condition of the unique_user_email index word for word, which is what lets
+    SQLite answer it from that partial index instead of scanning every user.
+    """
+    return get_user_model()._default_manager.alias(email_lower=Lower('email')).filter(
+        ~Q(email=''), email_lower=normalize_email(email),
+    )
+
+
+def with_phone(phone):
+    """Users whose phone number is `phone` in any of the forms normalize_phone() accepts."""
+    return get_user_model()._default_manager.filter(phone_number=normalize_phone(phone))
+
+
+def find_user(identifier):
+    """
+    The user `identifier` names, as username, email or phone number, in one
+    query that reads at most two indexes. A username wins if it also happens
+    to be someone else's email or phone. Returns None when nobody matches.
+    """
+    User = get_user_model()
+    query = Q(username=identifier)
+    if '@' in identifier:
+        query |= ~Q(email='') & Q(email_lower=normalize_email(identifier))
+    elif phone := normalize_phone(identifier):
+        query |= Q(phone_number=phone)
+    users = list(User._default_manager.alias(email_lower=Lower('email')).filter(query)[:2])
+    return min(users, key=lambda user: user.username != identifier, default=None)
+
+
+class IdentifierBackend(ModelBackend):
+    """
+    ModelBackend that accepts an email or phone number wherever a username
+    goes. A miss still hashes the password once, as a wrong password would,
+    so response times do not tell which identifiers have accounts.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        User = get_user_model()
+        if username is None:
+            username = kwargs.get(User.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        user = find_user(username)
+        if user is None:
+            User().set_password(password)
+            return None
+        if user.check_password(password) and self.user_can_authenticate(user):
+            return user
+        return None
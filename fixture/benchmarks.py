@@ -0,0 +1,265 @@
+"""
+Route benchmarks: drive every page of fixture.urls over seeded data, in process
+through the test client or over HTTP against a threaded WSGI server, and
+compare the numbers with a saved JSON baseline. bench_routes is the front end.
+"""
+import http.client
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.servers.basehttp import ThreadedWSGIServer, WSGIRequestHandler
+from django.db import connection
+from django.test import Client
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+from django.utils import timezone
+
+from .instrumentation import metrics, percentile
+from .models import Booking, Category, Service, User
+
+# URL names left out, with the reason; every other name in fixture.urls is benchmarked.
+EXCLUDED = {
+    'logout': "ends the session the other routes run under",
+    'update_booking_status': "moves bookings through one-way states",
+    'tracking_events': "an open-ended stream; bench_sse measures it",
+    'admin_management': "unreachable: home.urls routes admin/ to the Django admin first",
+}
+# A p95 this much above the baseline's, and at least MIN_REGRESSION_MS slower, is a regression.
+DEFAULT_TOLERANCE = 0.25
+MIN_REGRESSION_MS = 2.0
+
+
+@contextmanager
+def scratch_database():
+    """
+    A migrated throwaway database, MEDIA_ROOT and PRIVATE_MEDIA_ROOT for the duration, with the
+    same isolation as the test runner, but in a file so server threads share
+    it. Yields the temporary directory both live in.
+    """
+    workdir = tempfile.TemporaryDirectory(prefix='bench-')
+    connection.settings_dict.setdefault('TEST', {})['NAME'] = str(Path(workdir.name) / 'bench.sqlite3')
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(MEDIA_ROOT=workdir.name, PRIVATE_MEDIA_ROOT=workdir.name):
+            yield Path(workdir.name)
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        workdir.cleanup()
+
+
+def benchmark_fixture():
+    """Users and objects the routes point at, picked from the seeded data."""
+    booking = (
+        Booking.objects.filter(status='COMPLETED', review__isnull=True, invoice__isnull=False)
+        .select_related('professional__user').order_by('pk').first()
+    )
+    staff, _ = User.objects.get_or_create(username='bench-staff', defaults={'is_staff': True})
+    return {
+        'booking': booking,
+        'customer': booking.customer,
+        'professional': booking.professional.user,
+        'staff': staff,
+        'category': Category.objects.order_by('pk').first(),
+        'service': Service.objects.order_by('pk').first(),
+    }
+
+
+def this_month():
+    now = timezone.localtime()
+    return now.year, now.month
+
+
+# (url name, role, path builder) for every benchmarked route; role None means
+# anonymous, and builders take the dict from benchmark_fixture().
+ROUTES = (
+    ('index', None, lambda f: reverse('index')),
+    ('home', None, lambda f: reverse('home')),
+    ('register', None, lambda f: reverse('register')),
+    ('login', None, lambda f: reverse('login')),
+    ('category_professionals', None, lambda f: reverse('category_professionals', args=[f['category'].pk])),
+    ('service_professionals', None, lambda f: reverse('service_professionals', args=[f['service'].pk])),
+    ('update_customer_profile', 'customer', lambda f: reverse('update_customer_profile')),
+    ('book_professional', 'customer', lambda f: reverse('book_professional', args=[f['booking'].professional_id])),
+    ('customer_bookings', 'customer', lambda f: reverse('customer_bookings')),
+    ('view_invoice', 'customer', lambda f: reverse('view_invoice', args=[f['booking'].pk])),
+    ('invoice_pdf', 'customer', lambda f: reverse('invoice_pdf', args=[f['booking'].pk])),
+    ('submit_review', 'customer', lambda f: reverse('submit_review', args=[f['booking'].pk])),
+    ('submit_complaint', 'customer', lambda f: reverse('submit_complaint', args=[f['booking'].pk])),
+    ('notifications', 'customer', lambda f: reverse('notifications')),
+    ('track_job', 'customer', lambda f: reverse('track_job', args=[f['booking'].pk])),
+    ('tracking_points', 'customer', lambda f: reverse('tracking_points', args=[f['booking'].pk])),
+    ('search_services', 'customer', lambda f: reverse('search_services') + f"?category={f['category'].pk}"),
+    ('text_search', 'customer', lambda f: reverse('text_search') + '?q=repair'),
+    ('process_payment', 'customer', lambda f: reverse('process_payment', args=[f['booking'].pk])),
+    ('job_details', 'customer', lambda f: reverse('job_details', args=[f['booking'].pk])),
+    ('profile_view', 'customer', lambda f: reverse('profile_view')),
+    ('update_profile', 'professional', lambda f: reverse('update_profile')),
+    ('dashboard', 'professional', lambda f: reverse('dashboard')),
+    ('professional_bookings', 'professional', lambda f: reverse('professional_bookings')),
+    ('upload_documents', 'professional', lambda f: reverse('upload_documents')),
+    ('list_service', 'professional', lambda f: reverse('list_service')),
+    ('update_job', 'professional', lambda f: reverse('update_job', args=[f['booking'].pk])),
+    ('request_metrics', 'staff', lambda f: reverse('request_metrics')),
+    ('export_invoices', 'staff', lambda f: reverse('export_invoices', args=[*this_month()])),
+)
+
+
+def routes(fixture):
+    return [(name, role, build(fixture)) for name, role, build in ROUTES]
+
+
+def uncovered():
+    """Named routes of fixture.urls that are neither benchmarked nor excluded."""
+    from . import urls
+
+    names = {pattern.name for pattern in urls.urlpatterns if pattern.name}
+    return names - EXCLUDED.keys() - {name for name, _, _ in ROUTES}
+
+
+def clients(fixture):
+    """A logged-in test client per role, plus an anonymous one."""
+    result = {None: Client()}
+    for role in ('customer', 'professional', 'staff'):
+        result[role] = Client()
+        result[role].force_login(fixture[role])
+    return result
+
+
+def summarise(name, timings, statuses, elapsed):
+    timings = sorted(timings)
+    queries = {row['view']: row for row in metrics.snapshot()}.get(name, {})
+    return {
+        'route': name,
+        'requests': len(timings),
+        'errors': sum(1 for status in statuses if status >= 400),
+        'rps': round(len(timings) / elapsed, 1) if elapsed else None,
+        'p50_ms': round(percentile(timings, 0.5) * 1000, 2),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(timings, 0.99) * 1000, 2),
+        'queries': round(queries.get('mean_queries', 0), 2),
+    }
+
+
+def run_client(route_table, fixture, requests=20):
+    """Each route `requests` times through the test client, one after another, after one warm-up."""
+    by_role = clients(fixture)
+    results = []
+    for name, role, path in route_table:
+        client = by_role[role]
+        client.get(path)
+        metrics.clear()
+        timings, statuses = [], []
+        started = time.perf_counter()
+        for _ in range(requests):
+            sent = time.perf_counter()
+            response = client.get(path)
+            if response.streaming:
+                b''.join(response.streaming_content)
+            timings.append(time.perf_counter() - sent)
+            statuses.append(response.status_code)
+        results.append(summarise(name, timings, statuses, time.perf_counter() - started))
+    return results
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server():
+    """A threaded WSGI server for this project on a free local port, serving from a daemon thread."""
+    server = ThreadedWSGIServer(('127.0.0.1', 0), QuietRequestHandler, allow_reuse_address=False)
+    server.set_app(WSGIHandler())
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def fetch(port, path, cookie):
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+    headers = {'Host': 'testserver'}
+    if cookie:
+        headers['Cookie'] = cookie
+    sent = time.perf_counter()
+    try:
+        connection.request('GET', path, headers=headers)
+        response = connection.getresponse()
+        response.read()
+        return time.perf_counter() - sent, response.status
+    finally:
+        connection.close()
+
+
+def run_server(route_table, fixture, requests=100, concurrency=8):
+    """Each route `requests` times over HTTP with `concurrency` requests in flight."""
+    cookies = {role: None for role in (None, 'customer', 'professional', 'staff')}
+    for role, client in clients(fixture).items():
+        if role is not None:
+            cookies[role] = f'{settings.SESSION_COOKIE_NAME}={client.cookies[settings.SESSION_COOKIE_NAME].value}'
+    server = start_server()
+    port = server.server_address[1]
+    results = []
+    try:
+        with ThreadPoolExecutor(concurrency) as pool:
+            for name, role, path in route_table:
+                fetch(port, path, cookies[role])
+                metrics.clear()
+                started = time.perf_counter()
+                outcomes = list(pool.map(lambda _: fetch(port, path, cookies[role]), range(requests)))
+                elapsed = time.perf_counter() - started
+                results.append(summarise(name, [t for t, _ in outcomes], [s for _, s in outcomes], elapsed))
+    finally:
+        server.shutdown()
+        server.server_close()
+    return results
+
+
+def baseline(mode, results, options):
+    return {
+        'mode': mode,
+        'recorded_at': timezone.now().isoformat(timespec='seconds'),
+        'options': options,
+        'routes': {row['route']: row for row in results},
+    }
+
+
+def compare(saved, results, tolerance=DEFAULT_TOLERANCE):
+    """
+    Regressions of `results` against a saved baseline: any route now running
+    more queries on average, or with a p95 more than `tolerance` (a fraction)
+    and MIN_REGRESSION_MS above the baseline's. Returns a list of messages.
+    """
+    regressions = []
+    for row in results:
+        before = saved['routes'].get(row['route'])
+        if before is None:
+            continue
+        if row['queries'] > before['queries'] + 0.5:
+            regressions.append(f"{row['route']}: {row['queries']:g} queries, was {before['queries']:g}")
+        slower = row['p95_ms'] - before['p95_ms']
+        if slower > MIN_REGRESSION_MS and row['p95_ms'] > before['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{row['route']}: p95 {row['p95_ms']:.1f} ms, was {before['p95_ms']:.1f} ms")
+        if row['errors'] > before['errors']:
+            regressions.append(f"{row['route']}: {row['errors']} errors, was {before['errors']}")
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_baseline(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f, indent=2, sort_keys=True)
+        f.write('\n')
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import threading
+from collections import defaultdict
+from functools import partial
+
+from django.db import transaction
+
+# Events a subscriber may fall behind by before the oldest are dropped. The
+# stream carries state, not history, so a slow reader only loses stale updates.
+QUEUE_SIZE = 32
+# Seconds between keepalive comments on an idle stream, to hold proxies open.
+HEARTBEAT = 15
+FINAL_STATUSES = ('COMPLETED', 'CANCELLED')
+
+
+class Subscription:
+    def __init__(self, topic, loop):
+        self.topic = topic
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def deliver(self, event):
+        # Runs on the subscriber's event loop.
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(event)
+
+    async def get(self, timeout=None):
+        """The next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+def deliver(subscriptions, message):
+    for subscription in subscriptions:
+        subscription.deliver(message)
+
+
+class Broker:
+    """
+    In-process pub/sub: publish() fans an event out to every subscription on a
+    topic. Subscriptions belong to an event loop and are fed through it, so
+    publishing is safe from any thread, including sync views under ASGI.
+
+    Being in-process, it only reaches streams served by the same process; run
+    the event stream from a single ASGI worker, or put a shared channel in
+    front of this when scaling out.
+    """
+
+    def __init__(self):
+        self.topics = defaultdict(set)
+        self.lock = threading.Lock()
+
+    def subscribe(self, topic):
+        subscription = Subscription(topic, asyncio.get_running_loop())
+        with self.lock:
+            self.topics[topic].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscribers = self.topics.get(subscription.topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self.topics[subscription.topic]
+
+    def publish(self, topic, event, data):
+        """
+        Queue an event for every current subscriber of `topic`; returns how many.
+        The message is encoded once, and each event loop is woken once however
+        many of its subscribers are waiting.
+        """
+        message = (event, data, sse(event, data))
+        by_loop = defaultdict(list)
+        with self.lock:
+            for subscription in self.topics.get(topic, ()):
+                by_loop[subscription.loop].append(subscription)
+        for loop, subscriptions in by_loop.items():
+            try:
+                loop.call_soon_threadsafe(deliver, subscriptions, message)
+            except RuntimeError:
+                # That loop has closed under its subscribers.
+                for subscription in subscriptions:
+                    self.unsubscribe(subscription)
+        return sum(len(subscriptions) for subscriptions in by_loop.values())
+
+    def subscriber_count(self, topic=None):
+        with self.lock:
+            if topic is not None:
+                return len(self.topics.get(topic, ()))
+            return sum(len(subscribers) for subscribers in self.topics.values())
+
+
+broker = Broker()
+
+
+def booking_topic(booking_id):
+    return f'booking:{booking_id}'
+
+
+def sse(event, data):
+    """One Server-Sent Events message."""
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+def publish_on_commit(booking_id, event, data):
+    """Publish once the current transaction commits, so streams never show a rolled-back state."""
+    transaction.on_commit(partial(broker.publish, booking_topic(booking_id), event, data))
+
+
+def position_event(latitude, longitude, updated_at, status=None):
+    data = {'lat': float(latitude), 'lon': float(longitude), 'updated_at': updated_at.isoformat()}
+    if status is not None:
+        data['status'] = status
+    return data
+
+
+def status_event(status, display):
+    return {'status': status, 'display': display, 'final': status in FINAL_STATUSES}
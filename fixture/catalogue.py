@@ -0,0 +1,49 @@
+from django.core.cache import cache
+
+from .models import Category, Service, ServiceProfessional
+
+# Every cached catalogue entry embeds the current version in its key, so bumping
+# the version invalidates all of them at once without deleting anything.
+VERSION_KEY = 'catalogue:version'
+CATALOGUE_TIMEOUT = 60 * 60
+TOP_PROS_COUNT = 4
+
+
+def catalogue_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def invalidate_catalogue():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+
+
+def build_catalogue():
+    return {
+        'categories': list(Category.objects.order_by('name')),
+        'services': list(Service.objects.filter(is_active=True).select_related('category')),
+        'top_pros': list(
+            ServiceProfessional.objects.select_related('user', 'category').order_by('-rating')[:TOP_PROS_COUNT]
+        ),
+    }
+
+
+def get_catalogue():
+    """
+    Categories, active services and top professionals for the home page, served
+    from the cache while the catalogue version is unchanged. The returned dict
+    also carries `catalogue_version` for keying template fragments.
+    """
+    version = catalogue_version()
+    key = f'catalogue:v{version}'
+    catalogue = cache.get(key)
+    if catalogue is None:
+        catalogue = build_catalogue()
+        cache.set(key, catalogue, CATALOGUE_TIMEOUT)
+    return dict(catalogue, catalogue_version=version, catalogue_timeout=CATALOGUE_TIMEOUT)
@@ -0,0 +1,9 @@
+from .notifications import unread_count
+
+
+def notifications(request):
+    """Expose the cached unread count lazily; templates that never show it cost nothing."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'unread_notifications_count': lambda: unread_count(user.id)}
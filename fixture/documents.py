@@ -0,0 +1,202 @@
+import hashlib
+import os
+import uuid
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import locks
+from django.core.files.storage import FileSystemStorage
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, StopUpload
+
+MB = 1024 * 1024
+# Per document type: (max bytes, accepted content types). Overridable with
+# settings.DOCUMENT_UPLOAD_LIMITS.
+DOCUMENT_LIMITS = {
+    'ID': (5 * MB, {'image/jpeg', 'image/png', 'application/pdf'}),
+    'LICENSE': (10 * MB, {'image/jpeg', 'image/png', 'application/pdf'}),
+    'CERTIFICATE': (10 * MB, {'image/jpeg', 'image/png', 'application/pdf'}),
+}
+# Content types are sniffed from leading bytes; the client's claim is ignored.
+SIGNATURES = (
+    (b'%PDF-', 'application/pdf'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+)
+EXTENSIONS = {'application/pdf': '.pdf', 'image/png': '.png', 'image/jpeg': '.jpg'}
+CHUNK_SIZE = 64 * 1024
+# Room for the multipart framing and the other form fields around the file.
+BODY_OVERHEAD = 64 * 1024
+# Under the storage's location; taken by anything that creates or removes blobs.
+LOCK_NAME = '.blobs.lock'
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def document_limits():
+    return getattr(settings, 'DOCUMENT_UPLOAD_LIMITS', DOCUMENT_LIMITS)
+
+
+def sniff_content_type(head):
+    return next((ctype for magic, ctype in SIGNATURES if head.startswith(magic)), None)
+
+
+def check_document(document_type, upload):
+    """Raise UploadRejected unless `upload` is within the limits for `document_type`."""
+    limits = document_limits()
+    if document_type not in limits:
+        raise UploadRejected("Unknown document type.")
+    max_size, content_types = limits[document_type]
+    if upload.size > max_size:
+        raise UploadRejected(f"Files of this type may be at most {max_size // MB} MB.")
+    content_type = getattr(upload, 'sniffed_content_type', None) or sniff_file(upload)[1]
+    if content_type not in content_types:
+        raise UploadRejected("Upload a PDF, PNG or JPEG file.")
+
+
+def sniff_file(file):
+    """(sha256 hex digest, sniffed content type) of a file, read in chunks."""
+    sha = hashlib.sha256()
+    head = b''
+    for chunk in file.chunks(CHUNK_SIZE):
+        if not head:
+            head = chunk[:16]
+        sha.update(chunk)
+    file.seek(0)
+    return sha.hexdigest(), sniff_content_type(head)
+
+
+class DocumentUploadHandler(FileUploadHandler):
+    """
+    Streams document uploads to a temporary file in CHUNK_SIZE pieces, hashing
+    as it goes. Uploads are refused as soon as they are known to break the
+    limits: from Content-Length before the file starts, from the first chunk's
+    magic bytes, or once the running size passes the largest allowance. The
+    reason is left in `error` and the file is absent from request.FILES.
+
+    Which document type is being uploaded is not known while the body is
+    parsed, so the per-type limits are applied afterwards by check_document().
+    """
+    chunk_size = CHUNK_SIZE
+
+    def __init__(self, request=None):
+        super().__init__(request)
+        limits = document_limits().values()
+        self.max_size = max(size for size, _ in limits)
+        self.content_types = set().union(*(types for _, types in limits))
+        self.error = None
+        self.request_length = None
+
+    def handle_raw_input(self, input_data, META, content_length, boundary, encoding=None):
+        self.request_length = content_length
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        if self.request_length and self.request_length > self.max_size + BODY_OVERHEAD:
+            self.reject(f"Files may be at most {self.max_size // MB} MB.")
+        self.file = TemporaryUploadedFile(self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+        self.sha = hashlib.sha256()
+        self.sniffed = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if start == 0:
+            self.sniffed = sniff_content_type(raw_data[:16])
+            if self.sniffed not in self.content_types:
+                self.reject("Upload a PDF, PNG or JPEG file.")
+        if start + len(raw_data) > self.max_size:
+            self.reject(f"Files may be at most {self.max_size // MB} MB.")
+        self.sha.update(raw_data)
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        self.file.sha256 = self.sha.hexdigest()
+        self.file.sniffed_content_type = self.sniffed
+        return self.file
+
+    def reject(self, message):
+        self.error = message
+        self.upload_interrupted()
+        raise StopUpload(connection_reset=False)
+
+    def upload_interrupted(self):
+        # The parser closes any `file` left on a handler, so drop it once removed.
+        if hasattr(self, 'file'):
+            path = self.file.temporary_file_path()
+            self.file.close()
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            del self.file
+
+
+class BlobStorage(FileSystemStorage):
+    """
+    Content-addressed file storage: names come from the content hash, so a name
+    that already exists holds the same bytes and saving it again is a no-op.
+    Writes go to a temporary file that is renamed into place, which keeps
+    concurrent uploads of the same blob safe. Checking for a blob and writing
+    or deleting it happen under locked(), so a save that finds the blob cannot
+    be undone by a release_blob() that is about to delete it.
+    """
+
+    @contextmanager
+    def locked(self):
+        """Exclusive lock over this storage's blobs, across threads and processes."""
+        os.makedirs(self.location, exist_ok=True)
+        with open(os.path.join(self.location, LOCK_NAME), 'ab') as f:
+            locks.lock(f, locks.LOCK_EX)
+            try:
+                yield
+            finally:
+                locks.unlock(f)
+
+    def get_available_name(self, name, max_length=None):
+        return name
+
+    def _save(self, name, content):
+        with self.locked():
+            if not self.exists(name):
+                self.write(name, content)
+        return name
+
+    def write(self, name, content):
+        full_path = self.path(name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        partial = f'{full_path}.{uuid.uuid4().hex}.part'
+        with open(partial, 'wb') as f:
+            for chunk in content.chunks(CHUNK_SIZE):
+                f.write(chunk)
+        if self.file_permissions_mode is not None:
+            os.chmod(partial, self.file_permissions_mode)
+        os.replace(partial, full_path)
+
+
+blob_storage = BlobStorage()
+
+
+def document_storage():
+    return blob_storage
+
+
+def document_path(instance, filename):
+    """pro_documents/<ab>/<sha256><ext>, with the extension taken from the sniffed type."""
+    ext = EXTENSIONS.get(instance.content_type) or os.path.splitext(filename)[1].lower()
+    return f'pro_documents/{instance.sha256[:2]}/{instance.sha256}{ext}'
+
+
+def release_blob(sha256, name):
+    """
+    Delete a stored blob once no ProfessionalDocuments row references its
+    hash. A row still being committed is not seen, so ProfessionalDocuments
+    saves its blob again once committed, which puts it back if it went here.
+    """
+    from .models import ProfessionalDocuments
+
+    with blob_storage.locked():
+        if not ProfessionalDocuments.objects.filter(sha256=sha256).exists():
+            blob_storage.delete(name)
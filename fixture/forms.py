@@ -1,6 +1,9 @@
 from django import forms
 from django.contrib.auth.forms import UserCreationForm, AuthenticationForm
 from django.core.validators import RegexValidator
+from .accounts import normalize_phone
+from .backends import with_email, with_phone
+from .lifecycle import allowed_transitions
 from .models import User, ServiceProfessional, UserProfile, Category, Service, Booking, Payment, Review, Complaint
 
 # Validators
@@ -20,10 +23,22 @@ class RegistrationForm(UserCreationForm):
         model = User
         fields = UserCreationForm.Meta.fields + ('email', 'phone_number', 'full_name', 'role', 'terms_accepted', 'profile_picture')
 
+    def clean_email(self):
+        email = self.cleaned_data.get('email')
+        if email and with_email(email).exists():
+            raise forms.ValidationError("An account with this email already exists.")
+        return email
+
     def clean_phone_number(self):
         phone = self.cleaned_data.get('phone_number')
-        if phone and (not phone.isdigit() or len(phone) != 10):
+        if not phone:
+            return phone
+        # Accept +91, a leading 0 and separators; store the bare ten digits.
+        phone = normalize_phone(phone)
+        if not phone or len(phone) != 10:
             raise forms.ValidationError("Mobile number must be exactly 10 digits.")
+        if with_phone(phone).exists():
+            raise forms.ValidationError("An account with this mobile number already exists.")
         return phone
 
     def save(self, commit=True):
@@ -95,10 +110,16 @@ class ServiceListingForm(forms.ModelForm):
         }
 
 class ServiceSearchForm(forms.Form):
+    q = forms.CharField(required=False, max_length=100, label="Search", widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Search services, categories, professionals'}))
     category = forms.ModelChoiceField(queryset=Category.objects.all(), required=False, widget=forms.Select(attrs={'class': 'form-control'}))
     location = forms.CharField(required=False, widget=forms.TextInput(attrs={'class': 'form-control', 'placeholder': 'Area / city'}))
+    radius = forms.IntegerField(required=False, min_value=1, max_value=100, label="Radius (km)", widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Within km'}))
+    latitude = forms.FloatField(required=False, min_value=-90, max_value=90, widget=forms.HiddenInput())
+    longitude = forms.FloatField(required=False, min_value=-180, max_value=180, widget=forms.HiddenInput())
     price_range = forms.IntegerField(required=False, widget=forms.NumberInput(attrs={'class': 'form-control', 'placeholder': 'Max price'}))
     rating = forms.ChoiceField(choices=[('', 'Minimum rating')] + [(i, f'{i} Stars') for i in range(1, 6)], required=False, widget=forms.Select(attrs={'class': 'form-control'}))
+    verified = forms.BooleanField(required=False, label="Verified professionals only", widget=forms.CheckboxInput(attrs={'class': 'form-check-input'}))
+    sort = forms.ChoiceField(choices=[('rating', 'Top rated'), ('price', 'Price: low to high'), ('price_desc', 'Price: high to low')], required=False, widget=forms.Select(attrs={'class': 'form-control'}))
 
 class BookingForm(forms.ModelForm):
     class Meta:
@@ -152,6 +173,13 @@ class JobUpdateForm(forms.ModelForm):
             'requirements': forms.Textarea(attrs={'class': 'form-control', 'rows': 4, 'placeholder': 'Add specific requirements or notes for this job...'}),
         }
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Offer only the current status and the moves allowed from it.
+        current = self.instance.status
+        labels = dict(Booking.STATUS_CHOICES)
+        self.fields['status'].choices = [(s, labels[s]) for s in (current, *allowed_transitions(current))]
+
 class AdminManagementForm(forms.Form):
     user_selection = forms.ModelChoiceField(queryset=User.objects.all(), widget=forms.Select(attrs={'class': 'form-control'}))
     action = forms.ChoiceField(choices=[('APPROVE', 'Approve'), ('REJECT', 'Reject')], widget=forms.Select(attrs={'class': 'form-control'}))
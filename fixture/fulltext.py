@@ -0,0 +1,184 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from django.urls import reverse
+from django.utils.html import escape
+
+# FTS5 table over service, category and professional text. Rows carry no
+# foreign keys: the rowid encodes both the document kind and the object id.
+TABLE = 'fixture_fulltext'
+KINDS = {'service': 1, 'category': 2, 'professional': 3}
+KIND_NAMES = {code: name for name, code in KINDS.items()}
+KIND_BITS = 2
+KIND_MASK = (1 << KIND_BITS) - 1
+# bm25() weights per column (title, body): a title hit outranks several body hits.
+TITLE_WEIGHT, BODY_WEIGHT = 5.0, 1.0
+MAX_RESULTS = 50
+# Model fields each kind's document is built from; saves touching none of them skip reindexing.
+TEXT_FIELDS = {
+    'service': {'name', 'description'},
+    'category': {'name', 'description'},
+    'professional': {'user', 'bio'},
+}
+URL_NAMES = {
+    'service': 'service_professionals',
+    'category': 'category_professionals',
+    'professional': 'book_professional',
+}
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# Control characters delimit matches in snippets until the text has been escaped.
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def available():
+    return connection.vendor == 'sqlite'
+
+
+def doc_id(kind, pk):
+    return (pk << KIND_BITS) | KINDS[kind]
+
+
+def document(kind, obj):
+    """(title, body) indexed for a Service, Category or ServiceProfessional."""
+    if kind == 'professional':
+        return obj.user.username, obj.bio or ''
+    return obj.name, obj.description or ''
+
+
+def index_document(kind, obj):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [doc_id(kind, obj.pk)])
+        cursor.execute(
+            f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)",
+            [doc_id(kind, obj.pk), *document(kind, obj)],
+        )
+
+
+def remove_document(kind, pk):
+    if not available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE} WHERE rowid = %s", [doc_id(kind, pk)])
+
+
+def rebuild_fulltext():
+    """Reindex every service, category and professional. Returns the number of documents."""
+    from .models import Category, Service, ServiceProfessional
+
+    if not available():
+        return 0
+    sources = (
+        ('service', Service.objects.only('name', 'description')),
+        ('category', Category.objects.only('name', 'description')),
+        ('professional', ServiceProfessional.objects.select_related('user').only('bio', 'user__username')),
+    )
+    count = 0
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {TABLE}")
+        for kind, queryset in sources:
+            rows = [(doc_id(kind, obj.pk), *document(kind, obj)) for obj in queryset.iterator(chunk_size=2000)]
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+            count += len(rows)
+        cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+    return count
+
+
+def match_expression(text, prefix=False):
+    """
+    Turn free text into an FTS5 MATCH expression: every word must appear, each is
+    quoted so user input cannot inject query syntax. With `prefix` the last word
+    matches as a prefix and only titles are searched: typeahead completes names,
+    and short prefixes over whole bodies match too much of the corpus to rank
+    quickly. Returns '' when there are no words.
+    """
+    words = TOKEN_RE.findall(text)
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    if not prefix:
+        return ' '.join(terms)
+    terms[-1] += '*'
+    return f"title : ({' '.join(terms)})"
+
+
+def search_text(text, kinds=None, prefix=False, limit=20):
+    """
+    BM25-ranked documents matching `text`, best first, as dicts with kind, id,
+    title, snippet and url. `kinds` restricts results to some document kinds.
+    """
+    expression = match_expression(text, prefix)
+    if not expression:
+        return []
+    limit = max(1, min(limit, MAX_RESULTS))
+    if not available():
+        return fallback_search(text, kinds, prefix, limit)
+    sql = (
+        f"SELECT rowid, title, snippet({TABLE}, 1, %s, %s, '…', 12) "
+        f"FROM {TABLE} WHERE {TABLE} MATCH %s"
+    )
+    params = [MARK_START, MARK_END, expression]
+    if kinds:
+        codes = [KINDS[kind] for kind in kinds]
+        sql += f" AND (rowid & {KIND_MASK}) IN ({', '.join(['%s'] * len(codes))})"
+        params += codes
+    sql += f" ORDER BY bm25({TABLE}, {TITLE_WEIGHT}, {BODY_WEIGHT}) LIMIT %s"
+    params.append(limit)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    return [result(KIND_NAMES[rowid & KIND_MASK], rowid >> KIND_BITS, title, snippet) for rowid, title, snippet in rows]
+
+
+def result(kind, pk, title, snippet):
+    # Snippets are user text: escape it, then turn the match markers into <mark>.
+    snippet = escape(snippet).replace(MARK_START, '<mark>').replace(MARK_END, '</mark>')
+    return {'kind': kind, 'id': pk, 'title': title, 'snippet': snippet, 'url': reverse(URL_NAMES[kind], args=[pk])}
+
+
+def fallback_search(text, kinds, prefix, limit):
+    """
+    Unranked substring search for databases without FTS5. Like MATCH, every
+    word must appear in the title or body, or in the title alone for `prefix`.
+    """
+    from .models import Category, Service, ServiceProfessional
+
+    words = TOKEN_RE.findall(text)
+    results = []
+    if not kinds or 'service' in kinds:
+        for obj in Service.objects.filter(every_word(words, 'name', 'description', prefix))[:limit]:
+            results.append(result('service', obj.pk, obj.name, obj.description[:80]))
+    if not kinds or 'category' in kinds:
+        for obj in Category.objects.filter(every_word(words, 'name', 'description', prefix))[:limit]:
+            results.append(result('category', obj.pk, obj.name, obj.description[:80]))
+    if not kinds or 'professional' in kinds:
+        pros = ServiceProfessional.objects.select_related('user').filter(every_word(words, 'user__username', 'bio', prefix))
+        for obj in pros[:limit]:
+            results.append(result('professional', obj.pk, obj.user.username, obj.bio[:80]))
+    return results[:limit]
+
+
+def every_word(words, title, body, prefix):
+    condition = Q()
+    for word in words:
+        in_title = Q(**{f'{title}__icontains': word})
+        condition &= in_title if prefix else in_title | Q(**{f'{body}__icontains': word})
+    return condition
+
+
+def matching(kind, text):
+    """
+    Q-compatible RawSQL for `pk__in` selecting every object of `kind` whose
+    document matches `text`, or None when there is nothing to match on.
+    """
+    expression = match_expression(text)
+    if not expression or not available():
+        return None
+    return RawSQL(
+        f"SELECT rowid >> {KIND_BITS} FROM {TABLE} WHERE {TABLE} MATCH %s AND (rowid & {KIND_MASK}) = %s",
+        [expression, KINDS[kind]],
+    )
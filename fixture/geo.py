@@ -0,0 +1,150 @@
+import math
+
+from django.db.models import Q
+
+GEOHASH_ALPHABET = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 9
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    lat_lo, lat_hi = -90.0, 90.0
+    lon_lo, lon_hi = -180.0, 180.0
+    latitude, longitude = float(latitude), float(longitude)
+    chars, bits, value, even = [], 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lon_lo + lon_hi) / 2
+            if longitude >= mid:
+                value = (value << 1) | 1
+                lon_lo = mid
+            else:
+                value <<= 1
+                lon_hi = mid
+        else:
+            mid = (lat_lo + lat_hi) / 2
+            if latitude >= mid:
+                value = (value << 1) | 1
+                lat_lo = mid
+            else:
+                value <<= 1
+                lat_hi = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(GEOHASH_ALPHABET[value])
+            bits, value = 0, 0
+    return ''.join(chars)
+
+
+def geohash_cell_size(precision):
+    """Return the (lat, lon) size in degrees of a geohash cell at `precision`."""
+    total_bits = 5 * precision
+    lon_bits = (total_bits + 1) // 2
+    lat_bits = total_bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+
+def bounding_box(latitude, longitude, radius_km):
+    """Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle of `radius_km`."""
+    lat_delta = radius_km / KM_PER_DEGREE_LAT
+    cos_lat = max(math.cos(math.radians(latitude)), 1e-6)
+    lon_delta = min(radius_km / (KM_PER_DEGREE_LAT * cos_lat), 180.0)
+    return (
+        max(latitude - lat_delta, -90.0), min(latitude + lat_delta, 90.0),
+        max(longitude - lon_delta, -180.0), min(longitude + lon_delta, 180.0),
+    )
+
+
+def covering_cells(box):
+    """
+    Geohash prefixes that together cover `box`, using the finest precision whose
+    cells are at least as large as the box so that only a handful of prefixes come back.
+    """
+    min_lat, max_lat, min_lon, max_lon = box
+    precision = 1
+    for p in range(GEOHASH_PRECISION, 0, -1):
+        lat_size, lon_size = geohash_cell_size(p)
+        if lat_size >= max_lat - min_lat and lon_size >= max_lon - min_lon:
+            precision = p
+            break
+    lat_size, lon_size = geohash_cell_size(precision)
+
+    cells = set()
+    lat = min_lat
+    while True:
+        lon = min_lon
+        while True:
+            cells.add(geohash_encode(lat, lon, precision))
+            if lon >= max_lon:
+                break
+            lon = min(lon + lon_size, max_lon)
+        if lat >= max_lat:
+            break
+        lat = min(lat + lat_size, max_lat)
+    return sorted(cells)
+
+
+def geohash_filter(field, cells):
+    """Q object matching any of `cells` as index range scans on `field` (LIKE cannot use the index on SQLite)."""
+    query = Q()
+    for cell in cells:
+        query |= Q(**{f'{field}__gte': cell, f'{field}__lt': cell + '~'})
+    return query
+
+
+def haversine_km(latitude, longitude, points):
+    """Great-circle distances in km from one origin to every (lat, lon) in `points`."""
+    lat1 = math.radians(latitude)
+    lon1 = math.radians(longitude)
+    cos_lat1 = math.cos(lat1)
+    sin, cos, asin, sqrt, radians = math.sin, math.cos, math.asin, math.sqrt, math.radians
+    distances = []
+    for lat2, lon2 in points:
+        lat2 = radians(lat2)
+        half_dlat = (lat2 - lat1) / 2
+        half_dlon = (radians(lon2) - lon1) / 2
+        a = sin(half_dlat) ** 2 + cos_lat1 * cos(lat2) * sin(half_dlon) ** 2
+        distances.append(2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a))))
+    return distances
+
+
+def nearby_professionals(latitude, longitude, radius_km, queryset=None, limit=None):
+    """
+    Professionals within `radius_km` of a point, nearest first, located by their
+    user's profile coordinates. The geohash prefix and bounding box prune
+    candidates in SQL; exact distances are computed only for what survives.
+    Returns a list of professionals each carrying a `distance_km` attribute.
+    """
+    from .models import ServiceProfessional
+
+    if queryset is None:
+        queryset = ServiceProfessional.objects.all()
+    latitude, longitude = float(latitude), float(longitude)
+    box = bounding_box(latitude, longitude, radius_km)
+    min_lat, max_lat, min_lon, max_lon = box
+
+    candidates = list(
+        queryset.filter(
+            geohash_filter('user__profile__geohash', covering_cells(box)),
+            user__profile__latitude__gte=min_lat,
+            user__profile__latitude__lte=max_lat,
+            user__profile__longitude__gte=min_lon,
+            user__profile__longitude__lte=max_lon,
+        ).values_list('id', 'user__profile__latitude', 'user__profile__longitude')
+    )
+    distances = haversine_km(latitude, longitude, [(float(lat), float(lon)) for _, lat, lon in candidates])
+    ranked = sorted(
+        ((dist, pk) for (pk, _, _), dist in zip(candidates, distances) if dist <= radius_km)
+    )
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    pros = ServiceProfessional.objects.select_related('user', 'category').in_bulk([pk for _, pk in ranked])
+    results = []
+    for dist, pk in ranked:
+        pro = pros[pk]
+        pro.distance_km = round(dist, 2)
+        results.append(pro)
+    return results
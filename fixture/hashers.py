@@ -0,0 +1,78 @@
+"""
+Password hashers. The production profile hashes with scrypt at the cost in
+settings.PASSWORD_SCRYPT; Django rehashes a stored password with the first
+hasher of PASSWORD_HASHERS whenever its owner logs in with a hash made by
+another hasher or at another cost, so changing either upgrades users as they
+come back. bench_login measures the profiles and calibrates the cost.
+"""
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import ScryptPasswordHasher
+
+DEFAULT_SCRYPT = {'work_factor': 2**15, 'block_size': 8, 'parallelism': 1}
+SCRYPT_WORK_FACTORS = tuple(2**n for n in range(12, 19))
+
+
+def scrypt_memory(work_factor, block_size, parallelism):
+    """Bytes scrypt allocates for these parameters."""
+    return 128 * block_size * (work_factor + parallelism + 2)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Django's scrypt hasher with its cost read from settings.PASSWORD_SCRYPT.
+    Stock Django runs five parallel lanes one after another, which costs five
+    times the time for no extra memory hardness; one lane over more memory is
+    the better trade. The algorithm name is unchanged, so hashes from the stock
+    hasher verify, and must_update() flags the ones made at another cost.
+    """
+
+    def __init__(self, **params):
+        # Explicit parameters win over settings; Django itself passes none.
+        self.overrides = params
+
+    def params(self):
+        return {**DEFAULT_SCRYPT, **getattr(settings, 'PASSWORD_SCRYPT', {}), **self.overrides}
+
+    @property
+    def work_factor(self):
+        return self.params()['work_factor']
+
+    @property
+    def block_size(self):
+        return self.params()['block_size']
+
+    @property
+    def parallelism(self):
+        return self.params()['parallelism']
+
+    @property
+    def maxmem(self):
+        # hashlib refuses anything past 32 MiB unless told otherwise; leave headroom
+        # for verifying hashes made at a cost up to twice the current one.
+        return 2 * scrypt_memory(self.work_factor, self.block_size, self.parallelism) + 2**20
+
+
+def time_hasher(hasher, rounds=5, password='correct horse battery staple'):
+    """Median seconds `hasher` takes to encode a password."""
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hasher.encode(password, hasher.salt())
+        timings.append(time.perf_counter() - started)
+    return sorted(timings)[len(timings) // 2]
+
+
+def calibrate_scrypt(target_ms, block_size=8, parallelism=1, rounds=3):
+    """
+    Time scrypt at each of SCRYPT_WORK_FACTORS on this machine. Returns the
+    (work_factor, milliseconds) pairs and the largest work factor that hashes
+    within `target_ms`, or the smallest if none does.
+    """
+    results = []
+    for work_factor in SCRYPT_WORK_FACTORS:
+        hasher = TunedScryptPasswordHasher(work_factor=work_factor, block_size=block_size, parallelism=parallelism)
+        results.append((work_factor, time_hasher(hasher, rounds) * 1000))
+    fitting = [work_factor for work_factor, ms in results if ms <= target_ms]
+    return results, fitting[-1] if fitting else SCRYPT_WORK_FACTORS[0]
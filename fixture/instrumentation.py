@@ -0,0 +1,215 @@
+import json
+import logging
+import re
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram bucket upper bounds in milliseconds; slower requests land in a final overflow bucket.
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500)
+# Requests kept per view; older samples roll out of the histogram.
+WINDOW = 500
+# Duplicate signatures kept per request, most repeated first.
+MAX_DUPLICATES = 5
+UNRESOLVED = '<unresolved>'
+LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+SPACE_RE = re.compile(r'\s+')
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def signature(sql):
+    """SQL with literals and whitespace normalised, so repeats of one query shape compare equal."""
+    return SPACE_RE.sub(' ', LITERAL_RE.sub('?', sql)).strip()
+
+
+class QueryRecorder:
+    """connection.execute_wrapper() callable timing every query run through it."""
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((sql, time.perf_counter() - started))
+
+    @property
+    def sql_time(self):
+        return sum(duration for _, duration in self.queries)
+
+    def duplicates(self):
+        """(signature, count) for query shapes run more than once, most repeated first."""
+        counts = Counter(signature(sql) for sql, _ in self.queries)
+        return [(sig, count) for sig, count in counts.most_common(MAX_DUPLICATES) if count > 1]
+
+
+# Recorder of the request being served. Context variables follow the request
+# into the threads sync_to_async runs its ORM calls in, whatever connection they use.
+current_recorder = ContextVar('current_recorder', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    recorder = current_recorder.get()
+    if recorder is None:
+        return execute(sql, params, many, context)
+    return recorder(execute, sql, params, many, context)
+
+
+def watch_queries(connection):
+    """Route every query of `connection` through record_query(), once per connection."""
+    if record_query not in connection.execute_wrappers:
+        # First, so execute_wrapper() blocks opened before the connection still pop their own wrapper.
+        connection.execute_wrappers.insert(0, record_query)
+
+
+def bucket(ms):
+    for i, bound in enumerate(LATENCY_BUCKETS_MS):
+        if ms <= bound:
+            return i
+    return len(LATENCY_BUCKETS_MS)
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+class Metrics:
+    """Rolling per-view request samples, shared by every thread of the process."""
+
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self.lock = threading.Lock()
+        self.samples = {}
+        self.totals = Counter()
+
+    def record(self, view, wall_ms, queries, sql_ms, duplicates):
+        with self.lock:
+            samples = self.samples.get(view)
+            if samples is None:
+                samples = self.samples[view] = deque(maxlen=self.window)
+            samples.append((wall_ms, queries, sql_ms, duplicates))
+            self.totals[view] += 1
+
+    def clear(self):
+        with self.lock:
+            self.samples.clear()
+            self.totals.clear()
+
+    def snapshot(self):
+        """Per-view summaries over the current window, slowest p95 first."""
+        with self.lock:
+            samples = {view: list(rows) for view, rows in self.samples.items()}
+            totals = dict(self.totals)
+        views = []
+        for view, rows in samples.items():
+            walls = [row[0] for row in rows]
+            queries = [row[1] for row in rows]
+            histogram = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+            for wall in walls:
+                histogram[bucket(wall)] += 1
+            duplicates = Counter()
+            for row in rows:
+                for sig, count in row[3]:
+                    duplicates[sig] = max(duplicates[sig], count)
+            views.append({
+                'view': view,
+                'requests': totals[view],
+                'window': len(rows),
+                'p50_ms': percentile(walls, 0.5),
+                'p95_ms': percentile(walls, 0.95),
+                'p99_ms': percentile(walls, 0.99),
+                'mean_queries': sum(queries) / len(queries),
+                'max_queries': max(queries),
+                'mean_sql_ms': sum(row[2] for row in rows) / len(rows),
+                'histogram': histogram,
+                'duplicates': duplicates.most_common(MAX_DUPLICATES),
+            })
+        return sorted(views, key=lambda v: -v['p95_ms'])
+
+
+metrics = Metrics()
+
+
+def query_budget(view):
+    return getattr(settings, 'QUERY_BUDGETS', {}).get(view)
+
+
+class QueryMetricsMiddleware:
+    """
+    Times each request and every SQL query it runs, then records the result
+    under the resolved URL name: a JSON log line on the `fixture.instrumentation`
+    logger and a sample in the in-process `metrics` window.
+
+    When settings.QUERY_BUDGETS names the view, going over its query count
+    raises QueryBudgetExceeded. Tests set budgets with override_settings; the
+    setting is absent in production, where nothing is enforced.
+    """
+
+    async_capable = True
+    sync_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        # Under ASGI the chain stays async, so async views are not run through async_to_sync.
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    async def __acall__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        token = current_recorder.set(recorder)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_recorder.reset(token)
+        return self.finish(request, response, recorder, started)
+
+    def finish(self, request, response, recorder, started):
+        wall_ms = (time.perf_counter() - started) * 1000
+        match = getattr(request, 'resolver_match', None)
+        view = match.view_name if match else UNRESOLVED
+        sql_ms = recorder.sql_time * 1000
+        duplicates = recorder.duplicates()
+        metrics.record(view, wall_ms, len(recorder.queries), sql_ms, duplicates)
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(json.dumps({
+                'view': view,
+                'method': request.method,
+                'status': response.status_code,
+                'wall_ms': round(wall_ms, 2),
+                'queries': len(recorder.queries),
+                'sql_ms': round(sql_ms, 2),
+                'duplicates': duplicates,
+            }))
+
+        budget = query_budget(view)
+        if budget is not None and len(recorder.queries) > budget:
+            listing = '\n'.join(f'  {sql}' for sql, _ in recorder.queries)
+            raise QueryBudgetExceeded(
+                f"{view} ran {len(recorder.queries)} queries, budget is {budget}:\n{listing}"
+            )
+        return response
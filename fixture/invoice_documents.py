@@ -0,0 +1,172 @@
+import hashlib
+import zipfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .documents import BlobStorage
+from .models import Invoice
+from .pdf import PAGE_HEIGHT, PAGE_WIDTH, Document
+
+DOCUMENT_DIR = 'invoices'
+CONTENT_TYPES = {'html': 'text/html; charset=utf-8', 'pdf': 'application/pdf'}
+# Bump when a renderer or the template changes, so stored documents are redrawn.
+RENDER_VERSION = 1
+EXPORT_CHUNK_SIZE = 200
+MARGIN = 50
+
+
+def invoice_storage():
+    """
+    Where rendered invoices are kept: PRIVATE_MEDIA_ROOT, which has no URL.
+    Invoice numbers are sequential, so anything under MEDIA_URL could be had
+    by guessing; view_invoice and invoice_pdf are the only way out.
+
+    A stored document never changes, so a name that exists already holds the
+    right bytes: BlobStorage checks and writes under its lock, and of two
+    first renders racing each other only one is written, under the plain name.
+    """
+    return BlobStorage(location=settings.PRIVATE_MEDIA_ROOT, base_url=None)
+
+
+def document_name(invoice, fmt):
+    return f'{DOCUMENT_DIR}/v{RENDER_VERSION}/{invoice.period or "legacy"}/{invoice.invoice_number}.{fmt}'
+
+
+def etag_key(invoice, fmt):
+    return f'invoice-etag:{RENDER_VERSION}:{invoice.invoice_number}:{fmt}'
+
+
+def invoice_queryset():
+    return Invoice.objects.select_related(
+        'booking__customer', 'booking__service', 'booking__professional__user', 'booking__professional__category',
+    )
+
+
+def render_html(invoice):
+    return render_to_string('invoice_document.html', {'invoice': invoice, 'booking': invoice.booking}).encode()
+
+
+def money(amount):
+    return f'Rs. {amount:,.2f}'
+
+
+def render_pdf(invoice):
+    booking = invoice.booking
+    doc = Document(title=f'Invoice {invoice.invoice_number}')
+    right = PAGE_WIDTH - MARGIN
+    y = PAGE_HEIGHT - MARGIN - 20
+    doc.text(MARGIN, y, 'HomeFixr', size=22, bold=True)
+    doc.text(right, y, f'Invoice #{invoice.invoice_number}', size=12, bold=True, align='right')
+    y -= 18
+    doc.text(MARGIN, y, 'Tax Invoice', size=10)
+    doc.text(right, y, f'Date: {timezone.localtime(invoice.generated_at):%B %d, %Y}', size=10, align='right')
+
+    y -= 40
+    doc.text(MARGIN, y, 'Billed To:', size=9)
+    doc.text(right, y, 'Service Provider:', size=9, align='right')
+    y -= 14
+    doc.text(MARGIN, y, booking.customer.username, size=12, bold=True)
+    doc.text(right, y, booking.professional.user.username, size=12, bold=True, align='right')
+    y -= 13
+    doc.text(MARGIN, y, booking.customer.email or '', size=9)
+    if booking.professional.category:
+        doc.text(right, y, f'{booking.professional.category.name} Specialist', size=9, align='right')
+
+    columns = ((MARGIN, 'Description', 'left'), (330, 'Qty', 'right'), (410, 'Rate', 'right'),
+               (460, 'Tax', 'right'), (right, 'Amount', 'right'))
+    y -= 40
+    for x, heading, align in columns:
+        doc.text(x, y, heading, size=9, bold=True, align=align)
+    y -= 6
+    doc.line(MARGIN, y, right, y)
+    for item in invoice.line_items.all():
+        y -= 16
+        if y < MARGIN + 80:
+            doc.new_page()
+            y = PAGE_HEIGHT - MARGIN
+        values = (item.description, str(item.quantity), money(item.unit_price),
+                  f'{item.tax_rate.normalize():f}%', money(item.amount))
+        for (x, _, align), value in zip(columns, values):
+            doc.text(x, y, value, size=10, align=align)
+    y -= 10
+    doc.line(MARGIN, y, right, y)
+    for label, amount, bold in (('Subtotal', invoice.subtotal, False), ('GST', invoice.tax_amount, False),
+                                ('Total Amount', invoice.total_amount, True)):
+        y -= 18
+        doc.text(460, y, label, size=11 if bold else 10, bold=bold, align='right')
+        doc.text(right, y, money(amount), size=11 if bold else 10, bold=bold, align='right')
+    doc.text(MARGIN, MARGIN, 'Thank you for choosing HomeFixr for your home needs!', size=9)
+    return doc.render()
+
+
+RENDERERS = {'html': render_html, 'pdf': render_pdf}
+
+
+def invoice_etag(invoice, fmt):
+    """Strong ETag of the stored document, or None when it has not been rendered yet."""
+    digest = cache.get(etag_key(invoice, fmt))
+    if digest is None:
+        name, storage = document_name(invoice, fmt), invoice_storage()
+        if not storage.exists(name):
+            return None
+        with storage.open(name, 'rb') as f:
+            digest = hashlib.sha256(f.read()).hexdigest()
+        cache.set(etag_key(invoice, fmt), digest, None)
+    return f'"{digest}"'
+
+
+def invoice_document(invoice, fmt):
+    """
+    (content, etag) of an invoice rendered as `fmt`. Invoices do not change once
+    issued, so each format is rendered once, kept in storage under the invoice
+    number and read back from there afterwards. Renders are deterministic, so
+    a request that renders alongside another returns the same bytes it stored.
+    """
+    name, storage = document_name(invoice, fmt), invoice_storage()
+    if storage.exists(name):
+        with storage.open(name, 'rb') as f:
+            content = f.read()
+    else:
+        content = RENDERERS[fmt](invoice)
+        storage.save(name, ContentFile(content))
+    digest = hashlib.sha256(content).hexdigest()
+    cache.set(etag_key(invoice, fmt), digest, None)
+    return content, f'"{digest}"'
+
+
+class ZipSink:
+    """Write-only file object that hands back what zipfile wrote since the last drain()."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+def export_period(period, fmt='pdf'):
+    """
+    Yield a ZIP of every invoice issued in `period` (YYYYMM) as it is built, one
+    member at a time, so a month of invoices never sits in memory at once.
+    """
+    sink = ZipSink()
+    invoices = invoice_queryset().prefetch_related('line_items').filter(period=period).order_by('sequence')
+    with zipfile.ZipFile(sink, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for invoice in invoices.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            content, _ = invoice_document(invoice, fmt)
+            archive.writestr(f'{invoice.invoice_number}.{fmt}', content)
+            yield sink.drain()
+    yield sink.drain()
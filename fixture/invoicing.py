@@ -0,0 +1,112 @@
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Booking, Invoice, InvoiceLineItem, InvoiceSequence
+
+CENT = Decimal('0.01')
+# GST on services, in percent. Overridable with settings.INVOICE_TAX_RATE.
+DEFAULT_TAX_RATE = Decimal('18.00')
+BATCH_SIZE = 500
+
+
+def tax_rate():
+    return Decimal(getattr(settings, 'INVOICE_TAX_RATE', DEFAULT_TAX_RATE))
+
+
+def invoice_period(when=None):
+    return timezone.localtime(when).strftime('%Y%m')
+
+
+def invoice_number(period, sequence):
+    return f'INV-{period}-{sequence:06d}'
+
+
+def allocate_numbers(period, count=1):
+    """
+    Reserve the next `count` numbers of `period`'s sequence and return them as a
+    range. The counter row is bumped with one UPDATE, which holds its lock until
+    the surrounding transaction ends, so concurrent allocations queue rather than
+    collide. Call inside the transaction that creates the invoices: if it rolls
+    back, so does the allocation, and the sequence stays gap-free.
+    """
+    with transaction.atomic():
+        InvoiceSequence.objects.get_or_create(period=period)
+        InvoiceSequence.objects.filter(period=period).update(last_number=F('last_number') + count)
+        last = InvoiceSequence.objects.filter(period=period).values_list('last_number', flat=True).get()
+    return range(last - count + 1, last + 1)
+
+
+def line_item(description, unit_price, quantity=1, rate=None):
+    """An unsaved line with its amount and tax rounded to the paisa."""
+    rate = tax_rate() if rate is None else rate
+    amount = (Decimal(unit_price) * quantity).quantize(CENT, ROUND_HALF_UP)
+    return InvoiceLineItem(
+        description=description, quantity=quantity, unit_price=unit_price, tax_rate=rate,
+        amount=amount, tax_amount=(amount * rate / 100).quantize(CENT, ROUND_HALF_UP),
+    )
+
+
+def booking_line_items(booking):
+    if booking.service is None:
+        return [line_item("Home service", Decimal('0'))]
+    return [line_item(booking.service.name, booking.service.base_price)]
+
+
+def issue_invoices(bookings, when=None):
+    """
+    Invoice every booking in `bookings` (none may have an invoice yet) with
+    consecutive numbers from one allocation. Invoices and their line items are
+    each written with a single bulk_create. Returns the invoices.
+    """
+    if not bookings:
+        return []
+    period = invoice_period(when)
+    with transaction.atomic():
+        numbers = allocate_numbers(period, len(bookings))
+        invoices, lines = [], []
+        for booking, number in zip(bookings, numbers):
+            items = booking_line_items(booking)
+            subtotal = sum((item.amount for item in items), Decimal('0'))
+            tax = sum((item.tax_amount for item in items), Decimal('0'))
+            invoices.append(Invoice(
+                booking=booking, period=period, sequence=number, invoice_number=invoice_number(period, number),
+                subtotal=subtotal, tax_amount=tax, total_amount=subtotal + tax,
+            ))
+            lines.append(items)
+        Invoice.objects.bulk_create(invoices)
+        for invoice, items in zip(invoices, lines):
+            for item in items:
+                item.invoice = invoice
+        InvoiceLineItem.objects.bulk_create([item for items in lines for item in items])
+    return invoices
+
+
+def issue_invoice(booking):
+    """The booking's invoice, issuing it first if there is none."""
+    existing = Invoice.objects.filter(booking=booking).first()
+    if existing is not None:
+        return existing
+    return issue_invoices([booking])[0]
+
+
+def pending_bookings():
+    return Booking.objects.filter(status='COMPLETED', invoice__isnull=True).order_by('pk')
+
+
+def invoice_pending_bookings(batch_size=BATCH_SIZE):
+    """
+    Invoice every completed booking that has none, batch_size bookings per
+    transaction. Batches lock their bookings, so a booking being completed at
+    the same time gets exactly one invoice. Returns the number issued.
+    """
+    issued = 0
+    while True:
+        with transaction.atomic():
+            batch = list(pending_bookings().select_related('service').select_for_update(of=('self',))[:batch_size])
+            issued += len(issue_invoices(batch))
+        if len(batch) < batch_size:
+            return issued
@@ -0,0 +1,63 @@
+from django.db import transaction
+from django.utils import timezone
+
+from .availability import release_slot
+from .broker import publish_on_commit, status_event
+from .invoicing import issue_invoice
+from .models import Booking, JobTracking
+from .notifications import notify
+from .stats import record_job_completed
+
+# Allowed status moves. COMPLETED and CANCELLED are final.
+TRANSITIONS = {
+    'PENDING': ('CONFIRMED', 'CANCELLED'),
+    'CONFIRMED': ('PROCESSING', 'CANCELLED'),
+    'PROCESSING': ('COMPLETED', 'CANCELLED'),
+    'COMPLETED': (),
+    'CANCELLED': (),
+}
+
+
+class TransitionError(Exception):
+    pass
+
+
+def allowed_transitions(status):
+    return TRANSITIONS.get(status, ())
+
+
+def transition(booking, status):
+    """
+    Move `booking` from the status it was loaded with to `status`.
+
+    The move is one conditional UPDATE ... WHERE status = <loaded status>, so of
+    several requests racing from the same state exactly one wins; the others
+    raise TransitionError and leave the row alone. The winner runs the side
+    effects for the new state in the same transaction, which is what makes
+    them happen once per booking. Returns the booking with its new status.
+    """
+    current = booking.status
+    if status not in allowed_transitions(current):
+        raise TransitionError(f"A {current.lower()} booking cannot be marked {status.lower()}.")
+    now = timezone.now()
+    with transaction.atomic():
+        updated = Booking.objects.filter(pk=booking.pk, status=current).update(status=status, updated_at=now)
+        if not updated:
+            latest = Booking.objects.filter(pk=booking.pk).values_list('status', flat=True).first()
+            raise TransitionError(f"Booking #{booking.pk} was already moved to {(latest or 'deleted').lower()}.")
+        booking.status, booking.updated_at = status, now
+        on_entered(booking)
+    return booking
+
+
+def on_entered(booking):
+    """Side effects of arriving in a status; runs once, in the transition's transaction."""
+    if booking.status == 'COMPLETED':
+        record_job_completed(booking)
+        issue_invoice(booking)
+        JobTracking.objects.filter(booking=booking).update(status='ARRIVED', updated_at=booking.updated_at)
+    elif booking.status == 'CANCELLED':
+        release_slot(booking)
+    notify([booking.customer_id], f"Your booking #{booking.pk} is now {booking.get_status_display()}.")
+    publish_on_commit(booking.pk, 'status', status_event(booking.status, booking.get_status_display()))
+
@@ -0,0 +1,114 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, close_old_connections
+from django.utils import timezone
+
+from fixture.availability import SlotUnavailable, book_slot
+from fixture.models import Booking, Category, Service, ServiceProfessional, User
+
+RESULT_PREFIX = 'BENCH_RESULT '
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare concurrent booking throughput across database profiles (FIXTURE_DB). "
+        "SQLite profiles run against a scratch file; the postgres profile uses the "
+        "FIXTURE_DB_* settings, so point them at a stand-in database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--profiles', nargs='+', default=['sqlite-basic', 'sqlite'])
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--bookings', type=int, default=400, help="Bookings per thread.")
+        parser.add_argument('--worker', action='store_true', help="Run one benchmark against the current settings.")
+
+    def handle(self, *args, **options):
+        if options['worker']:
+            result = self.run_worker(options['threads'], options['bookings'])
+            self.stdout.write(RESULT_PREFIX + json.dumps(result))
+            return
+
+        manage = str(settings.BASE_DIR / 'manage.py')
+        with tempfile.TemporaryDirectory() as scratch:
+            for profile in options['profiles']:
+                env = dict(os.environ, FIXTURE_DB=profile)
+                if profile.startswith('sqlite'):
+                    env['FIXTURE_DB_NAME'] = os.path.join(scratch, f'{profile}.sqlite3')
+                subprocess.run([sys.executable, manage, 'migrate', '-v', '0'], env=env, check=True)
+                out = subprocess.run(
+                    [sys.executable, manage, 'bench_db_profiles', '--worker',
+                     '--threads', str(options['threads']), '--bookings', str(options['bookings'])],
+                    env=env, check=True, capture_output=True, text=True,
+                ).stdout
+                line = next(l for l in out.splitlines() if l.startswith(RESULT_PREFIX))
+                result = json.loads(line[len(RESULT_PREFIX):])
+                self.stdout.write(
+                    f"{profile:>12}: {result['bookings_per_second']:8.1f} bookings/s "
+                    f"({result['booked']} booked in {result['seconds']:.2f}s, "
+                    f"{result['lock_retries']} lock retries, {result['failed']} failed)"
+                )
+
+    def run_worker(self, threads, per_thread):
+        tag = f"bench{time.time_ns()}"
+        category = Category.objects.create(name=tag)
+        service = Service.objects.create(category=category, name=tag, base_price=10, duration=30)
+        customer = User.objects.create(username=f"{tag}-customer", is_customer=True)
+        # One professional per thread: threads compete for the database, not for slots.
+        pros = [
+            ServiceProfessional.objects.create(user=User.objects.create(username=f"{tag}-pro{i}", is_professional=True))
+            for i in range(threads)
+        ]
+        close_old_connections()
+
+        first_day = (timezone.now() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+        slots_per_day = 3 * 8  # three windows of eight 30-minute jobs
+        counters = {'booked': 0, 'lock_retries': 0, 'failed': 0}
+        lock = threading.Lock()
+        barrier = threading.Barrier(threads)
+
+        def work(pro):
+            booked = retries = failed = 0
+            barrier.wait()
+            for i in range(per_thread):
+                day = first_day + timedelta(days=i // slots_per_day)
+                window = ('Morning', 'Afternoon', 'Evening')[(i % slots_per_day) // 8]
+                for _ in range(100):
+                    try:
+                        book_slot(Booking(customer=customer, professional=pro, service=service, booking_date=day, time_slot=window))
+                        booked += 1
+                        break
+                    except SlotUnavailable:
+                        failed += 1
+                        break
+                    except OperationalError:
+                        retries += 1
+                        time.sleep(0.001)
+                else:
+                    failed += 1
+            close_old_connections()
+            with lock:
+                counters['booked'] += booked
+                counters['lock_retries'] += retries
+                counters['failed'] += failed
+
+        workers = [threading.Thread(target=work, args=(pro,)) for pro in pros]
+        started = time.perf_counter()
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        Booking.objects.filter(service=service).delete()
+        User.objects.filter(username__startswith=tag).delete()
+        category.delete()
+        return dict(counters, seconds=elapsed, bookings_per_second=counters['booked'] / elapsed)
@@ -0,0 +1,86 @@
+import itertools
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.urls import reverse
+
+from fixture.fulltext import KINDS, TABLE, available, doc_id
+from fixture.models import User
+from fixture.views import text_search
+
+SYLLABLES = ('ka', 'ri', 'lo', 'pe', 'tu', 'ma', 'sen', 'dor', 'vi', 'lan', 'shi', 'gor', 'pla', 'ex', 'mon', 'tri')
+# Ids well clear of real rows, so synthetic documents never collide with them.
+ID_OFFSET = 10_000_000
+
+
+def percentile(timings, fraction):
+    return timings[min(len(timings) - 1, int(len(timings) * fraction))]
+
+
+class Command(BaseCommand):
+    help = "Load-test the full-text JSON endpoint over a synthetic corpus. All rows are rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--documents', type=int, default=200_000)
+        parser.add_argument('--vocabulary', type=int, default=20_000)
+        parser.add_argument('--queries', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        if not available():
+            raise CommandError("Full-text search needs SQLite FTS5.")
+        rng = random.Random(options['seed'])
+        vocabulary = self.vocabulary(options['vocabulary'], rng)
+        # Zipf-like word frequencies, as in real text: a few words are everywhere.
+        # Cumulative weights spare choices() a pass over the vocabulary per call.
+        weights = list(itertools.accumulate(1 / rank for rank in range(1, len(vocabulary) + 1)))
+        with transaction.atomic():
+            self.seed(options['documents'], vocabulary, weights, rng)
+            user = User.objects.create_user(username=f"ftsbench{rng.randrange(1 << 30)}", password=None)
+            factory = RequestFactory()
+            for label, prefix in (("full words", False), ("prefix", True)):
+                self.run(label, factory, user, vocabulary, weights, options['queries'], prefix, rng)
+            transaction.set_rollback(True)
+
+    def vocabulary(self, size, rng):
+        words = set()
+        while len(words) < size:
+            words.add(''.join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+        return sorted(words)
+
+    def seed(self, count, vocabulary, weights, rng):
+        started = time.perf_counter()
+        kinds = list(KINDS)
+        rows = []
+        for i in range(count):
+            title = ' '.join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(1, 4)))
+            body = ' '.join(rng.choices(vocabulary, cum_weights=weights, k=rng.randint(10, 60)))
+            rows.append((doc_id(kinds[i % len(kinds)], ID_OFFSET + i), title, body))
+        with connection.cursor() as cursor:
+            cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+            cursor.execute(f"INSERT INTO {TABLE} ({TABLE}) VALUES ('optimize')")
+        self.stdout.write(f"Indexed {count} documents in {time.perf_counter() - started:.1f}s")
+
+    def run(self, label, factory, user, vocabulary, weights, queries, prefix, rng):
+        url = reverse('text_search')
+        timings, hits = [], []
+        for _ in range(queries):
+            words = rng.choices(vocabulary, cum_weights=weights, k=rng.randint(1, 3))
+            if prefix:
+                words[-1] = words[-1][:rng.randint(2, max(2, len(words[-1]) - 1))]
+            request = factory.get(url, {'q': ' '.join(words), 'prefix': '1' if prefix else '0', 'limit': 10})
+            request.user = user
+            started = time.perf_counter()
+            response = text_search(request)
+            timings.append(time.perf_counter() - started)
+            hits.append(response.content.count(b'"kind"'))
+        timings.sort()
+        self.stdout.write(
+            f"{label}: mean {statistics.mean(timings) * 1000:.2f} ms, "
+            f"p50 {percentile(timings, 0.5) * 1000:.2f} ms, p95 {percentile(timings, 0.95) * 1000:.2f} ms, "
+            f"p99 {percentile(timings, 0.99) * 1000:.2f} ms, {statistics.mean(hits):.1f} results per query"
+        )
@@ -0,0 +1,83 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from fixture.geo import geohash_encode, haversine_km, nearby_professionals
+from fixture.models import User, UserProfile, ServiceProfessional
+
+# Synthetic professionals are scattered over a box roughly the size of Bangalore.
+CENTER_LAT, CENTER_LON = 12.9716, 77.5946
+SPREAD_DEGREES = 0.5
+
+
+class Command(BaseCommand):
+    help = "Benchmark radius search over synthetic professionals. All rows are rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pros', type=int, default=100_000)
+        parser.add_argument('--queries', type=int, default=50)
+        parser.add_argument('--radius', type=float, default=5.0)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            points = self.seed(options['pros'], rng)
+            self.run(points, options['queries'], options['radius'], rng)
+            transaction.set_rollback(True)
+
+    def seed(self, count, rng):
+        started = time.perf_counter()
+        prefix = f"geobench{rng.randrange(1 << 30)}_"
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", password='!', is_professional=True, role='professional') for i in range(count)],
+            batch_size=5000,
+        )
+        points = [
+            (CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES), CENTER_LON + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES))
+            for _ in range(count)
+        ]
+        UserProfile.objects.bulk_create(
+            [
+                UserProfile(
+                    user=user, full_name=user.username, address='', latitude=round(lat, 6), longitude=round(lon, 6),
+                    geohash=geohash_encode(lat, lon),
+                )
+                for user, (lat, lon) in zip(users, points)
+            ],
+            batch_size=5000,
+        )
+        ServiceProfessional.objects.bulk_create([ServiceProfessional(user=user) for user in users], batch_size=5000)
+        self.stdout.write(f"Seeded {count} professionals in {time.perf_counter() - started:.1f}s")
+        return points
+
+    def run(self, points, queries, radius, rng):
+        indexed, scanned, found = [], [], []
+        for _ in range(queries):
+            lat = CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            lon = CENTER_LON + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+
+            started = time.perf_counter()
+            results = nearby_professionals(lat, lon, radius, limit=20)
+            indexed.append(time.perf_counter() - started)
+            found.append(len(results))
+
+            # Baseline: exact distance to every professional, no SQL pruning.
+            started = time.perf_counter()
+            sorted(d for d in haversine_km(lat, lon, points) if d <= radius)[:20]
+            scanned.append(time.perf_counter() - started)
+
+        self.report("indexed search", indexed)
+        self.report("full scan (in memory)", scanned)
+        self.stdout.write(f"Average results per query: {statistics.mean(found):.1f}")
+
+    def report(self, label, timings):
+        timings = sorted(timings)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label}: mean {statistics.mean(timings) * 1000:.2f} ms, "
+            f"p50 {statistics.median(timings) * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms"
+        )
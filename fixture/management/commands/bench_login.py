@@ -0,0 +1,86 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from fixture.benchmarks import scratch_database
+from fixture.hashers import calibrate_scrypt, time_hasher
+from fixture.instrumentation import percentile
+from fixture.models import User
+
+PASSWORD = 'correct horse battery staple'
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password hashing and login latency under each password profile (FIXTURE_PASSWORDS) "
+        "in a throwaway database, including the first login that rehashes a PBKDF2 password, "
+        "and optionally calibrate the scrypt work factor."
+    )
+
+    def add_arguments(self, parser):
+        profiles = list(settings.PASSWORD_HASHER_PROFILES)
+        parser.add_argument('--profiles', nargs='+', choices=profiles, default=profiles)
+        parser.add_argument('--logins', type=int, default=20, help="Logins per profile.")
+        parser.add_argument('--calibrate', type=float, metavar='MS',
+                            help="Also time scrypt work factors and pick the largest hashing within MS.")
+
+    def handle(self, *args, **options):
+        if options['logins'] < 1:
+            raise CommandError("--logins must be at least 1.")
+        with scratch_database():
+            self.stdout.write(f"{'profile':<10}{'hasher':<20}{'hash ms':>9}{'p50 ms':>9}{'p95 ms':>9}{'upgrade ms':>12}")
+            for profile in options['profiles']:
+                with override_settings(PASSWORD_HASHERS=self.hashers(profile)):
+                    self.report(profile, self.measure(profile, options['logins']))
+        if options['calibrate']:
+            results, work_factor = calibrate_scrypt(options['calibrate'])
+            self.stdout.write(self.style.MIGRATE_HEADING("\nscrypt, block size 8, parallelism 1"))
+            for factor, ms in results:
+                self.stdout.write(f"  n=2**{factor.bit_length() - 1:<4}{ms:>9.1f} ms")
+            self.stdout.write(self.style.SUCCESS(
+                f"Largest within {options['calibrate']:g} ms: FIXTURE_SCRYPT_WORK_FACTOR={work_factor}"
+            ))
+
+    def hashers(self, profile):
+        """The profile's hashers first, then every other one but MD5, as settings.password_hashers() orders them."""
+        preferred = settings.PASSWORD_HASHER_PROFILES[profile]
+        fast = settings.PASSWORD_HASHER_PROFILES['fast']
+        return preferred + [hasher for hasher in settings.PASSWORD_HASHERS if hasher not in preferred + fast]
+
+    def measure(self, profile, logins):
+        user = User.objects.create_user(username=f'bench-{profile}', password=PASSWORD)
+        client = Client()
+        url = reverse('login')
+        timings, failures = [], 0
+        for _ in range(logins):
+            started = time.perf_counter()
+            response = client.post(url, {'username': user.username, 'password': PASSWORD})
+            timings.append(time.perf_counter() - started)
+            failures += response.status_code != 302
+        # A password stored by the stock PBKDF2 hasher: the first login verifies it and rehashes.
+        user.password = make_password(PASSWORD, hasher='pbkdf2_sha256')
+        user.save(update_fields=['password'])
+        started = time.perf_counter()
+        Client().post(url, {'username': user.username, 'password': PASSWORD})
+        upgrade = time.perf_counter() - started
+        user.refresh_from_db(fields=['password'])
+        if failures or not user.password.startswith(f'{get_hasher().algorithm}$'):
+            raise CommandError(f"{profile}: {failures} failed logins, stored hash {user.password.split('$')[0]}")
+        return {
+            'hasher': get_hasher().algorithm,
+            'hash_ms': time_hasher(get_hasher()) * 1000,
+            'p50_ms': percentile(timings, 0.5) * 1000,
+            'p95_ms': percentile(timings, 0.95) * 1000,
+            'upgrade_ms': upgrade * 1000,
+        }
+
+    def report(self, profile, row):
+        self.stdout.write(
+            f"{profile:<10}{row['hasher']:<20}{row['hash_ms']:>9.1f}{row['p50_ms']:>9.1f}"
+            f"{row['p95_ms']:>9.1f}{row['upgrade_ms']:>12.1f}"
+        )
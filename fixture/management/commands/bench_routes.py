@@ -0,0 +1,77 @@
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from fixture.benchmarks import (
+    DEFAULT_TOLERANCE, baseline, benchmark_fixture, compare, load_baseline, routes, run_client, run_server,
+    save_baseline, scratch_database, uncovered,
+)
+from fixture.seeding import seed
+
+MODES = ('client', 'server')
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark every fixture route over seeded data in a throwaway database, through the test client "
+        "and/or a local threaded WSGI server, and save or compare JSON baselines."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=(*MODES, 'all'), default='all')
+        parser.add_argument('--requests', type=int, default=50, help="Requests per route.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight, server mode.")
+        parser.add_argument('--route', action='append', dest='routes', help="Only this URL name; repeatable.")
+        parser.add_argument('--customers', type=int, default=500)
+        parser.add_argument('--professionals', type=int, default=100)
+        parser.add_argument('--bookings', type=int, default=10_000)
+        parser.add_argument('--save', metavar='DIR', help="Write <DIR>/<mode>.json baselines.")
+        parser.add_argument('--compare', metavar='DIR', help="Fail on regressions against <DIR>/<mode>.json.")
+        parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+
+    def handle(self, *args, **options):
+        missing = uncovered()
+        if missing:
+            raise CommandError(f"Routes without a benchmark: {', '.join(sorted(missing))}")
+        modes = MODES if options['mode'] == 'all' else (options['mode'],)
+
+        with scratch_database():
+            regressions = self.run(modes, options)
+        if regressions:
+            raise CommandError("Regressions against the baseline:\n  " + '\n  '.join(regressions))
+
+    def run(self, modes, options):
+        counts = seed(customers=options['customers'], professionals=options['professionals'],
+                      bookings=options['bookings'], invoices=True)
+        self.stdout.write("Seeded " + ', '.join(f"{count} {kind}" for kind, count in counts.items()))
+        fixture = benchmark_fixture()
+        table = routes(fixture)
+        if options['routes']:
+            table = [route for route in table if route[0] in options['routes']]
+        regressions = []
+        for mode in modes:
+            if mode == 'client':
+                results = run_client(table, fixture, requests=options['requests'])
+            else:
+                results = run_server(table, fixture, requests=options['requests'], concurrency=options['concurrency'])
+            self.report(mode, results)
+            settings_used = {key: options[key] for key in ('requests', 'concurrency', 'customers', 'professionals', 'bookings')}
+            if options['save']:
+                path = Path(options['save']) / f'{mode}.json'
+                save_baseline(path, baseline(mode, results, settings_used))
+                self.stdout.write(f"Saved {path}")
+            if options['compare']:
+                path = Path(options['compare']) / f'{mode}.json'
+                if not path.exists():
+                    raise CommandError(f"No baseline at {path}")
+                regressions += [f"[{mode}] {message}" for message in compare(load_baseline(path), results, options['tolerance'])]
+        return regressions
+
+    def report(self, mode, results):
+        self.stdout.write(self.style.MIGRATE_HEADING(f"\n{mode}"))
+        self.stdout.write(f"{'route':<26}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'errors':>8}")
+        for row in results:
+            self.stdout.write(
+                f"{row['route']:<26}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}"
+                f"{row['p99_ms']:>9.2f}{row['queries']:>9.1f}{row['errors']:>8}"
+            )
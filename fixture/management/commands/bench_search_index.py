@@ -0,0 +1,104 @@
+import random
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from fixture.geo import geohash_encode
+from fixture.models import User, UserProfile, Category, Service, ServiceProfessional
+from fixture.search import PRICE_FACETS, RATING_FACETS, SORTS, rebuild_search_index, search
+
+CENTER_LAT, CENTER_LON = 12.9716, 77.5946
+SPREAD_DEGREES = 0.5
+
+
+class Command(BaseCommand):
+    help = "Load-test faceted search over synthetic professionals. All rows are rolled back afterwards."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pros', type=int, default=50_000)
+        parser.add_argument('--categories', type=int, default=12)
+        parser.add_argument('--services-per-category', type=int, default=5)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        with transaction.atomic():
+            categories = self.seed(options, rng)
+            started = time.perf_counter()
+            rows = rebuild_search_index()
+            self.stdout.write(f"Indexed {rows} rows in {time.perf_counter() - started:.1f}s")
+            if connection.vendor == 'sqlite':
+                connection.cursor().execute('ANALYZE')
+            self.run(categories, options['queries'], rng)
+            transaction.set_rollback(True)
+
+    def seed(self, options, rng):
+        started = time.perf_counter()
+        prefix = f"searchbench{rng.randrange(1 << 30)}_"
+        categories = Category.objects.bulk_create(
+            [Category(name=f"{prefix}cat{i}") for i in range(options['categories'])]
+        )
+        Service.objects.bulk_create([
+            Service(category=cat, name=f"{cat.name} service {j}", base_price=Decimal(rng.randrange(200, 6000)), duration=60)
+            for cat in categories for j in range(options['services_per_category'])
+        ])
+        users = User.objects.bulk_create(
+            [User(username=f"{prefix}{i}", password='!', is_professional=True, role='professional') for i in range(options['pros'])],
+            batch_size=5000,
+        )
+        profiles = []
+        for user in users:
+            lat = CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            lon = CENTER_LON + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES)
+            profiles.append(UserProfile(
+                user=user, full_name=user.username, address='', latitude=round(lat, 6), longitude=round(lon, 6),
+                geohash=geohash_encode(lat, lon),
+            ))
+        UserProfile.objects.bulk_create(profiles, batch_size=5000)
+        pros = []
+        for user in users:
+            count = rng.randrange(0, 40)
+            total = sum(rng.randint(1, 5) for _ in range(count))
+            pros.append(ServiceProfessional(
+                user=user, category=rng.choice(categories), rating_sum=total, rating_count=count,
+                rating=total / count if count else 0.0,
+                is_verified=rng.random() < 0.4, availability_status=rng.random() < 0.8,
+            ))
+        ServiceProfessional.objects.bulk_create(pros, batch_size=5000)
+        self.stdout.write(f"Seeded {len(users)} professionals in {time.perf_counter() - started:.1f}s")
+        return categories
+
+    def run(self, categories, queries, rng):
+        timings, totals = [], []
+        for _ in range(queries):
+            options = {
+                'category': rng.choice(categories + [None]),
+                'max_price': rng.choice(PRICE_FACETS + (None,)),
+                'min_rating': rng.choice(RATING_FACETS + (None,)),
+                'verified': rng.random() < 0.3,
+                'sort': rng.choice(list(SORTS)),
+                'page': rng.randint(1, 5),
+            }
+            if rng.random() < 0.3:
+                options['origin'] = (
+                    CENTER_LAT + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+                    CENTER_LON + rng.uniform(-SPREAD_DEGREES, SPREAD_DEGREES),
+                )
+                options['radius_km'] = rng.choice((2, 5, 10))
+            started = time.perf_counter()
+            page, facets = search(**options)
+            list(page)
+            timings.append(time.perf_counter() - started)
+            totals.append(page.paginator.count)
+
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"search + facets: mean {statistics.mean(timings) * 1000:.2f} ms, "
+            f"p50 {statistics.median(timings) * 1000:.2f} ms, p95 {p95 * 1000:.2f} ms"
+        )
+        self.stdout.write(f"Average matches per query: {statistics.mean(totals):.0f}")
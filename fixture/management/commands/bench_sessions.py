@@ -0,0 +1,52 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+
+from fixture.benchmarks import benchmark_fixture, routes, run_client, run_server, scratch_database
+from fixture.seeding import seed
+
+# Authenticated pages that read the session and little else, so its cost shows.
+ROUTES = ('customer_bookings', 'notifications', 'profile_view', 'dashboard')
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare authenticated page throughput under each session profile (FIXTURE_SESSIONS) "
+        "over seeded data in a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        profiles = list(settings.SESSION_PROFILES)
+        parser.add_argument('--profiles', nargs='+', choices=profiles, default=profiles)
+        parser.add_argument('--mode', choices=('client', 'server'), default='server')
+        parser.add_argument('--requests', type=int, default=200, help="Requests per route.")
+        parser.add_argument('--concurrency', type=int, default=8, help="Requests in flight, server mode.")
+        parser.add_argument('--bookings', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['requests'] < 1:
+            raise CommandError("--requests must be at least 1.")
+        with scratch_database() as workdir:
+            seed(customers=200, professionals=50, bookings=options['bookings'], invoices=True)
+            fixture = benchmark_fixture()
+            table = [route for route in routes(fixture) if route[0] in ROUTES]
+            self.stdout.write(f"{'profile':<16}{'route':<20}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'queries':>9}")
+            for profile in options['profiles']:
+                overrides = dict(settings.SESSION_PROFILES[profile])
+                if profile == 'file':
+                    overrides['SESSION_FILE_PATH'] = str(workdir)
+                caches['sessions'].clear()
+                with override_settings(**overrides):
+                    if options['mode'] == 'client':
+                        results = run_client(table, fixture, requests=options['requests'])
+                    else:
+                        results = run_server(table, fixture, requests=options['requests'],
+                                             concurrency=options['concurrency'])
+                for row in results:
+                    self.stdout.write(
+                        f"{profile:<16}{row['route']:<20}{row['rps']:>9.1f}{row['p50_ms']:>9.2f}"
+                        f"{row['p95_ms']:>9.2f}{row['queries']:>9.1f}"
+                    )
+                total = sum(row['requests'] for row in results) / sum(row['requests'] / row['rps'] for row in results)
+                self.stdout.write(self.style.SUCCESS(f"{profile:<16}{'all':<20}{total:>9.1f}"))
@@ -0,0 +1,153 @@
+import asyncio
+import statistics
+import time
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.urls import reverse
+
+from fixture.benchmarks import scratch_database
+from fixture.broker import booking_topic, broker, position_event
+from fixture.models import Booking, Category, ServiceProfessional, User
+
+
+def rss_mb():
+    """Resident set size of this process, from /proc where available."""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except OSError:
+        return float('nan')
+    return pages * 4096 / 1024 / 1024
+
+
+class Subscriber:
+    """One simulated EventSource: an ASGI http connection that stays open until told to leave."""
+
+    def __init__(self, app, scope):
+        self.app = app
+        self.scope = scope
+        self.requested = False
+        self.leave = asyncio.Event()
+        self.opened = asyncio.Event()
+        self.received = asyncio.Event()
+        self.status = None
+
+    async def receive(self):
+        if not self.requested:
+            self.requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await self.leave.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(self, message):
+        if message['type'] == 'http.response.start':
+            self.status = message['status']
+            if self.status != 200:
+                # Not a stream: nothing more will come, so stop whoever waits for it.
+                self.opened.set()
+        elif message['type'] == 'http.response.body':
+            body = message.get('body', b'')
+            if b'event: status' in body:
+                self.opened.set()
+            if b'event: position' in body:
+                self.received.set()
+
+    async def run(self):
+        await self.app(self.scope, self.receive, self.send)
+
+
+class Command(BaseCommand):
+    help = (
+        "Hold N idle Server-Sent Events subscribers open on one ASGI application in this process, "
+        "then time a fan-out to all of them, against one booking in a throwaway database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--subscribers', type=int, default=5000)
+        parser.add_argument('--publishes', type=int, default=10)
+        parser.add_argument('--wave', type=int, default=100, help="Streams opened concurrently.")
+        parser.add_argument('--idle', type=float, default=5.0, help="Seconds to hold the idle connections.")
+        parser.add_argument('--timeout', type=float, default=30.0, help="Seconds to wait for a wave or a fan-out.")
+
+    def handle(self, *args, **options):
+        with scratch_database():
+            booking, session_key = self.fixture()
+            asyncio.run(self.bench(booking, session_key, options))
+
+    def fixture(self):
+        customer = User.objects.create_user(username="ssebench-customer", password=None, is_customer=True)
+        pro_user = User.objects.create_user(username="ssebench-pro", password=None, is_professional=True)
+        category = Category.objects.create(name="Bench")
+        pro = ServiceProfessional.objects.create(user=pro_user, category=category)
+        booking = Booking.objects.create(customer=customer, professional=pro, status='CONFIRMED')
+        # force_login goes through the configured session engine and auth backend.
+        client = Client()
+        client.force_login(customer)
+        return booking, client.cookies[settings.SESSION_COOKIE_NAME].value
+
+    async def wait(self, waiters, what, timeout):
+        try:
+            await asyncio.wait_for(asyncio.gather(*waiters), timeout)
+        except TimeoutError:
+            raise CommandError(f"Gave up after {timeout:.0f}s waiting for {what}.") from None
+
+    async def bench(self, booking, session_key, options):
+        app = ASGIHandler()
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'scheme': 'http',
+            'method': 'GET', 'path': reverse('tracking_events', args=[booking.pk]), 'query_string': b'',
+            'headers': [(b'host', b'testserver'), (b'cookie', f'{settings.SESSION_COOKIE_NAME}={session_key}'.encode())],
+            'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        }
+        count = options['subscribers']
+        baseline = rss_mb()
+
+        started = time.perf_counter()
+        subscribers, tasks = [], []
+        # Clients arrive in waves, as after a deploy, rather than all in the same instant.
+        for start in range(0, count, options['wave']):
+            wave = [Subscriber(app, scope) for _ in range(min(options['wave'], count - start))]
+            tasks.extend(asyncio.create_task(subscriber.run()) for subscriber in wave)
+            await self.wait((subscriber.opened.wait() for subscriber in wave), "streams to open", options['timeout'])
+            refused = {subscriber.status for subscriber in wave} - {200}
+            if refused:
+                for subscriber in subscribers + wave:
+                    subscriber.leave.set()
+                await asyncio.gather(*tasks, return_exceptions=True)
+                raise CommandError(f"Streams were answered with status {sorted(refused)}, not 200.")
+            subscribers.extend(wave)
+        opened = time.perf_counter() - started
+        held = broker.subscriber_count(booking_topic(booking.pk))
+        self.stdout.write(
+            f"Opened {count} streams in {opened:.1f}s ({count / opened:.0f}/s); "
+            f"{held} subscribed; RSS +{rss_mb() - baseline:.1f} MB "
+            f"({(rss_mb() - baseline) * 1024 / count:.1f} KB per stream)"
+        )
+
+        await asyncio.sleep(options['idle'])
+        alive = sum(not task.done() for task in tasks)
+        self.stdout.write(f"After {options['idle']:.0f}s idle: {alive} of {count} streams still open")
+
+        timings = []
+        for _ in range(options['publishes']):
+            for subscriber in subscribers:
+                subscriber.received.clear()
+            sent = time.perf_counter()
+            broker.publish(booking_topic(booking.pk), 'position', position_event(12.97, 77.59, booking.created_at))
+            await self.wait((subscriber.received.wait() for subscriber in subscribers), "a fan-out", options['timeout'])
+            timings.append(time.perf_counter() - sent)
+        self.stdout.write(
+            f"Fan-out to {count} subscribers: mean {statistics.mean(timings) * 1000:.1f} ms, "
+            f"max {max(timings) * 1000:.1f} ms"
+        )
+
+        for subscriber in subscribers:
+            subscriber.leave.set()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        statuses = {subscriber.status for subscriber in subscribers}
+        self.stdout.write(self.style.SUCCESS(
+            f"Closed all streams; {broker.subscriber_count()} subscriptions left; response statuses {sorted(statuses)}"
+        ))
@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+
+from fixture.models import User, Category, ServiceProfessional
+from fixture.thumbnails import generate
+
+UPLOAD_DIRS = ('pro_pics', 'profile_pics', 'category_icons')
+
+
+def stored_images(dirs):
+    """Image names referenced by the database plus every file under the upload dirs."""
+    names = set()
+    for model, field in ((User, 'profile_picture'), (ServiceProfessional, 'profile_picture'), (Category, 'icon')):
+        names.update(model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list(field, flat=True))
+    for directory in dirs:
+        if default_storage.exists(directory):
+            names.update(f'{directory}/{name}' for name in default_storage.listdir(directory)[1])
+    return sorted(name for name in names if default_storage.exists(name))
+
+
+class Command(BaseCommand):
+    help = "Generate missing thumbnail derivatives for uploaded profile pictures and category icons."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dirs', nargs='+', default=list(UPLOAD_DIRS), help="Upload directories to scan.")
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        names = stored_images(options['dirs'])
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            futures = {name: pool.submit(generate, name) for name in names}
+            for name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{name}: {exc}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Built thumbnails for {len(names) - failed} of {len(names)} images in {time.perf_counter() - started:.2f}s"
+        ))
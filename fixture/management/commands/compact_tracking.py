@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from fixture.models import Booking
+from fixture.tracking import compact_trail, tolerance_m
+
+
+class Command(BaseCommand):
+    help = "Re-simplify the stored location trails of completed and cancelled bookings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tolerance', type=float, default=None, help="Metres; defaults to TRACKING_TOLERANCE_M.")
+
+    def handle(self, *args, **options):
+        tolerance = options['tolerance'] if options['tolerance'] is not None else tolerance_m()
+        bookings = (
+            Booking.objects.filter(status__in=['COMPLETED', 'CANCELLED'], tracking_points__isnull=False)
+            .distinct().values_list('pk', flat=True)
+        )
+        trails = deleted = 0
+        for booking_id in bookings.iterator():
+            deleted += compact_trail(booking_id, tolerance)
+            trails += 1
+        self.stdout.write(self.style.SUCCESS(f"Compacted {trails} trails, deleted {deleted} points"))
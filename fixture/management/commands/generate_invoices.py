@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from fixture.invoicing import BATCH_SIZE, invoice_pending_bookings
+
+
+class Command(BaseCommand):
+    help = "Issue invoices for completed bookings that have none, in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        issued = invoice_pending_bookings(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Issued {issued} invoices"))
@@ -0,0 +1,28 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from fixture.sessions import DEFAULT_BATCH_SIZE, purge_expired
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches, each in its own transaction, so a large backlog "
+        "does not hold the database write lock. Run it periodically, e.g. hourly from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument('--pause', type=float, default=0.0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        started = time.perf_counter()
+        deleted = purge_expired(batch_size=options['batch_size'], pause=options['pause'])
+        elapsed = time.perf_counter() - started
+        if deleted is None:
+            self.stdout.write(f"No session table; ran {settings.SESSION_ENGINE}'s own clear_expired() in {elapsed:.2f}s")
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions in {elapsed:.2f}s"))
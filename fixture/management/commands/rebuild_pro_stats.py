@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fixture.stats import rebuild_professional_stats
+
+
+class Command(BaseCommand):
+    help = "Recompute rating, job and rehire aggregates on every ServiceProfessional from bookings and reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        updated = rebuild_professional_stats(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt stats for {updated} professionals in {time.perf_counter() - started:.2f}s"
+        ))
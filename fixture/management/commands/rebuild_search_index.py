@@ -0,0 +1,16 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from fixture.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the professional search index from professionals, services and profiles."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        written = rebuild_search_index()
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {written} professional/service rows in {time.perf_counter() - started:.2f}s"
+        ))
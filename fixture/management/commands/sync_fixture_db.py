@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from fixture.sync import BATCH_SIZE, sync_databases
+
+
+class Command(BaseCommand):
+    help = "Copy changed fixture rows from another SQLite database into this project's database."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'home' / 'db.sqlite3'))
+        parser.add_argument('--target', default=str(settings.DATABASES['default']['NAME']))
+        parser.add_argument('--tables', nargs='+', help="Limit the sync to these tables (default: every fixture table).")
+        parser.add_argument('--dry-run', action='store_true', help="Report the diff without writing anything.")
+        parser.add_argument('--prune', action='store_true', help="Delete target rows that no longer exist in the source.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+        parser.add_argument(
+            '--full', action='store_true',
+            help="Compare every row, ignoring the updated_at watermark left by the last sync from this source.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        verbose = options['verbosity'] > 1
+        reports = sync_databases(
+            options['source'], options['target'],
+            tables=options['tables'],
+            dry_run=options['dry_run'],
+            prune=options['prune'],
+            batch_size=options['batch_size'],
+            keep_ids=20 if verbose else 0,
+            full=options['full'],
+        )
+        elapsed = time.perf_counter() - started
+
+        prefix = "[dry run] " if options['dry_run'] else ""
+        for r in reports:
+            rate = r.scanned / r.seconds if r.seconds else 0
+            self.stdout.write(
+                f"{prefix}{r.table}: {r.inserted} new, {r.updated} changed, {r.unchanged} unchanged, "
+                f"{r.deleted} deleted ({r.scanned} rows in {r.seconds:.2f}s, {rate:,.0f} rows/s)"
+            )
+            if verbose and r.changed_ids:
+                self.stdout.write(f"    changed ids: {', '.join(map(str, r.changed_ids))}")
+
+        scanned = sum(r.scanned for r in reports)
+        written = sum(r.inserted + r.updated + r.deleted for r in reports)
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}Synced {len(reports)} tables: {written} rows written, {scanned} scanned "
+            f"in {elapsed:.2f}s ({scanned / elapsed if elapsed else 0:,.0f} rows/s)"
+        ))
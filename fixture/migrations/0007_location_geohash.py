@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:42
+
+from django.db import migrations, models
+
+from fixture.geo import geohash_encode
+
+
+def backfill_geohash(apps, schema_editor):
+    for model_name in ('UserProfile', 'JobTracking'):
+        model = apps.get_model('fixture', model_name)
+        rows = model.objects.filter(latitude__isnull=False, longitude__isnull=False).only('id', 'latitude', 'longitude')
+        batch = []
+        for row in rows.iterator():
+            row.geohash = geohash_encode(row.latitude, row.longitude)
+            batch.append(row)
+        model.objects.bulk_update(batch, ['geohash'], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0006_booking_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='jobtracking',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.AddField(
+            model_name='userprofile',
+            name='geohash',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=12, null=True),
+        ),
+        migrations.RunPython(backfill_geohash, migrations.RunPython.noop),
+    ]
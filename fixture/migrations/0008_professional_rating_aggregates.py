@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0007_location_geohash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='serviceprofessional',
+            name='customer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprofessional',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprofessional',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='serviceprofessional',
+            name='repeat_customer_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='serviceprofessional',
+            name='safety_score',
+            field=models.FloatField(db_index=True, default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprofessional',
+            index=models.Index(fields=['category', '-safety_score'], name='pro_category_score_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0008_professional_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlotReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('start_minute', models.PositiveSmallIntegerField(help_text='Minutes past midnight')),
+                ('booking', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_reservations', to='fixture.booking')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_reservations', to='fixture.serviceprofessional')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('professional', 'date', 'start_minute'), name='unique_professional_slot')],
+            },
+        ),
+    ]
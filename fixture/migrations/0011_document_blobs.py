@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:13
+
+import fixture.documents
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0010_notification_inbox_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='professionaldocuments',
+            name='content_type',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='professionaldocuments',
+            name='file_size',
+            field=models.PositiveBigIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='professionaldocuments',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='professionaldocuments',
+            name='document_file',
+            field=models.FileField(max_length=255, storage=fixture.documents.document_storage, upload_to=fixture.documents.document_path),
+        ),
+    ]
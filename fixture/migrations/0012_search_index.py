@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:32
+
+import math
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_search_index(apps, schema_editor):
+    SearchEntry = apps.get_model('fixture', 'SearchEntry')
+    Service = apps.get_model('fixture', 'Service')
+    ServiceProfessional = apps.get_model('fixture', 'ServiceProfessional')
+    UserProfile = apps.get_model('fixture', 'UserProfile')
+    services = {}
+    for service in Service.objects.filter(is_active=True):
+        services.setdefault(service.category_id, []).append(service)
+    located = {
+        row[0]: row[1:] for row in UserProfile.objects.values_list('user_id', 'latitude', 'longitude', 'geohash')
+    }
+    entries = []
+    for pro in ServiceProfessional.objects.filter(category__isnull=False).iterator():
+        lat, lon, geohash = located.get(pro.user_id, (None, None, None))
+        for service in services.get(pro.category_id, ()):
+            entries.append(SearchEntry(
+                professional_id=pro.id, service_id=service.id, category_id=service.category_id,
+                price=service.base_price, rating=pro.safety_score, stars=math.floor(pro.safety_score),
+                rating_count=pro.rating_count,
+                is_verified=pro.is_verified, is_available=pro.availability_status,
+                latitude=lat, longitude=lon, geohash=geohash,
+            ))
+    SearchEntry.objects.bulk_create(entries, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0011_document_blobs'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('rating', models.FloatField(default=0.0)),
+                ('stars', models.PositiveSmallIntegerField(default=0)),
+                ('rating_count', models.PositiveIntegerField(default=0)),
+                ('is_verified', models.BooleanField(default=False)),
+                ('is_available', models.BooleanField(default=True)),
+                ('latitude', models.DecimalField(decimal_places=6, max_digits=9, null=True)),
+                ('longitude', models.DecimalField(decimal_places=6, max_digits=9, null=True)),
+                ('geohash', models.CharField(db_index=True, max_length=12, null=True)),
+                ('category', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='fixture.category')),
+                ('professional', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='fixture.serviceprofessional')),
+                ('service', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_entries', to='fixture.service')),
+            ],
+            options={
+                'indexes': [models.Index(condition=models.Q(('is_available', True)), fields=['category', 'stars', 'price', 'is_verified'], name='search_facet_idx'), models.Index(condition=models.Q(('is_available', True)), fields=['category', '-rating', 'price', 'id'], name='search_category_rating_idx'), models.Index(condition=models.Q(('is_available', True)), fields=['-rating', 'price', 'id'], name='search_rating_idx'), models.Index(condition=models.Q(('is_available', True)), fields=['price', '-rating', 'id'], name='search_price_idx'), models.Index(condition=models.Q(('is_available', True)), fields=['-price', '-rating', 'id'], name='search_price_desc_idx'), models.Index(fields=['service', '-rating'], name='search_service_rating_idx')],
+                'constraints': [models.UniqueConstraint(fields=('professional', 'service'), name='unique_search_entry')],
+            },
+        ),
+        migrations.RunPython(backfill_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+from django.db import migrations
+
+# Frozen copies of fixture.fulltext.TABLE / KINDS / doc_id(): migrations
+# must not change when the runtime module does.
+TABLE = 'fixture_fulltext'
+KINDS = {'service': 1, 'category': 2, 'professional': 3}
+
+
+def create_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    Category = apps.get_model('fixture', 'Category')
+    Service = apps.get_model('fixture', 'Service')
+    ServiceProfessional = apps.get_model('fixture', 'ServiceProfessional')
+    rows = [
+        ((pk << 2) | KINDS['service'], name, description or '')
+        for pk, name, description in Service.objects.values_list('pk', 'name', 'description')
+    ] + [
+        ((pk << 2) | KINDS['category'], name, description or '')
+        for pk, name, description in Category.objects.values_list('pk', 'name', 'description')
+    ] + [
+        ((pk << 2) | KINDS['professional'], username, bio or '')
+        for pk, username, bio in ServiceProfessional.objects.values_list('pk', 'user__username', 'bio')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE} USING fts5("
+            "title, body, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+        )
+        cursor.executemany(f"INSERT INTO {TABLE} (rowid, title, body) VALUES (%s, %s, %s)", rows)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f"DROP TABLE IF EXISTS {TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0012_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
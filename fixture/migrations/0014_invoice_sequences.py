@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_subtotals(apps, schema_editor):
+    # Older invoices carried only a total, with no tax split out.
+    Invoice = apps.get_model('fixture', 'Invoice')
+    Invoice.objects.update(subtotal=F('total_amount'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0013_fulltext_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='InvoiceLineItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.CharField(max_length=200)),
+                ('quantity', models.PositiveIntegerField(default=1)),
+                ('unit_price', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('tax_rate', models.DecimalField(decimal_places=2, default=0, help_text='Percent', max_digits=5)),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('tax_amount', models.DecimalField(decimal_places=2, max_digits=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='InvoiceSequence',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.CharField(help_text='YYYYMM', max_length=6, unique=True)),
+                ('last_number', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='period',
+            field=models.CharField(blank=True, max_length=6, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='sequence',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddField(
+            model_name='invoice',
+            name='tax_amount',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=10),
+        ),
+        migrations.AddConstraint(
+            model_name='invoice',
+            constraint=models.UniqueConstraint(fields=('period', 'sequence'), name='unique_invoice_sequence'),
+        ),
+        migrations.AddField(
+            model_name='invoicelineitem',
+            name='invoice',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='line_items', to='fixture.invoice'),
+        ),
+        migrations.RunPython(backfill_subtotals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0014_invoice_sequences'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrackingPoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField()),
+                ('lat_e6', models.IntegerField()),
+                ('lon_e6', models.IntegerField()),
+                ('booking', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='tracking_points', to='fixture.booking')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['booking', 'recorded_at'], name='tracking_point_trail_idx')],
+            },
+        ),
+    ]
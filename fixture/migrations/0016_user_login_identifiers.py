@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:56
+
+import re
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import Lower
+
+# Frozen copy of fixture.accounts.normalize_phone(): migrations must not
+# change when the runtime module does.
+COUNTRY_CODE = '91'
+PHONE_SEPARATORS = re.compile(r'[\s\-().+]')
+MIN_PHONE_DIGITS, MAX_PHONE_DIGITS = 7, 15
+
+
+def normalize_phone(value):
+    if not value:
+        return None
+    digits = PHONE_SEPARATORS.sub('', value)
+    if not digits.isdigit() or not MIN_PHONE_DIGITS <= len(digits) <= MAX_PHONE_DIGITS:
+        return None
+    if len(digits) == 12 and digits.startswith(COUNTRY_CODE):
+        return digits[2:]
+    if len(digits) == 11 and digits.startswith('0'):
+        return digits[1:]
+    return digits
+
+
+def normalize_identifiers(apps, schema_editor):
+    """
+    Store phone numbers in canonical form, and blank ones as NULL, then refuse
+    to go on while two accounts share an email or phone number: which one
+    keeps it is for a person to decide.
+    """
+    User = apps.get_model('fixture', 'User')
+    batch = []
+    for user in User.objects.filter(phone_number__isnull=False).only('id', 'phone_number').iterator(chunk_size=2000):
+        phone = normalize_phone(user.phone_number) or user.phone_number.strip() or None
+        if phone != user.phone_number:
+            user.phone_number = phone
+            batch.append(user)
+        if len(batch) >= 1000:
+            User.objects.bulk_update(batch, ['phone_number'])
+            batch = []
+    User.objects.bulk_update(batch, ['phone_number'])
+
+    shared = [
+        f"email {row['value']} ({row['count']} accounts)"
+        for row in User.objects.exclude(email='').values(value=Lower('email')).annotate(count=Count('id')).filter(count__gt=1)
+    ] + [
+        f"phone {row['value']} ({row['count']} accounts)"
+        for row in User.objects.filter(phone_number__isnull=False).values(value=F('phone_number'))
+        .annotate(count=Count('id')).filter(count__gt=1)
+    ]
+    if shared:
+        raise RuntimeError("Accounts share a login identifier; resolve these first:\n  " + '\n  '.join(shared))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('fixture', '0015_tracking_points'),
+    ]
+
+    operations = [
+        migrations.RunPython(normalize_identifiers, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='unique_user_email'),
+        ),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(fields=('phone_number',), name='unique_user_phone'),
+        ),
+    ]
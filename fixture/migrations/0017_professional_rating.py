@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:23
+
+from django.db import migrations, models
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+
+def copy_ratings(apps, schema_editor):
+    """The mean rating used to be kept in safety_score; derive it from the aggregates instead."""
+    ServiceProfessional = apps.get_model('fixture', 'ServiceProfessional')
+    ServiceProfessional.objects.filter(rating_count__gt=0).update(
+        rating=Cast(F('rating_sum'), FloatField()) / F('rating_count'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('fixture', '0016_user_login_identifiers'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='serviceprofessional',
+            name='pro_category_score_idx',
+        ),
+        migrations.AddField(
+            model_name='serviceprofessional',
+            name='rating',
+            field=models.FloatField(db_index=True, default=0.0, editable=False),
+        ),
+        migrations.RunPython(copy_ratings, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='serviceprofessional',
+            name='safety_score',
+            field=models.FloatField(default=0.0),
+        ),
+        migrations.AddIndex(
+            model_name='serviceprofessional',
+            index=models.Index(fields=['category', '-rating'], name='pro_category_rating_idx'),
+        ),
+    ]
@@ -1,8 +1,13 @@
 from django.contrib.auth.models import AbstractUser
-from django.db import models
+from django.db import models, transaction
+from django.db.models.functions import Lower
 from django.conf import settings
 from django.utils import timezone
 
+from .accounts import normalize_phone
+from .documents import document_path, document_storage, sniff_file
+from .geo import geohash_encode
+
 class User(AbstractUser):
     ROLE_CHOICES = [
         ('customer', 'Customer'),
@@ -18,9 +23,20 @@ class User(AbstractUser):
     terms_accepted = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
 
+    class Meta(AbstractUser.Meta):
+        # Email and phone log people in (fixture.backends), so each names one
+        # account. Emails compare case-insensitively; blank ones are not unique.
+        constraints = [
+            models.UniqueConstraint(Lower('email'), name='unique_user_email', condition=~models.Q(email='')),
+            models.UniqueConstraint(fields=['phone_number'], name='unique_user_phone'),
+        ]
+
     def save(self, *args, **kwargs):
         if self.is_superuser:
             self.role = 'admin'
+        self.email = (self.email or '').strip()
+        # Canonical digits, or NULL when blank: NULLs never collide in the unique index.
+        self.phone_number = normalize_phone(self.phone_number) or (self.phone_number or '').strip() or None
         super().save(*args, **kwargs)
 
 class UserProfile(models.Model):
@@ -31,6 +47,11 @@ class UserProfile(models.Model):
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     city = models.CharField(max_length=100, blank=True, null=True)
     pincode = models.CharField(max_length=6, blank=True, null=True)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True, editable=False)
+
+    def save(self, *args, **kwargs):
+        self.geohash = geohash_encode(self.latitude, self.longitude) if self.latitude is not None and self.longitude is not None else None
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"Profile for {self.user.username}"
@@ -68,10 +89,56 @@ class ServiceProfessional(models.Model):
     rehire_percentage = models.FloatField(default=0.0)
     is_verified = models.BooleanField(default=False)
     profile_picture = models.ImageField(upload_to='pro_pics/', blank=True, null=True)
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+    customer_count = models.PositiveIntegerField(default=0, editable=False)
+    repeat_customer_count = models.PositiveIntegerField(default=0, editable=False)
+    # Mean review rating, maintained from rating_sum / rating_count by fixture.stats.
+    rating = models.FloatField(default=0.0, db_index=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['category', '-rating'], name='pro_category_rating_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.category.name if self.category else 'No Category'}"
 
+class SearchEntry(models.Model):
+    """
+    Denormalised search row, one per professional and active service in their
+    category. Maintained by fixture.search so search and facet counts never join.
+    """
+    professional = models.ForeignKey(ServiceProfessional, on_delete=models.CASCADE, related_name='search_entries')
+    service = models.ForeignKey(Service, on_delete=models.CASCADE, related_name='search_entries')
+    category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name='search_entries')
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    rating = models.FloatField(default=0.0)
+    # Whole stars (floor of rating), so facet counts group on a handful of values.
+    stars = models.PositiveSmallIntegerField(default=0)
+    rating_count = models.PositiveIntegerField(default=0)
+    is_verified = models.BooleanField(default=False)
+    is_available = models.BooleanField(default=True)
+    latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True)
+    longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True)
+    geohash = models.CharField(max_length=12, null=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['professional', 'service'], name='unique_search_entry'),
+        ]
+        # Searches only ever look at available rows, so the search indexes are
+        # partial; the facet index covers every column the facet counts read.
+        indexes = [
+            models.Index(fields=['category', 'stars', 'price', 'is_verified'], name='search_facet_idx', condition=models.Q(is_available=True)),
+            # One per sort order in fixture.search.SORTS, tie-breakers included, so a page is an index walk.
+            models.Index(fields=['category', '-rating', 'price', 'id'], name='search_category_rating_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['-rating', 'price', 'id'], name='search_rating_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['price', '-rating', 'id'], name='search_price_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['-price', '-rating', 'id'], name='search_price_desc_idx', condition=models.Q(is_available=True)),
+            models.Index(fields=['service', '-rating'], name='search_service_rating_idx'),
+        ]
+
 class ProfessionalDocuments(models.Model):
     DOC_TYPES = [
         ('ID', 'Identity Document'),
@@ -85,10 +152,60 @@ class ProfessionalDocuments(models.Model):
     ]
     professional = models.ForeignKey(ServiceProfessional, on_delete=models.CASCADE, related_name='documents')
     document_type = models.CharField(max_length=20, choices=DOC_TYPES)
-    document_file = models.FileField(upload_to='pro_documents/')
+    # Blobs are stored once per content hash and shared by every row that uploaded them.
+    document_file = models.FileField(upload_to=document_path, storage=document_storage, max_length=255)
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, editable=False)
+    file_size = models.PositiveBigIntegerField(null=True, editable=False)
+    content_type = models.CharField(max_length=100, blank=True, editable=False)
     verification_status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='PENDING')
     uploaded_at = models.DateTimeField(auto_now_add=True)
 
+    def save(self, *args, **kwargs):
+        upload = None
+        if self.document_file and not self.document_file._committed:
+            upload = self.document_file.file
+            self.sha256 = getattr(upload, 'sha256', None)
+            self.content_type = getattr(upload, 'sniffed_content_type', None)
+            if not self.sha256:
+                self.sha256, self.content_type = sniff_file(upload)
+            self.content_type = self.content_type or ''
+            self.file_size = upload.size
+        super().save(*args, **kwargs)
+        if upload is not None:
+            # The blob may have been shared with a row whose deletion released it
+            # before this one committed; saving again is a no-op unless it is gone.
+            name = self.document_file.name
+            transaction.on_commit(lambda: self.document_file.storage.save(name, upload))
+
+class BookingQuerySet(models.QuerySet):
+    """Named loading profiles for bookings so listing pages stay at a fixed query count."""
+
+    # Relations rendered on every booking row (list pages, dashboard, admin changelist).
+    LIST_RELATED = (
+        'customer', 'service__category', 'professional__user',
+        'professional__category', 'payment', 'review',
+    )
+    LIST_FIELDS = (
+        'id', 'booking_date', 'time_slot', 'service_address', 'status', 'created_at', 'updated_at',
+        'customer__id', 'customer__username', 'customer__phone_number',
+        'service__id', 'service__name', 'service__base_price',
+        'service__category__id', 'service__category__name',
+        'professional__id', 'professional__user__id', 'professional__user__username',
+        'professional__category__id', 'professional__category__name',
+        'payment__id', 'payment__payment_status',
+        'review__id', 'review__rating',
+    )
+    # Single booking pages additionally show tracking, invoice and complaints.
+    DETAIL_RELATED = LIST_RELATED + ('invoice', 'tracking')
+    DETAIL_PREFETCH = ('complaints',)
+
+    def for_list(self):
+        return self.select_related(*self.LIST_RELATED).only(*self.LIST_FIELDS)
+
+    def for_detail(self):
+        return self.select_related(*self.DETAIL_RELATED).prefetch_related(*self.DETAIL_PREFETCH)
+
+
 class Booking(models.Model):
     STATUS_CHOICES = [
         ('PENDING', 'Pending'),
@@ -108,9 +225,29 @@ class Booking(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BookingQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['customer', 'booking_date'], name='booking_customer_date_idx'),
+            models.Index(fields=['professional', 'booking_date'], name='booking_pro_date_idx'),
+        ]
+
     def __str__(self):
         return f"Booking #{self.id} - {self.customer.username} - {self.status}"
 
+class SlotReservation(models.Model):
+    """One calendar unit of a professional's day held by a booking (see fixture.availability)."""
+    professional = models.ForeignKey(ServiceProfessional, on_delete=models.CASCADE, related_name='slot_reservations')
+    date = models.DateField()
+    start_minute = models.PositiveSmallIntegerField(help_text="Minutes past midnight")
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='slot_reservations')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['professional', 'date', 'start_minute'], name='unique_professional_slot'),
+        ]
+
 class JobTracking(models.Model):
     STATUS_CHOICES = [
         ('ON_THE_WAY', 'On the way'),
@@ -120,8 +257,37 @@ class JobTracking(models.Model):
     latitude = models.DecimalField(max_digits=9, decimal_places=6)
     longitude = models.DecimalField(max_digits=9, decimal_places=6)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    geohash = models.CharField(max_length=12, blank=True, null=True, db_index=True, editable=False)
     updated_at = models.DateTimeField(auto_now=True)
 
+    def save(self, *args, **kwargs):
+        self.geohash = geohash_encode(self.latitude, self.longitude)
+        super().save(*args, **kwargs)
+
+class TrackingPoint(models.Model):
+    """
+    Append-only breadcrumb of a professional's position during a booking (see
+    fixture.tracking). Coordinates are stored as integer microdegrees (about
+    11 cm), which keeps rows small; trails are simplified before they are stored.
+    """
+    booking = models.ForeignKey(Booking, on_delete=models.CASCADE, related_name='tracking_points', db_index=False)
+    recorded_at = models.DateTimeField()
+    lat_e6 = models.IntegerField()
+    lon_e6 = models.IntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['booking', 'recorded_at'], name='tracking_point_trail_idx'),
+        ]
+
+    @property
+    def latitude(self):
+        return self.lat_e6 / 1e6
+
+    @property
+    def longitude(self):
+        return self.lon_e6 / 1e6
+
 class Payment(models.Model):
     METHOD_CHOICES = [
         ('UPI', 'UPI'),
@@ -139,12 +305,36 @@ class Payment(models.Model):
     payment_details = models.TextField(blank=True, null=True)
     paid_at = models.DateTimeField(auto_now_add=True)
 
+class InvoiceSequence(models.Model):
+    """Last invoice number handed out in a period (see fixture.invoicing)."""
+    period = models.CharField(max_length=6, unique=True, help_text="YYYYMM")
+    last_number = models.PositiveIntegerField(default=0)
+
 class Invoice(models.Model):
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='invoice')
     invoice_number = models.CharField(max_length=100, unique=True)
+    # Invoices from before sequential numbering have neither period nor sequence.
+    period = models.CharField(max_length=6, blank=True, null=True)
+    sequence = models.PositiveIntegerField(blank=True, null=True)
+    subtotal = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+    tax_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
     total_amount = models.DecimalField(max_digits=10, decimal_places=2)
     generated_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['period', 'sequence'], name='unique_invoice_sequence'),
+        ]
+
+class InvoiceLineItem(models.Model):
+    invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, related_name='line_items')
+    description = models.CharField(max_length=200)
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_rate = models.DecimalField(max_digits=5, decimal_places=2, default=0, help_text="Percent")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    tax_amount = models.DecimalField(max_digits=10, decimal_places=2)
+
 class Review(models.Model):
     booking = models.OneToOneField(Booking, on_delete=models.CASCADE, related_name='review')
     rating = models.IntegerField(choices=[(i, i) for i in range(1, 6)])
@@ -165,4 +355,10 @@ class Notification(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='notifications')
     message = models.TextField()
     is_read = models.BooleanField(default=False)
-    created_at = models.DateTimeField(auto_now_add=True)
\ No newline at end of file
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'is_read', 'created_at'], name='notification_inbox_idx'),
+            models.Index(fields=['user', 'created_at', 'id'], name='notification_inbox_order_idx'),
+        ]
\ No newline at end of file
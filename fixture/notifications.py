@@ -0,0 +1,163 @@
+import atexit
+import logging
+import queue
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 0.5
+# Unread counters are adjusted in place; the timeout bounds drift from missed updates.
+UNREAD_TIMEOUT = 5 * 60
+
+
+def unread_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def unread_count(user_id):
+    """Cached number of unread notifications for a user, counted from the index on a miss."""
+    count = cache.get(unread_key(user_id))
+    if count is None:
+        from .models import Notification
+
+        count = Notification.objects.filter(user_id=user_id, is_read=False).count()
+        cache.set(unread_key(user_id), count, UNREAD_TIMEOUT)
+    return count
+
+
+def adjust_unread(user_id, delta):
+    """Shift a cached unread counter; a missing counter is left to be recounted on next read."""
+    if not delta:
+        return
+    try:
+        if cache.incr(unread_key(user_id), delta) < 0:
+            cache.delete(unread_key(user_id))
+    except ValueError:
+        pass
+
+
+def mark_read(user_id, notification_ids):
+    """Mark the given notifications read and return how many were unread."""
+    from .models import Notification
+
+    updated = Notification.objects.filter(user_id=user_id, id__in=notification_ids, is_read=False).update(is_read=True)
+    adjust_unread(user_id, -updated)
+    return updated
+
+
+class NotificationDispatcher:
+    """
+    Moves Notification inserts off the request path. Views enqueue
+    (recipient, message) pairs once their transaction commits; a daemon worker
+    drains the queue and writes each batch with a single bulk_create.
+
+    NOTIFICATION_DISPATCH = 'sync' writes on commit in the calling thread instead,
+    which keeps tests inside one database transaction.
+    """
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.worker = None
+        self.counters = {
+            'enqueued': 0,
+            'delivered': 0,
+            'failed': 0,
+            'batches': 0,
+            'largest_batch': 0,
+            'last_flush_ms': 0.0,
+        }
+
+    def notify(self, recipients, message):
+        """Queue `message` for every user id in `recipients` once the current transaction commits."""
+        items = [(user_id, message) for user_id in dict.fromkeys(recipients) if user_id]
+        if items:
+            transaction.on_commit(lambda: self.enqueue(items))
+
+    def enqueue(self, items):
+        with self.lock:
+            self.counters['enqueued'] += len(items)
+        if getattr(settings, 'NOTIFICATION_DISPATCH', 'thread') == 'sync':
+            self.write(items)
+            return
+        self.ensure_worker()
+        for item in items:
+            self.queue.put(item)
+
+    def ensure_worker(self):
+        if self.worker is not None and self.worker.is_alive():
+            return
+        with self.lock:
+            if self.worker is None or not self.worker.is_alive():
+                self.worker = threading.Thread(target=self.run, name='notification-dispatcher', daemon=True)
+                self.worker.start()
+
+    def run(self):
+        while True:
+            try:
+                batch = [self.queue.get()]
+            except Exception:  # interpreter shutdown
+                return
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            try:
+                close_old_connections()
+                self.write(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def write(self, items):
+        from .models import Notification
+
+        started = time.perf_counter()
+        try:
+            Notification.objects.bulk_create(
+                [Notification(user_id=user_id, message=message) for user_id, message in items],
+                batch_size=self.batch_size,
+            )
+        except Exception:
+            logger.exception("Failed to write %d notifications", len(items))
+            with self.lock:
+                self.counters['failed'] += len(items)
+            return
+        # bulk_create skips post_save, so bump the unread counters here.
+        for user_id, count in Counter(user_id for user_id, _ in items).items():
+            adjust_unread(user_id, count)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        with self.lock:
+            self.counters['delivered'] += len(items)
+            self.counters['batches'] += 1
+            self.counters['largest_batch'] = max(self.counters['largest_batch'], len(items))
+            self.counters['last_flush_ms'] = round(elapsed_ms, 3)
+
+    def flush(self):
+        """Block until every queued notification has been written."""
+        if self.worker is not None and self.worker.is_alive():
+            self.queue.join()
+
+    def metrics(self):
+        with self.lock:
+            return dict(self.counters, queue_depth=self.queue.qsize())
+
+
+dispatcher = NotificationDispatcher()
+notify = dispatcher.notify
+
+atexit.register(dispatcher.flush)
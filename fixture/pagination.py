@@ -0,0 +1,59 @@
+from datetime import datetime
+
+from django.db.models import Q
+
+
+class KeysetPage:
+    """One page of a keyset-paginated queryset, newest first on (date_field, id)."""
+
+    def __init__(self, items, next_cursor, is_first):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.is_first = is_first
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
+def encode_cursor(date, pk):
+    return f"{date.isoformat()}_{pk}"
+
+
+def decode_cursor(cursor):
+    """Return (datetime, id) for a cursor string, or None if it is missing or malformed."""
+    if not cursor:
+        return None
+    try:
+        date, pk = cursor.rsplit('_', 1)
+        return datetime.fromisoformat(date), int(pk)
+    except ValueError:
+        return None
+
+
+def keyset_paginate(queryset, cursor=None, per_page=20, date_field='booking_date'):
+    """
+    Slice `queryset` to the page after `cursor` ordered by (-date_field, -id).
+    Each page is a single indexed range scan, so page N costs the same as page 1.
+    """
+    queryset = queryset.order_by(f'-{date_field}', '-id')
+    position = decode_cursor(cursor)
+    if position:
+        date, pk = position
+        queryset = queryset.filter(
+            Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, 'id__lt': pk})
+        )
+
+    rows = list(queryset[:per_page + 1])
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(getattr(last, date_field), last.id)
+    return KeysetPage(rows, next_cursor, is_first=position is None)
@@ -0,0 +1,88 @@
+import zlib
+
+# A4 in points.
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+FONTS = {False: 'F1', True: 'F2'}
+# Helvetica advance widths (1/1000 em) for the characters right-aligned
+# columns hold; anything else is taken to be as wide as a digit.
+WIDTHS = {
+    ' ': 278, '.': 278, ',': 278, '-': 333, '%': 889, '#': 556, '/': 278,
+    'R': 722, 's': 500, 'I': 278, 'N': 722, 'V': 667,
+}
+DEFAULT_WIDTH = 556
+
+
+def text_width(text, size):
+    return sum(WIDTHS.get(char, DEFAULT_WIDTH) for char in text) * size / 1000
+
+
+def escape(text):
+    # Standard fonts use WinAnsiEncoding; characters outside Latin-1 degrade to '?'.
+    data = text.encode('latin-1', 'replace')
+    return data.replace(b'\\', b'\\\\').replace(b'(', b'\\(').replace(b')', b'\\)')
+
+
+class Document:
+    """
+    Minimal PDF 1.4 writer: A4 pages of Helvetica text and rules, nothing more.
+    Output has no timestamps, so the same calls always produce the same bytes.
+    """
+
+    def __init__(self, title=''):
+        self.title = title
+        self.pages = []
+        self.new_page()
+
+    def new_page(self):
+        self.ops = []
+        self.pages.append(self.ops)
+
+    def text(self, x, y, text, size=10, bold=False, align='left'):
+        if align == 'right':
+            x -= text_width(text, size)
+        self.ops.append(b'BT /%s %d Tf %.2f %.2f Td (%s) Tj ET' % (
+            FONTS[bold].encode(), size, x, y, escape(text),
+        ))
+
+    def line(self, x1, y1, x2, y2, width=0.5):
+        self.ops.append(b'%.2f w %.2f %.2f m %.2f %.2f l S' % (width, x1, y1, x2, y2))
+
+    def render(self):
+        objects = []
+
+        def add(body):
+            objects.append(body)
+            return len(objects)
+
+        catalog = add(None)
+        pages = add(None)
+        regular = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>')
+        bold = add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>')
+        kids = []
+        for ops in self.pages:
+            content = zlib.compress(b'\n'.join(ops))
+            stream = add(b'<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream' % (len(content), content))
+            kids.append(add(
+                b'<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R '
+                b'/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> >>'
+                % (pages, PAGE_WIDTH, PAGE_HEIGHT, stream, regular, bold)
+            ))
+        objects[catalog - 1] = b'<< /Type /Catalog /Pages %d 0 R >>' % pages
+        objects[pages - 1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+            b' '.join(b'%d 0 R' % kid for kid in kids), len(kids),
+        )
+        info = add(b'<< /Title (%s) /Producer (HomeFixr) >>' % escape(self.title))
+
+        out = bytearray(b'%PDF-1.4\n%\xe2\xe3\xcf\xd3\n')
+        offsets = []
+        for number, body in enumerate(objects, 1):
+            offsets.append(len(out))
+            out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+        xref = len(out)
+        out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+        for offset in offsets:
+            out += b'%010d 00000 n \n' % offset
+        out += b'trailer\n<< /Size %d /Root %d 0 R /Info %d 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (
+            len(objects) + 1, catalog, info, xref,
+        )
+        return bytes(out)
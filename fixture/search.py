@@ -0,0 +1,201 @@
+import math
+
+from django.core.paginator import Paginator
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Q, Subquery
+from django.db.models.functions import Floor
+
+from .fulltext import matching
+from .geo import bounding_box, covering_cells, geohash_filter
+from .models import Category, SearchEntry, Service, ServiceProfessional, UserProfile
+
+RESULTS_PER_PAGE = 20
+BATCH_SIZE = 2000
+# Facet buckets: "N stars & up" and "up to ₹N".
+RATING_FACETS = (4, 3, 2, 1)
+PRICE_FACETS = (500, 1000, 2500, 5000)
+SORTS = {
+    'rating': ('-rating', 'price', 'id'),
+    'price': ('price', '-rating', 'id'),
+    'price_desc': ('-price', '-rating', 'id'),
+}
+# ServiceProfessional fields copied into the index; saves touching none of them skip reindexing.
+INDEXED_PRO_FIELDS = {'category', 'rating', 'rating_count', 'is_verified', 'availability_status'}
+PRO_VALUES = ('id', 'user_id', 'category_id', 'rating', 'rating_count', 'is_verified', 'availability_status')
+
+
+def locations(user_ids):
+    return {
+        user_id: (lat, lon, geohash)
+        for user_id, lat, lon, geohash in UserProfile.objects.filter(user_id__in=user_ids).values_list(
+            'user_id', 'latitude', 'longitude', 'geohash'
+        )
+    }
+
+
+def build_entries(pros, services):
+    """SearchEntry rows for every (pro, service) pair in the same category; `pros` are PRO_VALUES dicts."""
+    by_category = {}
+    for service in services:
+        by_category.setdefault(service.category_id, []).append(service)
+    located = locations([pro['user_id'] for pro in pros])
+    entries = []
+    for pro in pros:
+        lat, lon, geohash = located.get(pro['user_id'], (None, None, None))
+        for service in by_category.get(pro['category_id'], ()):
+            entries.append(SearchEntry(
+                professional_id=pro['id'], service_id=service.id, category_id=service.category_id,
+                price=service.base_price, rating=pro['rating'], stars=math.floor(pro['rating']),
+                rating_count=pro['rating_count'],
+                is_verified=pro['is_verified'], is_available=pro['availability_status'],
+                latitude=lat, longitude=lon, geohash=geohash,
+            ))
+    return entries
+
+
+def index_professional(pro_id):
+    """Replace a professional's index rows, e.g. after a category or availability change."""
+    with transaction.atomic():
+        SearchEntry.objects.filter(professional_id=pro_id).delete()
+        pros = list(ServiceProfessional.objects.filter(pk=pro_id, category__isnull=False).values(*PRO_VALUES))
+        if pros:
+            services = Service.objects.filter(category_id=pros[0]['category_id'], is_active=True)
+            SearchEntry.objects.bulk_create(build_entries(pros, services))
+
+
+def index_service(service):
+    """Replace a service's index rows; inactive services are dropped from the index."""
+    with transaction.atomic():
+        SearchEntry.objects.filter(service_id=service.id).delete()
+        if not service.is_active:
+            return
+        pros = ServiceProfessional.objects.filter(category_id=service.category_id).values(*PRO_VALUES)
+        batch = []
+        for pro in pros.iterator(chunk_size=BATCH_SIZE):
+            batch.append(pro)
+            if len(batch) >= BATCH_SIZE:
+                SearchEntry.objects.bulk_create(build_entries(batch, [service]))
+                batch = []
+        SearchEntry.objects.bulk_create(build_entries(batch, [service]))
+
+
+def index_location(user_id, latitude, longitude, geohash):
+    SearchEntry.objects.filter(professional__user_id=user_id).update(
+        latitude=latitude, longitude=longitude, geohash=geohash,
+    )
+
+
+def sync_ratings(pro_ids=None):
+    """Copy rating aggregates onto index rows after queryset updates that bypass signals."""
+    entries = SearchEntry.objects.all() if pro_ids is None else SearchEntry.objects.filter(professional_id__in=pro_ids)
+    pro = ServiceProfessional.objects.filter(pk=OuterRef('professional_id'))
+    entries.update(
+        rating=Subquery(pro.values('rating')[:1]),
+        stars=Floor(Subquery(pro.values('rating')[:1])),
+        rating_count=Subquery(pro.values('rating_count')[:1]),
+    )
+
+
+def rebuild_search_index():
+    """
+    Rebuild the whole index from professionals, services and profiles. One
+    INSERT ... SELECT does the join in the database, which is far cheaper than
+    building hundreds of thousands of model instances. Returns the rows written.
+    """
+    def table(model):
+        return connection.ops.quote_name(model._meta.db_table)
+
+    def column(model, name):
+        return connection.ops.quote_name(model._meta.get_field(name).column)
+
+    targets = ', '.join(column(SearchEntry, name) for name in (
+        'professional', 'service', 'category', 'price', 'rating', 'stars', 'rating_count',
+        'is_verified', 'is_available', 'latitude', 'longitude', 'geohash',
+    ))
+    pro, service, profile = ServiceProfessional, Service, UserProfile
+    sql = (
+        f'INSERT INTO {table(SearchEntry)} ({targets}) '
+        f'SELECT p.{column(pro, "id")}, s.{column(service, "id")}, s.{column(service, "category")}, '
+        f's.{column(service, "base_price")}, p.{column(pro, "rating")}, FLOOR(p.{column(pro, "rating")}), '
+        f'p.{column(pro, "rating_count")}, '
+        f'p.{column(pro, "is_verified")}, p.{column(pro, "availability_status")}, '
+        f'u.{column(profile, "latitude")}, u.{column(profile, "longitude")}, u.{column(profile, "geohash")} '
+        f'FROM {table(pro)} p '
+        f'JOIN {table(service)} s ON s.{column(service, "category")} = p.{column(pro, "category")} '
+        f'AND s.{column(service, "is_active")} = %s '
+        f'LEFT JOIN {table(profile)} u ON u.{column(profile, "user")} = p.{column(pro, "user")} '
+        f'ORDER BY p.{column(pro, "id")}, s.{column(service, "id")}'
+    )
+    with transaction.atomic():
+        SearchEntry.objects.all().delete()
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [True])
+            return cursor.rowcount
+
+
+def search(category=None, max_price=None, min_rating=None, verified=False, origin=None, radius_km=None,
+           text=None, sort='rating', page=1, per_page=RESULTS_PER_PAGE):
+    """
+    Filter, sort and paginate available index rows and count facets. Each facet
+    is counted with every filter applied except its own, so the counts say what
+    choosing that option would return. A location restricts rows to the bounding
+    box of the radius (via geohash ranges), not the exact circle. `text` keeps
+    rows whose service or professional matches it in the full-text index.
+    Returns (page, facets).
+
+    Facets and the total come from one GROUP BY (category, stars, price,
+    verified) over the rows matching the location, read from the covering
+    facet index; the few hundred groups are then tallied per facet in Python.
+    """
+    base = SearchEntry.objects.filter(is_available=True)
+    if origin is not None and radius_km:
+        box = bounding_box(float(origin[0]), float(origin[1]), radius_km)
+        base = base.filter(
+            geohash_filter('geohash', covering_cells(box)),
+            latitude__gte=box[0], latitude__lte=box[1], longitude__gte=box[2], longitude__lte=box[3],
+        )
+    if text:
+        services, pros = matching('service', text), matching('professional', text)
+        if services is not None:
+            base = base.filter(Q(service_id__in=services) | Q(professional_id__in=pros))
+    groups = list(
+        base.values_list('category_id', 'stars', 'price', 'is_verified').annotate(count=Count('id')).order_by()
+    )
+    checks = {
+        'category': lambda g: not category or g[0] == category.pk,
+        'rating': lambda g: not min_rating or g[1] >= min_rating,
+        'price': lambda g: max_price is None or g[2] <= max_price,
+        'verified': lambda g: not verified or g[3],
+    }
+
+    def without(facet):
+        others = [check for name, check in checks.items() if name != facet]
+        return [g for g in groups if all(check(g) for check in others)]
+
+    category_counts = {}
+    for g in without('category'):
+        category_counts[g[0]] = category_counts.get(g[0], 0) + g[4]
+    names = dict(Category.objects.filter(pk__in=category_counts).values_list('id', 'name'))
+    facets = {
+        'category': sorted(
+            ((pk, names[pk], count) for pk, count in category_counts.items()), key=lambda c: (-c[2], c[1])
+        ),
+        'rating': [(n, sum(g[4] for g in without('rating') if g[1] >= n)) for n in RATING_FACETS],
+        'price': [(n, sum(g[4] for g in without('price') if g[2] <= n)) for n in PRICE_FACETS],
+        'verified': sum(g[4] for g in without('verified') if g[3]),
+    }
+
+    results = base
+    if category:
+        results = results.filter(category=category)
+    if max_price is not None:
+        results = results.filter(price__lte=max_price)
+    if min_rating:
+        results = results.filter(stars__gte=min_rating)
+    if verified:
+        results = results.filter(is_verified=True)
+    results = results.order_by(*SORTS.get(sort, SORTS['rating'])).select_related('professional__user', 'service')
+    paginator = Paginator(results, per_page)
+    # The total is already known from the groups; spare the paginator a COUNT(*).
+    paginator.count = sum(g[4] for g in groups if all(check(g) for check in checks.values()))
+    return paginator.get_page(page), facets
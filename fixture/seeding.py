@@ -0,0 +1,457 @@
+"""
+Synthetic data at any scale. Small reference tables go through bulk_create;
+users and profiles are written with executemany, and bookings and the rows
+hanging off them are generated as plain tuples, in worker processes if asked,
+into tables whose indexes are rebuilt once at the end. A million bookings is
+a matter of seconds rather than minutes.
+"""
+import multiprocessing
+import random
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .availability import TIME_SLOTS, units_needed, window_units
+from .catalogue import invalidate_catalogue
+from .fulltext import rebuild_fulltext
+from .geo import geohash_encode
+from .invoicing import issue_invoices
+from .models import (
+    Booking, Category, Complaint, Notification, Payment, Review, Service, ServiceProfessional, SlotReservation, User,
+    UserProfile,
+)
+from .search import rebuild_search_index
+from .stats import rebuild_professional_stats
+
+BATCH_SIZE = 2000
+# Bookings generated per task; also the unit handed to each worker process.
+CHUNK_SIZE = 50_000
+# SQLite page cache while seeding, in KiB.
+PAGE_CACHE_KIB = 256 * 1024
+PASSWORD = 'password'
+CATEGORY_NAMES = ('Plumbing', 'Electrical', 'Cleaning', 'Carpentry', 'Painting', 'Appliance Repair', 'Pest Control')
+SERVICE_WORDS = ('Repair', 'Installation', 'Inspection', 'Deep Clean', 'Replacement', 'Maintenance', 'Fitting')
+# (city, latitude, longitude, pincode). Users are spread around these.
+CITIES = (
+    ('Bengaluru', 12.9716, 77.5946, '560001'),
+    ('Mumbai', 19.0760, 72.8777, '400001'),
+    ('Delhi', 28.6139, 77.2090, '110001'),
+    ('Chennai', 13.0827, 80.2707, '600001'),
+    ('Hyderabad', 17.3850, 78.4867, '500001'),
+)
+# Standard deviation of a user's distance from the city centre, in degrees (about 9 km).
+CITY_SPREAD = 0.08
+# Bookings span this window around now; the past is mostly finished, the future still open.
+HISTORY_DAYS, FUTURE_DAYS = 365, 30
+REVIEW_SHARE = 0.6
+COMPLAINT_SHARE = 0.03
+# Chance a customer books their regular professional rather than anyone in town.
+REPEAT_SHARE = 0.3
+RATING_WEIGHTS = (1, 2, 5, 12, 20)
+# Calendar units of a day, window after window, and where each window's run of them starts.
+WINDOWS = [(name, len(window_units(name))) for name in TIME_SLOTS]
+UNITS = [unit for name in TIME_SLOTS for unit in window_units(name)]
+WINDOW_STARTS = [sum(length for _, length in WINDOWS[:i]) for i in range(len(WINDOWS))]
+OPEN_STATUSES = ('PENDING', 'CONFIRMED', 'PROCESSING')
+# Tries at finding a professional and day with room before giving up on a booking.
+PLACE_ATTEMPTS = 20
+PAYMENT_METHODS = ('UPI', 'CARD', 'WALLET')
+
+BOOKING_FIELDS = ('id', 'customer', 'professional', 'service', 'booking_date', 'time_slot', 'service_address',
+                  'status', 'requirements', 'created_at', 'updated_at')
+PAYMENT_FIELDS = ('booking', 'amount', 'payment_method', 'payment_status', 'payment_details', 'paid_at')
+REVIEW_FIELDS = ('booking', 'rating', 'comment', 'created_at')
+COMPLAINT_FIELDS = ('booking', 'description', 'status', 'created_at')
+NOTIFICATION_FIELDS = ('user', 'message', 'is_read', 'created_at')
+SLOT_FIELDS = ('professional', 'date', 'start_minute', 'booking')
+# Values every database driver takes as they are; anything else is prepared by its field.
+PLAIN_TYPES = {str, int, bool}
+
+
+def created(model, objects):
+    """bulk_create in batches; SQLite and PostgreSQL hand back the new primary keys."""
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+def inserted(model, objects):
+    """
+    Like created(), for tens of thousands of instances: primary keys are handed
+    out from next_id() and the rows go through insert_rows(), skipping the SQL
+    compiler, which costs more than the INSERTs themselves at this size. Fields
+    are taken as they are; neither save() nor pre_save() runs.
+    """
+    # The wrapper itself: `connection` is a proxy, resolved on every attribute access.
+    db = transaction.get_connection()
+    fields = model._meta.concrete_fields
+    first_id = next_id(model)
+    rows = []
+    for offset, obj in enumerate(objects):
+        obj.pk = first_id + offset
+        obj._state.adding, obj._state.db = False, db.alias
+        rows.append(tuple(
+            value if value is None or type(value) in PLAIN_TYPES else field.get_db_prep_save(value, db)
+            for field, value in zip(fields, [getattr(obj, field.attname) for field in fields])
+        ))
+    insert_rows(model, [field.name for field in fields], rows)
+    return objects
+
+
+def insert_rows(model, fields, rows):
+    """INSERT database-ready tuples into `model`'s table without building instances."""
+    if not rows:
+        return
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(f'INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})', rows)
+
+
+def next_id(model):
+    return (model.objects.aggregate(last=Max('pk'))['last'] or 0) + 1
+
+
+def reset_sequences(*models):
+    """
+    Point the id sequences of `models` past their largest key, for tables
+    written with explicit ids. PostgreSQL would otherwise hand the next
+    ordinary INSERT an id that is already taken; SQLite needs nothing.
+    """
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    if statements:
+        with connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+
+def hourly_stamps(now):
+    """Database-ready datetimes, one per hour of the booking window, and the index of now."""
+    start = now.replace(minute=0, second=0, microsecond=0) - timedelta(days=HISTORY_DAYS)
+    hours = (HISTORY_DAYS + FUTURE_DAYS) * 24
+    adapt = connection.ops.adapt_datetimefield_value
+    return [adapt(start + timedelta(hours=hour)) for hour in range(hours)], HISTORY_DAYS * 24
+
+
+def booking_calendar(now):
+    """
+    The booking window for the generator: its hourly stamps, and every day in
+    it with each calendar unit of the day as a database-ready datetime and the
+    index of the stamp for its hour. Day 0 is the first whole day after the
+    first stamp, so nothing is booked before anything could have been placed.
+    """
+    stamps, now_index = hourly_stamps(now)
+    start = now.replace(minute=0, second=0, microsecond=0) - timedelta(days=HISTORY_DAYS)
+    first_day = timezone.localtime(start).date() + timedelta(days=1)
+    today = (timezone.localdate(now) - first_day).days
+    days = [first_day + timedelta(days=day) for day in range(today + FUTURE_DAYS)]
+    adapt = connection.ops.adapt_datetimefield_value
+    slot_stamps, slot_hours = [], []
+    for day in days:
+        day_start = timezone.make_aware(datetime.combine(day, datetime.min.time()))
+        for unit in UNITS:
+            at = day_start + timedelta(minutes=unit)
+            slot_stamps.append(adapt(at))
+            slot_hours.append(min(int((at - start).total_seconds() // 3600), len(stamps) - 1))
+    return {
+        'stamps': stamps,
+        'now_index': now_index,
+        'today': today,
+        'days': [connection.ops.adapt_datefield_value(day) for day in days],
+        'slot_stamps': slot_stamps,
+        'slot_hours': slot_hours,
+    }
+
+
+@contextmanager
+def page_cache(kib=PAGE_CACHE_KIB):
+    """
+    Raise SQLite's page cache for the duration. The default 2 MB is soon
+    outgrown by the bookings' indexes, and every miss means reading a page back.
+    """
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA cache_size')
+        previous = cursor.fetchone()[0]
+        cursor.execute(f'PRAGMA cache_size = -{int(kib)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA cache_size = {int(previous)}')
+
+
+def drop_indexes(*models):
+    """
+    Drop the secondary indexes of the models' tables and return the SQL that
+    recreates them. Building an index once over a full table is far cheaper
+    than maintaining it through a million random-order inserts. SQLite only,
+    and meant for inside a transaction, which brings the indexes back if it
+    rolls back; elsewhere nothing is dropped.
+    """
+    if connection.vendor != 'sqlite':
+        return []
+    tables = [model._meta.db_table for model in models]
+    with connection.cursor() as cursor:
+        # Indexes without SQL back UNIQUE constraints and cannot be dropped.
+        cursor.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND sql IS NOT NULL "
+            f"AND tbl_name IN ({', '.join(['%s'] * len(tables))})",
+            tables,
+        )
+        indexes = cursor.fetchall()
+        for name, _ in indexes:
+            cursor.execute(f'DROP INDEX {connection.ops.quote_name(name)}')
+    return [sql for _, sql in indexes]
+
+
+def create_indexes(statements):
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def phase(progress, name):
+    started = time.perf_counter()
+    yield
+    if progress:
+        progress(name, time.perf_counter() - started)
+
+
+def around(rng, city):
+    _, latitude, longitude, _ = city
+    return round(rng.gauss(latitude, CITY_SPREAD), 6), round(rng.gauss(longitude, CITY_SPREAD), 6)
+
+
+# Shared read-only state of the booking generator, set once per process.
+context = {}
+
+
+def init_generator(state):
+    context.clear()
+    context.update(state)
+
+
+def booking_chunk(task):
+    """
+    Bookings first_id .. first_id + count - 1 with their payments, reviews,
+    complaints and the slot reservations of the open ones, as tuples ready for
+    insert_rows. Each chunk has its own seed, so the output is the same however
+    many processes share the work. Chunk `chunk` of `chunks` only books a
+    professional on the days d with (professional + d) % chunks == chunk, so
+    chunks never share a calendar, and within one every booking takes the
+    first free run of units in its window, as reserve_slot() would.
+    """
+    first_id, count, chunk_seed, chunk, chunks = task
+    # random() scaled by hand is several times cheaper than randrange() and choice(), which add up here.
+    uniform = random.Random(chunk_seed).random
+    stamps, now_index, days, today = context['stamps'], context['now_index'], context['days'], context['today']
+    slot_stamps, slot_hours = context['slot_stamps'], context['slot_hours']
+    customers, pros_by_city, services_by_pro = context['customers'], context['pros_by_city'], context['services_by_pro']
+    last_stamp, cities, day_count, day_units = len(stamps) - 1, len(pros_by_city), len(days), len(UNITS)
+    ratings = [rating for rating, weight in enumerate(RATING_WEIGHTS, 1) for _ in range(weight)]
+    # Bitmask of the units taken per (professional, day).
+    calendars = {}
+    bookings, payments, reviews, complaints, reservations = [], [], [], [], []
+    for booking_id in range(first_id, first_id + count):
+        index = int(uniform() * len(customers))
+        pros = pros_by_city[index % cities]
+        pro = pros[(index * 7919) % len(pros)] if uniform() < REPEAT_SHARE else pros[int(uniform() * len(pros))]
+        for _ in range(PLACE_ATTEMPTS):
+            offered = services_by_pro[pro]
+            service, price, length = offered[int(uniform() * len(offered))]
+            first = (chunk - pro) % chunks
+            day = first + chunks * int(uniform() * ((day_count - 1 - first) // chunks + 1))
+            window = int(uniform() * len(WINDOWS))
+            taken = calendars.get((pro, day), 0)
+            run = (1 << length) - 1
+            first_unit = WINDOW_STARTS[window]
+            unit = next((
+                unit for unit in range(first_unit, first_unit + WINDOWS[window][1] - length + 1)
+                if not taken & (run << unit)
+            ), None)
+            if unit is not None:
+                break
+            pro = pros[int(uniform() * len(pros))]
+        else:
+            raise ValueError(f"No room left for booking {booking_id}; seed more professionals or fewer bookings.")
+        calendars[pro, day] = taken | (run << unit)
+        slot = day * day_units + unit
+        when = slot_hours[slot]
+        if day > today:
+            status = 'PENDING' if uniform() < 0.6 else 'CONFIRMED'
+        elif day >= today - 1:
+            status = 'CONFIRMED' if uniform() < 0.5 else 'PROCESSING'
+        else:
+            status = 'COMPLETED' if uniform() < 0.85 else 'CANCELLED'
+        placed = max(0, when - 1 - int(uniform() * 24 * 14))
+        bookings.append((
+            booking_id, customers[index], pro, service, slot_stamps[slot], WINDOWS[window][0],
+            f"{1 + int(uniform() * 999)} Synthetic Street", status, None, stamps[placed],
+            stamps[min(when, now_index)],
+        ))
+        if status in OPEN_STATUSES:
+            reservations.extend((pro, days[day], UNITS[held], booking_id) for held in range(unit, unit + length))
+        if status == 'COMPLETED':
+            payments.append((
+                booking_id, price, PAYMENT_METHODS[int(uniform() * len(PAYMENT_METHODS))], 'SUCCESS' if uniform() < 0.97 else 'FAILED',
+                None, stamps[when],
+            ))
+            if uniform() < REVIEW_SHARE:
+                rating = ratings[int(uniform() * len(ratings))]
+                reviews.append((booking_id, rating, f"Rated {rating}/5.", stamps[min(when + 1 + int(uniform() * 72), last_stamp)]))
+        if status in ('COMPLETED', 'CANCELLED') and uniform() < COMPLAINT_SHARE:
+            complaints.append((
+                booking_id, "Synthetic complaint.", 'RESOLVED' if day < today - 30 else 'OPEN',
+                stamps[min(when + 1 + int(uniform() * 48), last_stamp)],
+            ))
+    return {
+        'bookings': bookings, 'payments': payments, 'reviews': reviews, 'complaints': complaints,
+        'reservations': reservations,
+    }
+
+
+def generate(tasks, state, workers):
+    """booking_chunk() over `tasks`, in order, across `workers` forked processes when more than one."""
+    if workers > 1 and 'fork' in multiprocessing.get_all_start_methods():
+        # Forked workers inherit the loaded apps; spawned ones would have to set Django up again.
+        with multiprocessing.get_context('fork').Pool(workers, initializer=init_generator, initargs=(state,)) as pool:
+            yield from pool.imap(booking_chunk, tasks)
+        return
+    init_generator(state)
+    yield from map(booking_chunk, tasks)
+
+
+def seed(customers=100, professionals=20, categories=5, services_per_category=4, bookings=1000,
+         notifications_per_user=5, invoices=False, workers=1, prefix='seed', random_seed=42, progress=None):
+    """
+    Insert a consistent synthetic data set and rebuild what signals would have
+    maintained: professional stats, the search index, the full-text index and
+    the catalogue. Users live around CITIES with geocoded profiles; bookings
+    spread over the past year and the next month, finished in the past and
+    open in the future, each in a free run of its professional's calendar,
+    which the open ones reserve. Every password is PASSWORD, hashed once for all users;
+    usernames start with `prefix`. `invoices` issues one per completed booking,
+    which is much slower than the rest. `progress`, if given, is called with
+    the name and duration of each phase. Returns the number of rows per kind.
+    """
+    rng = random.Random(random_seed)
+    password = make_password(PASSWORD)
+    calendar = booking_calendar(timezone.now())
+    stamps, now_index = calendar['stamps'], calendar['now_index']
+    with page_cache(), transaction.atomic():
+        with phase(progress, 'users'):
+            cats = created(Category, [
+                Category(name=CATEGORY_NAMES[i % len(CATEGORY_NAMES)] + ('' if i < len(CATEGORY_NAMES) else f' {i}'),
+                         description=f"Synthetic category {i}")
+                for i in range(categories)
+            ])
+            services = created(Service, [
+                Service(category=cat, name=f"{cat.name} {SERVICE_WORDS[j % len(SERVICE_WORDS)]}",
+                        base_price=Decimal(rng.randrange(199, 4999)), duration=rng.choice((30, 60, 90, 120)),
+                        description=f"{SERVICE_WORDS[j % len(SERVICE_WORDS)]} by a verified {cat.name.lower()} pro.")
+                for cat in cats for j in range(services_per_category)
+            ])
+            customer_users = inserted(User, [
+                User(username=f'{prefix}-customer-{i}', email=f'{prefix}-customer-{i}@example.com', password=password,
+                     is_customer=True, role='customer', terms_accepted=True)
+                for i in range(customers)
+            ])
+            pro_users = inserted(User, [
+                User(username=f'{prefix}-pro-{i}', email=f'{prefix}-pro-{i}@example.com', password=password,
+                     is_professional=True, role='professional', terms_accepted=True, is_verified=True)
+                for i in range(professionals)
+            ])
+            # The n-th customer and the n-th professional live in city n % len(CITIES).
+            profiles = []
+            for i, user in [*enumerate(customer_users), *enumerate(pro_users)]:
+                city = CITIES[i % len(CITIES)]
+                latitude, longitude = around(rng, city)
+                profiles.append(UserProfile(
+                    user=user, full_name=user.username.replace('-', ' ').title(),
+                    address=f"{i + 1} Synthetic Street, {city[0]}",
+                    latitude=latitude, longitude=longitude, city=city[0], pincode=city[3],
+                    geohash=geohash_encode(latitude, longitude),
+                ))
+            inserted(UserProfile, profiles)
+            pros = inserted(ServiceProfessional, [
+                ServiceProfessional(user=user, category=rng.choice(cats), bio=f"{user.username} has {i % 20} years on the job.",
+                                    experience_years=i % 20, is_verified=rng.random() < 0.7)
+                for i, user in enumerate(pro_users)
+            ])
+
+        services_by_category = {}
+        for service in services:
+            services_by_category.setdefault(service.category_id, []).append(
+                (service.pk, connection.ops.adapt_decimalfield_value(service.base_price, 10, 2), units_needed(service)),
+            )
+        pros_by_city = [[pro.pk for pro in pros[i::len(CITIES)]] for i in range(len(CITIES))]
+        state = {
+            **calendar,
+            'customers': [user.pk for user in customer_users],
+            # Cities without a professional borrow the whole list.
+            'pros_by_city': [city or [pro.pk for pro in pros] for city in pros_by_city],
+            'services_by_pro': {pro.pk: services_by_category[pro.category_id] for pro in pros},
+        }
+        first_id = next_id(Booking)
+        # No more chunks than days, so that every chunk has days for every professional.
+        chunk_size = max(CHUNK_SIZE, -(-bookings // len(calendar['days'])))
+        starts = range(0, bookings, chunk_size)
+        tasks = [
+            (first_id + start, min(chunk_size, bookings - start), random_seed * 1_000_003 + start, chunk, len(starts))
+            for chunk, start in enumerate(starts)
+        ]
+        counts = {'payments': 0, 'reviews': 0, 'complaints': 0, 'reservations': 0}
+        dropped = drop_indexes(Booking, Payment, Review, Complaint, SlotReservation, Notification)
+        with phase(progress, 'bookings'):
+            for rows in generate(tasks, state, workers):
+                insert_rows(Booking, BOOKING_FIELDS, rows['bookings'])
+                insert_rows(Payment, PAYMENT_FIELDS, rows['payments'])
+                insert_rows(Review, REVIEW_FIELDS, rows['reviews'])
+                insert_rows(Complaint, COMPLAINT_FIELDS, rows['complaints'])
+                insert_rows(SlotReservation, SLOT_FIELDS, rows['reservations'])
+                for kind in counts:
+                    counts[kind] += len(rows[kind])
+
+        with phase(progress, 'notifications'):
+            notifications = [
+                (user.pk, f"Synthetic notification {i}.", rng.random() < 0.5, stamps[now_index - rng.randrange(24 * 30)])
+                for user in customer_users + pro_users for i in range(notifications_per_user)
+            ]
+            insert_rows(Notification, NOTIFICATION_FIELDS, notifications)
+        with phase(progress, 'indexes'):
+            create_indexes(dropped)
+            reset_sequences(User, UserProfile, ServiceProfessional, Booking, Payment, Review, Complaint,
+                            SlotReservation, Notification)
+
+        invoiced = 0
+        if invoices:
+            with phase(progress, 'invoices'):
+                completed = Booking.objects.filter(pk__gte=first_id, status='COMPLETED').select_related('service').order_by('pk')
+                for start in range(0, completed.count(), BATCH_SIZE):
+                    invoiced += len(issue_invoices(list(completed[start:start + BATCH_SIZE])))
+        with phase(progress, 'stats'):
+            rebuild_professional_stats()
+        with phase(progress, 'search index'):
+            rebuild_search_index()
+            rebuild_fulltext()
+    invalidate_catalogue()
+    return {
+        'categories': len(cats),
+        'services': len(services),
+        'customers': len(customer_users),
+        'professionals': len(pros),
+        'bookings': bookings,
+        **counts,
+        'invoices': invoiced,
+        'notifications': len(notifications),
+    }
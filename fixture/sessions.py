@@ -0,0 +1,43 @@
+"""
+Expired-session cleanup. Django's clearsessions deletes every expired row in
+one statement, which on SQLite holds the write lock, and so every booking,
+for as long as that takes. purge_expired() deletes in short batches instead.
+"""
+import time
+from importlib import import_module
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def session_store():
+    return import_module(settings.SESSION_ENGINE).SessionStore
+
+
+def purge_expired(batch_size=DEFAULT_BATCH_SIZE, pause=0.0):
+    """
+    Delete sessions that expired before now, `batch_size` rows per
+    transaction, sleeping `pause` seconds between batches so other writers get
+    the lock. Stores without database rows clean up however they do it
+    (files), or have nothing to clean (signed cookies). Returns the number of
+    rows deleted, or None when the store is not a database table.
+    """
+    store = session_store()
+    if not hasattr(store, 'get_model_class'):
+        store.clear_expired()
+        return None
+    model = store.get_model_class()
+    cutoff = timezone.now()
+    deleted = 0
+    while True:
+        with transaction.atomic():
+            # expire_date is indexed, so each batch is found without a scan.
+            keys = list(model.objects.filter(expire_date__lt=cutoff).values_list('pk', flat=True)[:batch_size])
+            if not keys:
+                return deleted
+            deleted += model.objects.filter(pk__in=keys).delete()[0]
+        if pause:
+            time.sleep(pause)
@@ -0,0 +1,109 @@
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .catalogue import invalidate_catalogue
+from .documents import release_blob
+from .fulltext import TEXT_FIELDS, index_document, remove_document
+from .instrumentation import watch_queries
+from .models import User, UserProfile, Category, Service, ServiceProfessional, Notification, ProfessionalDocuments
+from .notifications import adjust_unread
+from .search import INDEXED_PRO_FIELDS, index_location, index_professional, index_service
+from .thumbnails import schedule
+
+# Image fields that get thumbnail derivatives, by model.
+IMAGE_FIELDS = {User: 'profile_picture', ServiceProfessional: 'profile_picture', Category: 'icon'}
+
+
+@receiver([post_save, post_delete], sender=Category)
+@receiver([post_save, post_delete], sender=Service)
+@receiver([post_save, post_delete], sender=ServiceProfessional)
+def catalogue_changed(sender, **kwargs):
+    # After commit: a home request in between would cache the old rows under the new version.
+    transaction.on_commit(invalidate_catalogue)
+
+
+@receiver(connection_created)
+def connection_opened(sender, connection, **kwargs):
+    # Each thread opens its own connection; all of them report to the request metrics.
+    watch_queries(connection)
+
+
+@receiver(post_save, sender=Notification)
+def notification_saved(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.user_id, 1)
+
+
+@receiver(post_delete, sender=Notification)
+def notification_deleted(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.user_id, -1)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=ServiceProfessional)
+@receiver(post_save, sender=Category)
+def image_saved(sender, instance, update_fields=None, **kwargs):
+    field = IMAGE_FIELDS[sender]
+    # Saves that cannot have touched the image (e.g. last_login on login) are skipped.
+    if update_fields is not None and field not in update_fields:
+        return
+    image = getattr(instance, field)
+    if image:
+        transaction.on_commit(lambda: schedule(image.name))
+
+
+@receiver(post_delete, sender=ProfessionalDocuments)
+def document_deleted(sender, instance, **kwargs):
+    if instance.sha256:
+        transaction.on_commit(lambda: release_blob(instance.sha256, instance.document_file.name))
+
+
+@receiver(post_save, sender=ServiceProfessional)
+def professional_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or INDEXED_PRO_FIELDS.intersection(update_fields):
+        index_professional(instance.id)
+
+
+@receiver(post_save, sender=Service)
+def service_saved(sender, instance, **kwargs):
+    index_service(instance)
+
+
+@receiver(post_save, sender=UserProfile)
+def profile_saved(sender, instance, **kwargs):
+    index_location(instance.user_id, instance.latitude, instance.longitude, instance.geohash)
+
+
+# Documents in the full-text index, by model.
+FULLTEXT_KINDS = {Service: 'service', Category: 'category', ServiceProfessional: 'professional'}
+
+
+@receiver(post_save, sender=Service)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=ServiceProfessional)
+def fulltext_saved(sender, instance, update_fields=None, **kwargs):
+    kind = FULLTEXT_KINDS[sender]
+    if update_fields is not None and not TEXT_FIELDS[kind].intersection(update_fields):
+        return
+    index_document(kind, instance)
+
+
+@receiver(post_delete, sender=Service)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=ServiceProfessional)
+def fulltext_deleted(sender, instance, **kwargs):
+    remove_document(FULLTEXT_KINDS[sender], instance.pk)
+
+
+@receiver(post_save, sender=User)
+def username_saved(sender, instance, created, update_fields=None, **kwargs):
+    # A professional's document is titled with their username.
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    pro = ServiceProfessional.objects.filter(user=instance).only('bio').first()
+    if pro is not None:
+        pro.user = instance
+        index_document('professional', pro)
@@ -0,0 +1,105 @@
+from django.db import connection, transaction
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Cast
+
+from .catalogue import invalidate_catalogue
+from .models import Booking, Review, ServiceProfessional
+from .search import sync_ratings
+
+
+def record_review(review):
+    """
+    Fold a newly created review into its professional's running rating aggregates.
+    `rating` is kept as the mean so ordering and rating filters read a single
+    indexed column. Call inside the transaction that created the review.
+    """
+    ServiceProfessional.objects.filter(pk=review.booking.professional_id).update(
+        rating_sum=F('rating_sum') + review.rating,
+        rating_count=F('rating_count') + 1,
+        # SET expressions read the pre-update row, so this is the new mean.
+        rating=Cast(F('rating_sum') + review.rating, FloatField()) / (F('rating_count') + 1),
+    )
+    # Queryset updates bypass post_save, and the home page and search rank pros by rating.
+    sync_ratings([review.booking.professional_id])
+    transaction.on_commit(invalidate_catalogue)
+
+
+def record_job_completed(booking):
+    """
+    Count a booking that has just moved to COMPLETED. Repeat customers feed the
+    rehire percentage; the previous completions for this customer/professional
+    pair decide whether the customer is new, has just rehired, or already had.
+    """
+    previous = Booking.objects.filter(
+        professional_id=booking.professional_id,
+        customer_id=booking.customer_id,
+        status='COMPLETED',
+    ).exclude(pk=booking.pk).count()
+    new_customer = 1 if previous == 0 else 0
+    new_repeat = 1 if previous == 1 else 0
+
+    ServiceProfessional.objects.filter(pk=booking.professional_id).update(
+        total_jobs=F('total_jobs') + 1,
+        customer_count=F('customer_count') + new_customer,
+        repeat_customer_count=F('repeat_customer_count') + new_repeat,
+        rehire_percentage=(
+            Cast(F('repeat_customer_count') + new_repeat, FloatField()) * Value(100.0)
+            / (F('customer_count') + new_customer)
+        ),
+    )
+
+
+def rebuild_professional_stats(batch_size=1000):
+    """
+    Recompute every professional's aggregates from Booking and Review in a few
+    grouped queries and write them back with one parameterised UPDATE run
+    through executemany; bulk_update's CASE expressions take longer to compile
+    than to execute once there are thousands of professionals. Returns the
+    number of professionals updated.
+    """
+    ratings = {
+        row['booking__professional']: row
+        for row in Review.objects.values('booking__professional').annotate(total=Sum('rating'), count=Count('id'))
+    }
+    # Completed jobs per customer and professional; summing them per professional
+    # gives the job count without another pass over the bookings.
+    jobs, customers = {}, {}
+    for pro_id, per_customer in (
+        Booking.objects.filter(status='COMPLETED').values('professional', 'customer')
+        .annotate(count=Count('id')).values_list('professional', 'count')
+    ):
+        jobs[pro_id] = jobs.get(pro_id, 0) + per_customer
+        total, repeat = customers.get(pro_id, (0, 0))
+        customers[pro_id] = (total + 1, repeat + (1 if per_customer > 1 else 0))
+
+    quote = connection.ops.quote_name
+    fields = ['rating_sum', 'rating_count', 'rating', 'total_jobs', 'customer_count', 'repeat_customer_count', 'rehire_percentage']
+    assignments = ', '.join(f'{quote(ServiceProfessional._meta.get_field(name).column)} = %s' for name in fields)
+    sql = (
+        f'UPDATE {quote(ServiceProfessional._meta.db_table)} SET {assignments} '
+        f'WHERE {quote(ServiceProfessional._meta.pk.column)} = %s'
+    )
+    updated = 0
+    with transaction.atomic(), connection.cursor() as cursor:
+        rows = []
+        # Read every id up front: no cursor is left open on the table being updated.
+        for pro_id in list(ServiceProfessional.objects.order_by('id').values_list('id', flat=True)):
+            rating = ratings.get(pro_id)
+            rating_sum, rating_count = (rating['total'], rating['count']) if rating else (0, 0)
+            customer_count, repeat_count = customers.get(pro_id, (0, 0))
+            rows.append((
+                rating_sum, rating_count, rating_sum / rating_count if rating_count else 0.0,
+                jobs.get(pro_id, 0), customer_count, repeat_count,
+                100.0 * repeat_count / customer_count if customer_count else 0.0,
+                pro_id,
+            ))
+            if len(rows) >= batch_size:
+                cursor.executemany(sql, rows)
+                updated += len(rows)
+                rows = []
+        if rows:
+            cursor.executemany(sql, rows)
+            updated += len(rows)
+        sync_ratings()
+        transaction.on_commit(invalidate_catalogue)
+    return updated
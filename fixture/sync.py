@@ -0,0 +1,214 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+from django.apps import apps
+
+BATCH_SIZE = 5000
+# Ids per `id IN (...)` lookup, well under SQLite's bound-parameter limit.
+LOOKUP_SIZE = 500
+# Rows whose updated_at is this close below the last watermark are compared
+# again, in case their transaction committed after the previous sync read.
+WATERMARK_SLACK = 300
+WATERMARK_TABLE = 'fixture_sync_watermark'
+TYPE_TAGS = {int: b'i', float: b'f', str: b's', bytes: b'b'}
+
+
+class TableReport:
+    def __init__(self, table):
+        self.table = table
+        self.inserted = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.deleted = 0
+        self.seconds = 0.0
+        self.changed_ids = []
+
+    @property
+    def scanned(self):
+        return self.inserted + self.updated + self.unchanged
+
+
+def fixture_tables():
+    """Tables of the fixture app ordered so that every table follows the tables it references."""
+    models = list(apps.get_app_config('fixture').get_models())
+    ordered, seen = [], set()
+
+    def visit(model):
+        if model in seen:
+            return
+        seen.add(model)
+        for f in model._meta.concrete_fields:
+            if f.is_relation and f.related_model in models and f.related_model is not model:
+                visit(f.related_model)
+        ordered.append(model._meta.db_table)
+
+    for model in models:
+        visit(model)
+    return ordered
+
+
+def table_columns(conn, table):
+    return [row[1] for row in conn.execute(f'PRAGMA table_info("{table}")')]
+
+
+def row_digest(row):
+    """
+    BLAKE2b of a row over a typed, length-prefixed encoding of its values, so
+    equal digests mean equal rows: unlike hash(), 1 and 1.0, '1' and 1, or -1
+    and -2 never collide, and the digest does not depend on the process.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for value in row:
+        if value is None:
+            digest.update(b'n')
+            continue
+        payload = value if isinstance(value, bytes) else (repr(value) if isinstance(value, float) else str(value)).encode()
+        digest.update(b'%s%d:' % (TYPE_TAGS[type(value)], len(payload)))
+        digest.update(payload)
+    return digest.digest()
+
+
+def target_digests(dst, table, column_list, id_index, ids):
+    """{id: digest} of the given ids' rows in `dst`."""
+    digests = {}
+    for i in range(0, len(ids), LOOKUP_SIZE):
+        chunk = ids[i:i + LOOKUP_SIZE]
+        rows = dst.execute(f'SELECT {column_list} FROM "{table}" WHERE id IN ({", ".join("?" * len(chunk))})', chunk)
+        digests.update((row[id_index], row_digest(row)) for row in rows)
+    return digests
+
+
+def read_watermark(dst, source, table):
+    row = dst.execute(
+        f'SELECT updated_at FROM "{WATERMARK_TABLE}" WHERE source = ? AND table_name = ?', (source, table)
+    ).fetchone()
+    return row[0] if row else None
+
+
+def save_watermark(dst, source, table, updated_at):
+    dst.execute(
+        f'INSERT INTO "{WATERMARK_TABLE}" (source, table_name, updated_at) VALUES (?, ?, ?) '
+        f'ON CONFLICT(source, table_name) DO UPDATE SET updated_at = excluded.updated_at',
+        (source, table, updated_at),
+    )
+
+
+def sync_table(src, dst, table, dry_run=False, prune=False, batch_size=BATCH_SIZE, keep_ids=0, source=None, full=False):
+    """
+    Upsert changed rows of `table` from `src` into `dst`. Rows are compared by
+    row_digest() so unchanged rows are skipped without being written; changed
+    rows go out through executemany in `batch_size` chunks. Only columns
+    present on both sides are compared and copied.
+
+    When `source` names the source database and the table has an updated_at
+    column, the newest updated_at copied is kept in the target, and the next
+    sync from that source only reads rows updated since (less
+    WATERMARK_SLACK), looking their counterparts up by id, instead of both
+    whole tables. That relies on every write setting updated_at; `full`
+    compares every row and resets the watermark.
+    """
+    started = time.perf_counter()
+    report = TableReport(table)
+    dst_cols = set(table_columns(dst, table))
+    columns = [c for c in table_columns(src, table) if c in dst_cols]
+    if not columns or 'id' not in columns:
+        return report
+    column_list = ', '.join(f'"{c}"' for c in columns)
+    id_index = columns.index('id')
+    select = f'SELECT {column_list} FROM "{table}"'
+
+    stamp_index = columns.index('updated_at') if source is not None and 'updated_at' in columns else None
+    since = read_watermark(dst, source, table) if stamp_index is not None and not full else None
+    if since is None:
+        existing = {row[id_index]: row_digest(row) for row in dst.execute(select)}
+        cursor = src.execute(select)
+    else:
+        existing = None
+        cursor = src.execute(f'{select} WHERE "updated_at" >= datetime(?, ?)', (since, f'-{WATERMARK_SLACK} seconds'))
+    newest = since
+    updates = ', '.join(f'"{c}" = excluded."{c}"' for c in columns if c != 'id')
+    upsert = (
+        f'INSERT INTO "{table}" ({column_list}) VALUES ({", ".join("?" * len(columns))}) '
+        f'ON CONFLICT(id) DO ' + (f'UPDATE SET {updates}' if updates else 'NOTHING')
+    )
+
+    batch = []
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if existing is not None:
+            known = existing
+        else:
+            known = target_digests(dst, table, column_list, id_index, [row[id_index] for row in rows])
+        if stamp_index is not None:
+            newest = max([newest or ''] + [row[stamp_index] for row in rows if row[stamp_index]]) or None
+        for row in rows:
+            pk = row[id_index]
+            previous = known.pop(pk, None)
+            if previous is None:
+                report.inserted += 1
+            elif previous != row_digest(row):
+                report.updated += 1
+            else:
+                report.unchanged += 1
+                continue
+            if len(report.changed_ids) < keep_ids:
+                report.changed_ids.append(pk)
+            batch.append(row)
+        if batch and not dry_run:
+            dst.executemany(upsert, batch)
+        batch = []
+
+    if prune:
+        if existing is None:
+            existing = {row[0] for row in dst.execute(f'SELECT id FROM "{table}"')}
+            existing.difference_update(row[0] for row in src.execute(f'SELECT id FROM "{table}"'))
+        # Whatever is left in `existing` is no longer in the source.
+        report.deleted = len(existing)
+        if existing and not dry_run:
+            stale = [(pk,) for pk in existing]
+            for i in range(0, len(stale), batch_size):
+                dst.executemany(f'DELETE FROM "{table}" WHERE id = ?', stale[i:i + batch_size])
+    if newest is not None and newest != since:
+        save_watermark(dst, source, table, newest)
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def sync_databases(source_path, target_path, tables=None, dry_run=False, prune=False, batch_size=BATCH_SIZE, keep_ids=0,
+                   full=False):
+    """
+    Sync fixture tables from one SQLite file to another inside a single target
+    transaction, which is rolled back on error or in dry-run mode. Tables with
+    updated_at are synced incrementally from the last watermark for this
+    source unless `full` is set. Returns a list of TableReport in the order
+    tables were processed.
+    """
+    src = sqlite3.connect(f'file:{source_path}?mode=ro', uri=True)
+    dst = sqlite3.connect(target_path, isolation_level=None)
+    reports = []
+    try:
+        dst.execute('PRAGMA foreign_keys = OFF')
+        dst.execute('BEGIN IMMEDIATE')
+        try:
+            dst.execute(
+                f'CREATE TABLE IF NOT EXISTS "{WATERMARK_TABLE}" '
+                f'(source TEXT NOT NULL, table_name TEXT NOT NULL, updated_at TEXT NOT NULL, PRIMARY KEY (source, table_name))'
+            )
+            source = os.path.realpath(source_path)
+            src_tables = {row[0] for row in src.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            dst_tables = {row[0] for row in dst.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            for table in tables or fixture_tables():
+                if table in src_tables and table in dst_tables:
+                    reports.append(sync_table(src, dst, table, dry_run, prune, batch_size, keep_ids, source, full))
+        except BaseException:
+            dst.execute('ROLLBACK')
+            raise
+        dst.execute('ROLLBACK' if dry_run else 'COMMIT')
+    finally:
+        src.close()
+        dst.close()
+    return reports
@@ -0,0 +1,33 @@
+from django import template
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+
+from ..thumbnails import thumbnail_urls
+
+register = template.Library()
+
+
+@register.simple_tag
+def thumbnail(image, size, **attrs):
+    """
+    Render `image` (an ImageField value) as a `size`-pixel square.
+
+        {% thumbnail pro.profile_picture 80 class="rounded-circle" %}
+
+    Emits a <picture> with WebP and JPEG derivatives at 1x and 2x; until the
+    derivatives exist the original upload is used and generation is queued.
+    Renders nothing for an empty field.
+    """
+    if not image:
+        return ''
+    size = int(size)
+    attrs = {'width': size, 'height': size, 'alt': '', 'loading': 'lazy', **attrs}
+    urls = thumbnail_urls(image.name, size)
+    if urls is None:
+        return format_html('<img src="{}"{}>', image.url, flatatt(attrs))
+    webp, jpg = urls['webp'], urls['jpg']
+    return format_html(
+        '<picture><source type="image/webp" srcset="{} 1x, {} 2x">'
+        '<img src="{}" srcset="{} 1x, {} 2x"{}></picture>',
+        webp[0], webp[1], jpg[0], jpg[0], jpg[1], flatatt(attrs),
+    )
@@ -0,0 +1,47 @@
+"""
+What most tests start from: the Plumbing category with its Leak Fix service,
+a customer and a professional. Test modules keep only what they need
+different, as keyword arguments or extra objects of their own.
+"""
+from django.contrib.auth import get_user_model
+
+from .models import Booking, Category, Service, ServiceProfessional
+
+User = get_user_model()
+
+PASSWORD = 'password'
+SERVICE = {'name': "Leak Fix", 'base_price': 50, 'duration': 60}
+
+
+def make_category():
+    return Category.objects.create(name="Plumbing", description="Fix leaks")
+
+
+def make_service(category, **fields):
+    return Service.objects.create(category=category, **{**SERVICE, **fields})
+
+
+def make_customer(username='customer'):
+    return User.objects.create_user(username=username, password=PASSWORD, is_customer=True)
+
+
+def make_pro(category, username='pro', **fields):
+    user = User.objects.create_user(username=username, password=PASSWORD, is_professional=True)
+    return ServiceProfessional.objects.create(user=user, category=category, **fields)
+
+
+class MarketplaceFixtures:
+    """Test case mixin: make_marketplace() in setUp, then make_booking() as needed."""
+
+    def make_marketplace(self, **service):
+        self.category = make_category()
+        self.service = make_service(self.category, **service)
+        self.customer = make_customer()
+        self.pro_profile = make_pro(self.category)
+        self.pro_user = self.pro_profile.user
+
+    def make_booking(self, status='PENDING', **fields):
+        return Booking.objects.create(**{
+            'customer': self.customer, 'professional': self.pro_profile, 'service': self.service, 'status': status,
+            **fields,
+        })
@@ -0,0 +1,78 @@
+from unittest import mock
+
+from django.db import IntegrityError, transaction
+from django.test import TestCase
+from django.urls import reverse
+
+from .accounts import normalize_phone
+from .backends import find_user, with_email
+from .forms import RegistrationForm
+from .models import User
+
+
+class NormalizePhoneTest(TestCase):
+    def test_separators_country_code_and_trunk_zero_go(self):
+        for raw in ("9845012345", "+91 98450-12345", "098450 12345", "(984) 501.2345", "919845012345"):
+            self.assertEqual(normalize_phone(raw), "9845012345", raw)
+
+    def test_non_numbers_are_not_phones(self):
+        for raw in (None, "", "ravi", "98450", "ravi@example.com", "1" * 16):
+            self.assertIsNone(normalize_phone(raw), raw)
+
+
+class IdentifierLoginTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="ravi", email="Ravi.Kumar@Example.com", phone_number="+91 98450 12345",
+            password="password", is_customer=True,
+        )
+
+    def log_in(self, identifier, password="password"):
+        return self.client.post(reverse('login'), {'username': identifier, 'password': password})
+
+    def test_phone_is_stored_normalised(self):
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.phone_number, "9845012345")
+
+    def test_username_email_and_phone_all_log_in(self):
+        for identifier in ("ravi", "ravi.kumar@example.com", "RAVI.KUMAR@EXAMPLE.COM", "098450-12345"):
+            self.client.logout()
+            self.assertRedirects(self.log_in(identifier), reverse('home'), fetch_redirect_response=False, msg_prefix=identifier)
+            self.assertEqual(int(self.client.session['_auth_user_id']), self.user.pk)
+
+    def test_wrong_password_fails(self):
+        response = self.log_in("ravi.kumar@example.com", "wrong")
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('_auth_user_id', self.client.session)
+
+    def test_unknown_identifier_still_hashes_the_password(self):
+        with mock.patch.object(User, 'set_password', autospec=True) as set_password:
+            response = self.log_in("nobody@example.com")
+        self.assertEqual(response.status_code, 200)
+        set_password.assert_called_once()
+
+    def test_a_username_beats_someone_elses_email(self):
+        other = User.objects.create_user(username="ravi.kumar@example.com", password="password")
+        self.assertEqual(find_user("ravi.kumar@example.com"), other)
+
+    def test_lookups_read_one_index(self):
+        self.assertIn('USING INDEX unique_user_email', with_email("ravi.kumar@example.com").explain())
+        with self.assertNumQueries(1):
+            find_user("9845012345")
+
+    def test_email_and_phone_are_unique(self):
+        for duplicate in ({'email': "ravi.kumar@EXAMPLE.com"}, {'phone_number': "09845012345"}):
+            with self.assertRaises(IntegrityError), transaction.atomic():
+                User.objects.create_user(username="copy", password="password", **duplicate)
+        # Blank emails and phone numbers are not identifiers, so any number of accounts can lack them.
+        User.objects.create_user(username="blank1", email="", phone_number="")
+        User.objects.create_user(username="blank2", email="", phone_number="")
+
+    def test_registration_rejects_taken_email_and_phone(self):
+        form = RegistrationForm(data={
+            'username': "newcomer", 'password1': "s3cret-Passw0rd", 'password2': "s3cret-Passw0rd",
+            'email': "RAVI.kumar@example.com", 'phone_number': "+91 98450 12345", 'full_name': "New Comer",
+            'role': 'customer', 'terms_accepted': True,
+        })
+        self.assertFalse(form.is_valid())
+        self.assertEqual(set(form.errors), {'email', 'phone_number'})
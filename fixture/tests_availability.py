@@ -0,0 +1,117 @@
+import threading
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.db import IntegrityError, OperationalError, close_old_connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from .models import Booking, SlotReservation
+from .availability import SlotContended, SlotUnavailable, book_slot, reserve_slot, slot_calendar
+from .testing import MarketplaceFixtures, make_category, make_pro, make_service
+
+User = get_user_model()
+
+class SlotReservationTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        # Two-hour jobs fit twice into each four-hour window.
+        self.make_marketplace(name="Pipe Refit", duration=120)
+        self.day = (timezone.now() + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def book(self, time_slot='Morning'):
+        booking = self.make_booking(booking_date=self.day, time_slot=time_slot)
+        reserve_slot(booking)
+        return booking
+
+    def test_window_capacity_follows_service_duration(self):
+        first, second = self.book(), self.book()
+        self.assertEqual(timezone.localtime(first.booking_date).hour, 8)
+        self.assertEqual(timezone.localtime(second.booking_date).hour, 10)
+        with self.assertRaises(SlotUnavailable):
+            self.book()
+        calendar = slot_calendar(self.pro_profile, self.day.date(), self.service)
+        self.assertEqual(calendar, {'Morning': 0, 'Afternoon': 2, 'Evening': 2})
+
+    def test_cancelling_releases_slot(self):
+        first, _ = self.book(), self.book()
+        self.client.force_login(self.pro_user)
+        self.client.get(reverse('update_booking_status', kwargs={'booking_id': first.id, 'status': 'CANCELLED'}))
+        self.assertEqual(slot_calendar(self.pro_profile, self.day.date(), self.service)['Morning'], 1)
+        self.book()
+
+    def test_lost_races_are_not_reported_as_full(self):
+        booking = self.make_booking(booking_date=self.day, time_slot='Morning')
+        with mock.patch.object(SlotReservation.objects, 'bulk_create', side_effect=IntegrityError):
+            with self.assertRaisesMessage(SlotContended, "please try again"):
+                reserve_slot(booking)
+        self.assertEqual(slot_calendar(self.pro_profile, self.day.date(), self.service)['Morning'], 2)
+
+    def test_full_slot_rejected_by_view(self):
+        self.book(), self.book()
+        self.client.force_login(self.customer)
+        response = self.client.post(reverse('book_professional', kwargs={'pro_id': self.pro_profile.id}), {
+            'service': self.service.id,
+            'booking_date': self.day.date().isoformat(),
+            'time_slot': 'Morning',
+            'confirmation': 'on',
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "fully booked")
+        self.assertEqual(Booking.objects.count(), 2)
+
+
+class ConcurrentBookingTest(TransactionTestCase):
+    REQUESTS = 50
+
+    def setUp(self):
+        self.category = make_category()
+        self.service = make_service(self.category)
+        self.pro_profile = make_pro(self.category)
+        self.customers = [
+            User.objects.create(username=f"customer{i}", is_customer=True) for i in range(self.REQUESTS)
+        ]
+        self.day = (timezone.now() + timedelta(days=3)).replace(hour=0, minute=0, second=0, microsecond=0)
+
+    def test_no_double_booking_under_concurrency(self):
+        barrier = threading.Barrier(self.REQUESTS)
+        outcomes, errors = [], []
+
+        def attempt(customer):
+            try:
+                barrier.wait(timeout=30)
+                # In-memory SQLite reports table lock contention instead of waiting; retry like a client would.
+                for _ in range(200):
+                    try:
+                        book_slot(Booking(
+                            customer=customer, professional=self.pro_profile, service=self.service,
+                            booking_date=self.day, time_slot='Morning',
+                        ))
+                        outcomes.append('booked')
+                        break
+                    except SlotUnavailable:
+                        outcomes.append('full')
+                        break
+                    except OperationalError:
+                        time.sleep(0.005)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=attempt, args=(c,)) for c in self.customers]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(outcomes), self.REQUESTS)
+        # A four-hour morning window holds four one-hour jobs.
+        self.assertEqual(outcomes.count('booked'), 4)
+        bookings = Booking.objects.filter(professional=self.pro_profile)
+        self.assertEqual(bookings.count(), 4)
+        self.assertEqual(len(set(bookings.values_list('booking_date', flat=True))), 4)
+        # Each one-hour job holds two 30-minute calendar units.
+        self.assertEqual(SlotReservation.objects.count(), 8)
@@ -0,0 +1,132 @@
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import F, Max
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .benchmarks import ROUTES, benchmark_fixture, compare, routes, run_client, uncovered
+from .lifecycle import TRANSITIONS
+from .models import (
+    Booking, Invoice, Notification, Payment, Review, SearchEntry, ServiceProfessional, SlotReservation, User, UserProfile,
+)
+from .availability import reserved_units
+from .seeding import PASSWORD, booking_calendar, generate, seed
+
+
+class SeedingTest(TestCase):
+    def test_seeded_data_is_consistent(self):
+        counts = seed(customers=10, professionals=4, bookings=120, notifications_per_user=2, invoices=True)
+        self.assertEqual(Booking.objects.count(), 120)
+        self.assertEqual(Notification.objects.count(), 28)
+        completed = Booking.objects.filter(status='COMPLETED')
+        self.assertEqual(Invoice.objects.count(), completed.count())
+        self.assertEqual(Payment.objects.count(), completed.count())
+        self.assertEqual(Review.objects.count(), counts['reviews'])
+        self.assertFalse(Review.objects.exclude(booking__status='COMPLETED').exists())
+        self.assertFalse(Booking.objects.filter(created_at__gt=F('booking_date')).exists())
+        self.assertFalse(Booking.objects.filter(status='PENDING', booking_date__lt=timezone.now()).exists())
+        statuses = set(Booking.objects.values_list('status', flat=True))
+        self.assertLessEqual(statuses, set(TRANSITIONS))
+        # PROCESSING only happens in the last day, too rare to count on at this size.
+        self.assertGreaterEqual(statuses, {'PENDING', 'COMPLETED', 'CANCELLED'})
+        # Every professional only offers services of their own category.
+        self.assertFalse(Booking.objects.exclude(service__category=F('professional__category')).exists())
+        self.assertEqual(UserProfile.objects.filter(geohash__isnull=False).count(), 14)
+        # Derived data is rebuilt, as signals and record_review would have kept it.
+        self.assertTrue(SearchEntry.objects.exists())
+        pro = ServiceProfessional.objects.filter(rating_count__gt=0).first()
+        self.assertEqual(pro.rating_count, Review.objects.filter(booking__professional=pro).count())
+        self.assertTrue(User.objects.get(username='seed-customer-0').check_password(PASSWORD))
+
+    def test_open_bookings_hold_their_slots(self):
+        counts = seed(customers=10, professionals=2, bookings=400)
+        self.assertEqual(SlotReservation.objects.count(), counts['reservations'])
+        open_bookings = Booking.objects.filter(status__in=['PENDING', 'CONFIRMED', 'PROCESSING']).select_related('service')
+        self.assertTrue(open_bookings)
+        for booking in open_bookings:
+            held = sorted(booking.slot_reservations.values_list('start_minute', flat=True))
+            start = booking.booking_date.hour * 60 + booking.booking_date.minute
+            self.assertEqual(held, list(range(start, start + len(held) * 30, 30)))
+            self.assertEqual(len(held), -(-booking.service.duration // 30))
+            self.assertLessEqual(set(held), reserved_units(booking.professional_id, booking.booking_date.date()))
+        self.assertFalse(SlotReservation.objects.exclude(booking__status__in=['PENDING', 'CONFIRMED', 'PROCESSING']).exists())
+        # No two bookings of a professional overlap, open or not.
+        booked = {}
+        for booking in Booking.objects.select_related('service'):
+            start = booking.booking_date.hour * 60 + booking.booking_date.minute
+            for minute in range(start, start + -(-booking.service.duration // 30) * 30, 30):
+                key = (booking.professional_id, booking.booking_date.date(), minute)
+                self.assertNotIn(key, booked)
+                booked[key] = booking.pk
+
+    def test_ordinary_inserts_follow_a_seed(self):
+        seed(customers=3, professionals=2, bookings=20)
+        last_user = User.objects.aggregate(last=Max('pk'))['last']
+        last_booking = Booking.objects.aggregate(last=Max('pk'))['last']
+
+        user = User.objects.create_user(username='after-seed', password=PASSWORD, is_customer=True)
+        UserProfile.objects.create(user=user)
+        booking = Booking.objects.create(
+            customer=user, professional=ServiceProfessional.objects.first(), service=Booking.objects.first().service,
+            booking_date=timezone.now(), time_slot='Morning', service_address="1 Main St",
+        )
+        self.assertGreater(user.pk, last_user)
+        self.assertGreater(booking.pk, last_booking)
+
+    def test_indexes_dropped_for_loading_are_recreated(self):
+        def indexes():
+            with connection.cursor() as cursor:
+                return connection.introspection.get_constraints(cursor, Booking._meta.db_table).keys()
+
+        before = set(indexes())
+        seed(customers=3, professionals=2, bookings=20)
+        self.assertEqual(set(indexes()), before)
+
+    def test_output_does_not_depend_on_worker_count(self):
+        state = {
+            **booking_calendar(timezone.now()), 'customers': [1, 2, 3],
+            'pros_by_city': [[10], [11, 12]], 'services_by_pro': {10: [(5, '10.00', 1)], 11: [(6, '20.00', 2)], 12: [(7, '30.00', 4)]},
+        }
+        tasks = [(1, 30, 1, 0, 3), (31, 30, 2, 1, 3), (61, 30, 3, 2, 3)]
+        serial = list(generate(tasks, state, workers=1))
+        self.assertEqual(list(generate(tasks, state, workers=2)), serial)
+        self.assertEqual([row[0] for rows in serial for row in rows['bookings']], list(range(1, 91)))
+
+
+class RouteBenchmarkTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media, ignore_errors=True)
+
+    def test_every_route_is_benchmarked_or_excluded(self):
+        self.assertEqual(uncovered(), set())
+
+    def test_every_route_answers_without_errors(self):
+        seed(customers=10, professionals=4, bookings=60, invoices=True)
+        fixture = benchmark_fixture()
+        with override_settings(MEDIA_ROOT=self.media, PRIVATE_MEDIA_ROOT=self.media):
+            results = run_client(routes(fixture), fixture, requests=2)
+        self.assertEqual([row['route'] for row in results], [name for name, _, _ in ROUTES])
+        self.assertEqual([row['route'] for row in results if row['errors']], [])
+        customer_bookings = next(row for row in results if row['route'] == 'customer_bookings')
+        self.assertEqual(customer_bookings['requests'], 2)
+        self.assertGreater(customer_bookings['queries'], 0)
+
+    def test_compare_flags_query_and_latency_regressions(self):
+        saved = {'routes': {
+            'home': {'route': 'home', 'queries': 2, 'p95_ms': 10.0, 'errors': 0},
+            'login': {'route': 'login', 'queries': 1, 'p95_ms': 1.0, 'errors': 0},
+        }}
+        results = [
+            {'route': 'home', 'queries': 3, 'p95_ms': 20.0, 'errors': 0},
+            # Twice as slow, but within MIN_REGRESSION_MS: noise.
+            {'route': 'login', 'queries': 1, 'p95_ms': 2.0, 'errors': 0},
+            {'route': 'new', 'queries': 9, 'p95_ms': 99.0, 'errors': 0},
+        ]
+        self.assertEqual(compare(saved, results), [
+            "home: 3 queries, was 2",
+            "home: p95 20.0 ms, was 10.0 ms",
+        ])
@@ -0,0 +1,64 @@
+from django.core.cache import cache
+from django.test import TestCase, Client
+from django.urls import reverse
+from .catalogue import invalidate_catalogue
+from .models import Category, Service
+from .testing import make_category, make_pro, make_service
+
+
+class HomeCatalogueCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.category = make_category()
+        self.service = make_service(self.category)
+        self.pro_profile = make_pro(self.category, "toppro")
+        self.client = Client()
+
+    def test_warm_home_page_runs_no_queries(self):
+        self.client.get(reverse('home'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+        self.assertContains(response, "Plumbing")
+        self.assertContains(response, "toppro")
+
+    def test_category_save_invalidates(self):
+        self.client.get(reverse('home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Category.objects.create(name="Electrical", description="Wiring")
+        self.assertContains(self.client.get(reverse('home')), "Electrical")
+
+    def test_category_delete_invalidates(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Category.objects.create(name="Painting", description="Walls")
+        self.assertContains(self.client.get(reverse('home')), "Painting")
+        with self.captureOnCommitCallbacks(execute=True):
+            other.delete()
+        self.assertNotContains(self.client.get(reverse('home')), "Painting")
+
+    def test_professional_save_invalidates(self):
+        self.client.get(reverse('home'))
+        with self.captureOnCommitCallbacks(execute=True):
+            make_pro(self.category, "newpro", rating=5)
+        self.assertContains(self.client.get(reverse('home')), "newpro")
+
+    def test_invalidation_waits_for_commit(self):
+        self.client.get(reverse('home'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            Category.objects.create(name="Electrical", description="Wiring")
+            # Still the cached page: the change is not committed yet.
+            self.assertNotContains(self.client.get(reverse('home')), "Electrical")
+        self.assertIn(invalidate_catalogue, callbacks)
+        for callback in callbacks:
+            callback()
+        self.assertContains(self.client.get(reverse('home')), "Electrical")
+
+    def test_ratings_are_shown_to_one_decimal(self):
+        make_pro(self.category, "ratedpro", rating=11 / 3, safety_score=9)
+        response = self.client.get(reverse('home'))
+        self.assertContains(response, "3.7")
+        self.assertNotContains(response, "3.666")
+
+    def test_inactive_services_are_excluded(self):
+        Service.objects.create(category=self.category, name="Retired", base_price=10, duration=30, is_active=False)
+        response = self.client.get(reverse('home'))
+        self.assertEqual([s.name for s in response.context['services']], ["Leak Fix"])
@@ -0,0 +1,70 @@
+import os
+import runpy
+import tempfile
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.test import SimpleTestCase
+
+
+def load_settings(**env):
+    """The settings module's globals as they come out under the given environment."""
+    with mock.patch.dict(os.environ, env):
+        return runpy.run_path(str(settings.BASE_DIR / 'home' / 'settings.py'))
+
+
+def standin_settings():
+    """The postgres profile, pointed by FIXTURE_DB_* at a stand-in server."""
+    return load_settings(FIXTURE_DB='postgres')['DATABASES']['default']
+
+
+class DatabaseProfileTest(SimpleTestCase):
+    def test_unknown_profile_is_refused(self):
+        with self.assertRaisesMessage(ImproperlyConfigured, "FIXTURE_DB='postgresql'"):
+            load_settings(FIXTURE_DB='postgresql')
+
+    def test_postgres_profile_is_pooled(self):
+        database = load_settings(FIXTURE_DB='postgres', FIXTURE_DB_HOST='db.internal', FIXTURE_DB_POOL_MAX='4')
+        database = database['DATABASES']['default']
+        self.assertEqual(database['ENGINE'], 'django.db.backends.postgresql')
+        self.assertEqual(database['HOST'], 'db.internal')
+        self.assertEqual(database['CONN_MAX_AGE'], 0)
+        self.assertEqual(database['OPTIONS']['pool']['max_size'], 4)
+
+    @skipUnless(settings.DB_PROFILE == 'sqlite', "only the sqlite profile sets pragmas")
+    def test_new_connections_get_the_pragmas(self):
+        # The test database lives in memory, where WAL does not apply, so open a file.
+        with tempfile.TemporaryDirectory() as tmp:
+            default = connections['default']
+            wrapper = default.__class__({**default.settings_dict, 'NAME': os.path.join(tmp, 'pragmas.sqlite3')}, alias='pragmas')
+            try:
+                with wrapper.cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode')
+                    self.assertEqual(cursor.fetchone(), ('wal',))
+                    cursor.execute('PRAGMA synchronous')
+                    self.assertEqual(cursor.fetchone(), (1,))  # NORMAL
+                    cursor.execute('PRAGMA busy_timeout')
+                    self.assertEqual(cursor.fetchone(), (5000,))
+            finally:
+                wrapper.close()
+
+
+@skipUnless(os.environ.get('FIXTURE_TEST_POSTGRES'), "set FIXTURE_TEST_POSTGRES=1 and FIXTURE_DB_* to a stand-in server")
+class PostgresStandInTest(SimpleTestCase):
+    """Connects to a throwaway PostgreSQL with the postgres profile, e.g. `docker run -e POSTGRES_PASSWORD=... postgres`."""
+
+    def test_profile_connects_through_the_pool(self):
+        from django.db.backends.postgresql.base import DatabaseWrapper
+
+        wrapper = DatabaseWrapper({**connections['default'].settings_dict, **standin_settings()}, alias='standin')
+        try:
+            for _ in range(2):
+                with wrapper.cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                    self.assertEqual(cursor.fetchone(), (1,))
+                wrapper.close()
+            self.assertIsNotNone(wrapper.pool)
+        finally:
+            wrapper.close_pool()
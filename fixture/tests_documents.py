@@ -0,0 +1,89 @@
+import os
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .models import ProfessionalDocuments
+from .testing import make_category, make_pro
+
+SMALL_LIMITS = {
+    'ID': (2048, {'application/pdf'}),
+    'LICENSE': (8192, {'application/pdf', 'image/png'}),
+}
+
+
+def pdf(size=512):
+    return b'%PDF-1.4\n' + b'x' * (size - 9)
+
+
+class DocumentUploadTest(TestCase):
+    def setUp(self):
+        self.media = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media)
+        self.settings_override.enable()
+        self.pro = make_pro(make_category())
+        self.pro_user = self.pro.user
+        self.client.force_login(self.pro_user)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def upload(self, content, name='licence.pdf', doc_type='LICENSE'):
+        return self.client.post(reverse('upload_documents'), {
+            'document_type': doc_type,
+            'document_file': SimpleUploadedFile(name, content, content_type='application/pdf'),
+        }, follow=True)
+
+    def test_identical_uploads_share_one_blob(self):
+        self.upload(pdf(), 'a.pdf')
+        self.upload(pdf(), 'b.PDF')
+        first, second = ProfessionalDocuments.objects.order_by('id')
+        self.assertEqual(first.document_file.name, second.document_file.name)
+        self.assertEqual(first.file_size, 512)
+        self.assertEqual(first.content_type, 'application/pdf')
+        path = first.document_file.path
+        self.assertTrue(path.endswith(f'{first.sha256}.pdf'))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertTrue(os.path.exists(path))
+        with self.captureOnCommitCallbacks(execute=True):
+            second.delete()
+        self.assertFalse(os.path.exists(path))
+
+    def test_blob_released_before_a_new_row_commits_is_restored(self):
+        self.upload(pdf(), 'a.pdf')
+        first = ProfessionalDocuments.objects.get()
+        path = first.document_file.path
+        with self.captureOnCommitCallbacks() as callbacks:
+            second = ProfessionalDocuments.objects.create(
+                professional=self.pro, document_type='ID', document_file=SimpleUploadedFile('b.pdf', pdf()),
+            )
+            # A release_blob() for `first` that looked before `second` was committed.
+            first.document_file.storage.delete(first.document_file.name)
+        self.assertFalse(os.path.exists(path))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(second.document_file.path, path)
+        with open(path, 'rb') as f:
+            self.assertEqual(f.read(), pdf())
+
+    def test_unknown_content_is_rejected(self):
+        response = self.upload(b'{"users": {}}', 'export.json')
+        self.assertContains(response, "Upload a PDF, PNG or JPEG file.")
+        self.assertFalse(ProfessionalDocuments.objects.exists())
+
+    @override_settings(DOCUMENT_UPLOAD_LIMITS=SMALL_LIMITS)
+    def test_size_limits(self):
+        # Over every allowance: refused from Content-Length before the file is read.
+        response = self.upload(pdf(200 * 1024))
+        self.assertContains(response, "Files may be at most")
+        # Over the ID allowance but within the licence one.
+        response = self.upload(pdf(4096), doc_type='ID')
+        self.assertContains(response, "Files of this type may be at most")
+        self.upload(pdf(4096), doc_type='LICENSE')
+        self.assertEqual(list(ProfessionalDocuments.objects.values_list('document_type', flat=True)), ['LICENSE'])
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import threading
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from .broker import QUEUE_SIZE, Broker, booking_topic, broker
+from .lifecycle import transition
+from .models import Booking, JobTracking
+from .testing import MarketplaceFixtures
+
+User = get_user_model()
+
+
+def parse(chunk):
+    """(event, data) of one SSE message."""
+    text = chunk.decode() if isinstance(chunk, bytes) else chunk
+    fields = dict(line.split(': ', 1) for line in text.strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+
+class BrokerTest(SimpleTestCase):
+    async def test_publish_from_another_thread(self):
+        hub = Broker()
+        subscription = hub.subscribe('booking:1')
+        thread = threading.Thread(target=hub.publish, args=('booking:1', 'status', {'status': 'CONFIRMED'}))
+        thread.start()
+        thread.join()
+        name, data, message = await subscription.get(timeout=1)
+        self.assertEqual((name, data), ('status', {'status': 'CONFIRMED'}))
+        self.assertEqual(message, 'event: status\ndata: {"status": "CONFIRMED"}\n\n')
+        self.assertEqual(hub.publish('booking:2', 'status', {}), 0)
+        hub.unsubscribe(subscription)
+        self.assertEqual(hub.subscriber_count(), 0)
+
+    async def test_slow_subscriber_keeps_the_latest_events(self):
+        hub = Broker()
+        subscription = hub.subscribe('booking:1')
+        for i in range(QUEUE_SIZE + 5):
+            hub.publish('booking:1', 'position', {'i': i})
+        await asyncio.sleep(0)
+        self.assertEqual((await subscription.get(timeout=1))[1], {'i': 5})
+        self.assertIsNone(await hub.subscribe('booking:1').get(timeout=0.01))
+
+
+@override_settings(NOTIFICATION_DISPATCH='sync')
+class TrackingEventsTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+        self.booking = self.make_booking(status='CONFIRMED')
+        JobTracking.objects.create(booking=self.booking, latitude=12.9716, longitude=77.5946, status='ON_THE_WAY')
+        self.url = reverse('tracking_events', args=[self.booking.id])
+
+    def move(self, status):
+        booking = Booking.objects.get(pk=self.booking.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(booking, status)
+
+    async def test_stream_sends_snapshot_then_changes_until_final(self):
+        await self.async_client.aforce_login(self.customer)
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 5000\n\n')
+        self.assertEqual(parse(await anext(stream)), ('position', {
+            'lat': 12.9716, 'lon': 77.5946, 'status': 'ON_THE_WAY',
+            'updated_at': (await JobTracking.objects.aget()).updated_at.isoformat(),
+        }))
+        self.assertEqual(parse(await anext(stream))[1]['status'], 'CONFIRMED')
+        self.assertEqual(broker.subscriber_count(booking_topic(self.booking.id)), 1)
+
+        await sync_to_async(self.move)('PROCESSING')
+        await sync_to_async(self.move)('COMPLETED')
+        self.assertEqual(parse(await anext(stream)), ('status', {
+            'status': 'PROCESSING', 'display': 'Processing', 'final': False,
+        }))
+        self.assertEqual(parse(await anext(stream))[1]['final'], True)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(stream)
+        self.assertEqual(broker.subscriber_count(), 0)
+
+    async def test_only_the_booking_parties_may_listen(self):
+        stranger = await User.objects.acreate_user(username="stranger", password="password")
+        await self.async_client.aforce_login(stranger)
+        self.assertEqual((await self.async_client.get(self.url)).status_code, 403)
+        missing = reverse('tracking_events', args=[self.booking.id + 1])
+        self.assertEqual((await self.async_client.get(missing)).status_code, 404)
+        self.assertEqual(broker.subscriber_count(), 0)
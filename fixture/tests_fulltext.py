@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from .fulltext import match_expression, rebuild_fulltext, search_text
+from .models import Category, Service, ServiceProfessional
+
+User = get_user_model()
+
+
+class FullTextSearchTest(TestCase):
+    def setUp(self):
+        self.plumbing = Category.objects.create(name="Plumbing", description="Leaks, taps and pipes")
+        self.cleaning = Category.objects.create(name="Cleaning", description="Deep cleaning for kitchens")
+        self.leak = Service.objects.create(category=self.plumbing, name="Leak Repair", description="Fix dripping taps", base_price=400, duration=60)
+        self.tank = Service.objects.create(category=self.cleaning, name="Water Tank Cleaning", description="Also checks for a leak", base_price=900, duration=90)
+        user = User.objects.create_user(username="ravi", password="password", is_professional=True)
+        self.pro = ServiceProfessional.objects.create(user=user, category=self.plumbing, bio="Twenty years fixing plumbing in old buildings")
+
+    def ids(self, text, **kwargs):
+        return [(r['kind'], r['id']) for r in search_text(text, **kwargs)]
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.ids("leak", kinds=['service']), [('service', self.leak.id), ('service', self.tank.id)])
+        self.assertEqual(self.ids("plumbing")[0], ('category', self.plumbing.id))
+        self.assertIn(('professional', self.pro.id), self.ids("plumbing"))
+        self.assertEqual(self.ids("leak tank"), [('service', self.tank.id)])
+
+    def test_prefix_matching_for_typeahead(self):
+        self.assertEqual(self.ids("clea"), [])
+        self.assertEqual(self.ids("clea", prefix=True)[0], ('category', self.cleaning.id))
+        self.assertEqual(self.ids("water cl", prefix=True), [('service', self.tank.id)])
+        # Typeahead completes titles only.
+        self.assertEqual(self.ids("dripp", prefix=True), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.leak.name = "Tap Replacement"
+        self.leak.save()
+        self.assertEqual(self.ids("replacement"), [('service', self.leak.id)])
+        self.pro.user.username = "suresh"
+        self.pro.user.save()
+        self.assertEqual(self.ids("suresh"), [('professional', self.pro.id)])
+        self.tank.delete()
+        self.assertEqual(self.ids("tank"), [])
+        self.assertEqual(rebuild_fulltext(), 4)
+        self.assertEqual(self.ids("replacement"), [('service', self.leak.id)])
+
+    def test_fallback_needs_every_word(self):
+        with mock.patch('fixture.fulltext.available', return_value=False):
+            self.assertEqual(self.ids("leak tank"), [('service', self.tank.id)])
+            self.assertEqual(self.ids("water cl", prefix=True), [('service', self.tank.id)])
+            self.assertEqual(self.ids("dripp", prefix=True), [])
+            self.assertEqual(self.ids("plumbing years"), [('professional', self.pro.id)])
+
+    def test_query_syntax_is_not_interpreted(self):
+        self.assertEqual(match_expression('leak" OR NEAR(x'), '"leak" "OR" "NEAR" "x"')
+        self.assertEqual(self.ids('title:leak*'), [])
+        self.assertEqual(self.ids('"()'), [])
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.pro.user)
+        response = self.client.get(reverse('text_search'), {'q': 'dripping'})
+        result, = response.json()['results']
+        self.assertEqual(result['url'], reverse('service_professionals', args=[self.leak.id]))
+        self.assertEqual(result['snippet'], "Fix <mark>dripping</mark> taps")
+        response = self.client.get(reverse('text_search'), {'q': 'Rep', 'prefix': '1'})
+        self.assertEqual(response.json()['results'][0]['title'], "Leak Repair")
+
+        self.leak.description = "<b>dripping</b>"
+        self.leak.save()
+        response = self.client.get(reverse('text_search'), {'q': 'dripping', 'type': 'service'})
+        self.assertEqual(response.json()['results'][0]['snippet'], "&lt;b&gt;<mark>dripping</mark>&lt;/b&gt;")
+
+    def test_search_view_filters_by_text(self):
+        self.client.force_login(self.pro.user)
+        response = self.client.get(reverse('search_services'), {'q': 'plumbing'})
+        self.assertEqual(list(response.context['services']), [])
+        self.assertEqual({e.service_id for e in response.context['results']}, {self.leak.id})
@@ -0,0 +1,59 @@
+from django.test import TestCase, Client
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+from .models import UserProfile
+from .geo import geohash_encode, haversine_km, nearby_professionals
+from .testing import make_category, make_customer, make_pro
+
+User = get_user_model()
+
+class GeohashTest(TestCase):
+    def test_geohash_encode_known_value(self):
+        self.assertEqual(geohash_encode(42.6, -5.6, precision=5), 'ezs42')
+
+    def test_haversine_distance(self):
+        # Bangalore to Chennai is roughly 290 km as the crow flies.
+        [distance] = haversine_km(12.9716, 77.5946, [(13.0827, 80.2707)])
+        self.assertAlmostEqual(distance, 290, delta=5)
+
+    def test_profile_save_sets_geohash(self):
+        user = User.objects.create_user(username="located", password="password")
+        profile = UserProfile.objects.create(user=user, full_name="Located", address="", latitude=12.9716, longitude=77.5946)
+        self.assertEqual(profile.geohash, geohash_encode(12.9716, 77.5946))
+
+
+class NearbyProfessionalsTest(TestCase):
+    def setUp(self):
+        self.category = make_category()
+        self.customer = make_customer()
+        UserProfile.objects.create(user=self.customer, full_name="Customer", address="", city="Bangalore", latitude=12.9716, longitude=77.5946)
+
+        # Roughly 1 km, 4 km and 300 km from the customer.
+        self.near = self.make_pro("near", 12.9806, 77.5946)
+        self.mid = self.make_pro("mid", 12.9716, 77.6314)
+        self.far = self.make_pro("far", 13.0827, 80.2707)
+
+        self.client = Client()
+        self.client.login(username="customer", password="password")
+
+    def make_pro(self, username, latitude, longitude):
+        pro = make_pro(self.category, username)
+        UserProfile.objects.create(user=pro.user, full_name=username, address="", latitude=latitude, longitude=longitude)
+        return pro
+
+    def test_results_sorted_by_distance_within_radius(self):
+        results = nearby_professionals(12.9716, 77.5946, radius_km=10)
+        self.assertEqual([p.id for p in results], [self.near.id, self.mid.id])
+        self.assertLess(results[0].distance_km, results[1].distance_km)
+
+    def test_radius_excludes_outside_box(self):
+        results = nearby_professionals(12.9716, 77.5946, radius_km=2)
+        self.assertEqual([p.id for p in results], [self.near.id])
+
+    def test_search_view_uses_location(self):
+        response = self.client.get(reverse('search_services'), {'location': 'bangalore', 'radius': 5})
+        self.assertEqual([p.id for p in response.context['professionals']], [self.near.id, self.mid.id])
+
+    def test_search_view_without_location_skips_geo_search(self):
+        response = self.client.get(reverse('search_services'))
+        self.assertIsNone(response.context['professionals'])
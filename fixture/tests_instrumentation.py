@@ -0,0 +1,131 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .instrumentation import QueryBudgetExceeded, QueryMetricsMiddleware, metrics, signature
+from .models import Booking, Notification
+from .notifications import dispatcher
+from .testing import make_category, make_customer, make_pro, make_service
+
+User = get_user_model()
+
+# Most queries each view may run for the requests below, warm caches included.
+QUERY_BUDGETS = {
+    'home': 4,
+    'category_professionals': 4,
+    'service_professionals': 4,
+    'customer_bookings': 6,
+    'professional_bookings': 6,
+    'notifications': 6,
+    'search_services': 8,
+    'text_search': 4,
+    'track_job': 9,
+    'job_details': 6,
+    'dashboard': 6,
+}
+
+
+@override_settings(QUERY_BUDGETS=QUERY_BUDGETS)
+class QueryBudgetTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        metrics.clear()
+        self.category = make_category()
+        self.service = make_service(self.category)
+        self.customer = make_customer()
+        self.pros = [make_pro(self.category, f"pro{i}") for i in range(5)]
+        self.bookings = [
+            Booking.objects.create(customer=self.customer, professional=pro, service=self.service, booking_date="2026-05-01")
+            for pro in self.pros
+        ]
+        for i in range(5):
+            Notification.objects.create(user=self.customer, message=f"Update {i}")
+
+    def test_public_views_stay_within_budget(self):
+        for url in [
+            reverse('home'),
+            reverse('category_professionals', args=[self.category.id]),
+            reverse('service_professionals', args=[self.service.id]),
+        ]:
+            with self.subTest(url=url):
+                self.client.get(url)
+
+    def test_customer_views_stay_within_budget(self):
+        self.client.force_login(self.customer)
+        booking = self.bookings[0]
+        for url in [
+            reverse('customer_bookings'),
+            reverse('notifications'),
+            reverse('search_services') + '?rating=1',
+            reverse('text_search') + '?q=leak',
+            reverse('track_job', args=[booking.id]),
+            reverse('job_details', args=[booking.id]),
+            reverse('dashboard'),
+        ]:
+            with self.subTest(url=url):
+                self.client.get(url)
+
+    def test_professional_views_stay_within_budget(self):
+        self.client.force_login(self.pros[0].user)
+        self.client.get(reverse('professional_bookings'))
+        self.client.get(reverse('dashboard'))
+
+    def test_exceeding_a_budget_fails(self):
+        with override_settings(QUERY_BUDGETS={'home': 0}):
+            with self.assertRaisesMessage(QueryBudgetExceeded, "home ran"):
+                self.client.get(reverse('home'))
+
+
+class RequestMetricsTest(TestCase):
+    def setUp(self):
+        metrics.clear()
+        self.staff = User.objects.create_user(username="staff", password="password", is_staff=True)
+
+    def test_metrics_are_recorded_per_view(self):
+        self.client.get(reverse('home'))
+        self.client.get(reverse('home'))
+        self.client.get('/no/such/page/')
+        views = {v['view']: v for v in metrics.snapshot()}
+        self.assertEqual(views['home']['requests'], 2)
+        self.assertEqual(sum(views['home']['histogram']), 2)
+        self.assertIn('<unresolved>', views)
+
+    async def test_async_requests_stay_async_and_are_recorded(self):
+        async def view(request):
+            return HttpResponse()
+        self.assertTrue(iscoroutinefunction(QueryMetricsMiddleware(view)))
+
+        await self.async_client.aforce_login(self.staff)
+        response = await self.async_client.get(reverse('tracking_events', args=[1]))
+        self.assertEqual(response.status_code, 404)
+        views = {v['view']: v for v in metrics.snapshot()}
+        # The session, the user and the booking, run in a thread of the request's own.
+        self.assertEqual(views['tracking_events']['max_queries'], 3)
+
+    def test_staff_only_page(self):
+        customer = User.objects.create_user(username="customer", password="password", is_customer=True)
+        self.client.force_login(customer)
+        self.assertRedirects(self.client.get(reverse('request_metrics')), reverse('home'), fetch_redirect_response=False)
+        self.client.force_login(self.staff)
+        self.assertContains(self.client.get(reverse('request_metrics')), "request_metrics")
+
+    @override_settings(NOTIFICATION_DISPATCH='sync')
+    def test_page_shows_notification_dispatch_counters(self):
+        before = dispatcher.metrics()
+        dispatcher.enqueue([(self.staff.id, "One"), (self.staff.id, "Two")])
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('request_metrics'))
+        self.assertContains(response, "Notification dispatch")
+        counters = response.context['dispatcher']
+        self.assertEqual(counters['enqueued'] - before['enqueued'], 2)
+        self.assertEqual(counters['delivered'] - before['delivered'], 2)
+        self.assertEqual(counters['batches'] - before['batches'], 1)
+
+    def test_duplicate_signatures_ignore_literals(self):
+        self.assertEqual(
+            signature('SELECT * FROM "fixture_user"  WHERE id = 12 AND name = \'it\'\'s\''),
+            'SELECT * FROM "fixture_user" WHERE id = ? AND name = ?',
+        )
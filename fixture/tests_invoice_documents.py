@@ -0,0 +1,112 @@
+import io
+import re
+import shutil
+import tempfile
+import zipfile
+import zlib
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .documents import LOCK_NAME
+from .invoice_documents import document_name, invoice_document, invoice_queryset, invoice_storage, render_pdf
+from .invoicing import invoice_period, issue_invoices
+from .models import Booking
+from .testing import MarketplaceFixtures
+
+User = get_user_model()
+
+
+def pdf_text(data):
+    """Decompressed content streams of a PDF written by fixture.pdf."""
+    streams = re.findall(rb'stream\n(.*?)\nendstream', data, re.S)
+    return b''.join(zlib.decompress(stream) for stream in streams)
+
+
+class InvoiceDocumentTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.private = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media, PRIVATE_MEDIA_ROOT=self.private)
+        self.settings_override.enable()
+        self.make_marketplace(name="Leak (Kitchen)", base_price=Decimal('1200'))
+        self.bookings = Booking.objects.bulk_create([
+            Booking(customer=self.customer, professional=self.pro_profile, service=self.service, status='COMPLETED')
+            for _ in range(3)
+        ])
+        self.invoices = issue_invoices(self.bookings)
+        self.client.force_login(self.customer)
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+        shutil.rmtree(self.private, ignore_errors=True)
+
+    def test_documents_are_not_kept_under_media_root(self):
+        self.client.get(reverse('view_invoice', args=[self.bookings[0].id]))
+        self.client.get(reverse('invoice_pdf', args=[self.bookings[0].id]))
+        stored = {path.suffix for path in Path(self.private).rglob('*') if path.is_file() and path.name != LOCK_NAME}
+        self.assertEqual(stored, {'.html', '.pdf'})
+        self.assertEqual([path for path in Path(self.media).rglob('*') if path.is_file()], [])
+
+    def test_racing_first_renders_store_one_copy(self):
+        invoice = invoice_queryset().get(pk=self.invoices[0].pk)
+        name, storage = document_name(invoice, 'pdf'), invoice_storage()
+        # Both requests missed the stored copy and rendered it; the second save must not fork a suffixed file.
+        content = render_pdf(invoice)
+        self.assertEqual(storage.save(name, ContentFile(content)), name)
+        self.assertEqual(storage.save(name, ContentFile(render_pdf(invoice))), name)
+        self.assertEqual(storage.listdir(name.rsplit('/', 1)[0])[1], [name.rsplit('/', 1)[1]])
+        self.assertEqual(invoice_document(invoice, 'pdf')[0], content)
+
+    def test_repeat_views_are_not_modified(self):
+        url = reverse('view_invoice', args=[self.bookings[0].id])
+        first = self.client.get(url)
+        self.assertTemplateUsed(first, 'invoice_document.html')
+        self.assertContains(first, self.invoices[0].invoice_number)
+        etag = first.headers['ETag']
+        self.assertRegex(etag, r'^"[0-9a-f]{64}"$')
+
+        repeat = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(repeat.status_code, 304)
+        self.assertTemplateNotUsed(repeat, 'invoice_document.html')
+        self.assertEqual(repeat.headers['ETag'], etag)
+        repeat = self.client.get(url, HTTP_IF_MODIFIED_SINCE=first.headers['Last-Modified'])
+        self.assertEqual(repeat.status_code, 304)
+
+        # A cold cache re-reads the stored document instead of rendering it again.
+        cache.clear()
+        again = self.client.get(url)
+        self.assertTemplateNotUsed(again, 'invoice_document.html')
+        self.assertEqual((again.content, again.headers['ETag']), (first.content, etag))
+
+    def test_pdf(self):
+        response = self.client.get(reverse('invoice_pdf', args=[self.bookings[0].id]))
+        self.assertEqual(response.headers['Content-Type'], 'application/pdf')
+        self.assertTrue(response.content.startswith(b'%PDF-1.4'))
+        self.assertTrue(response.content.rstrip().endswith(b'%%EOF'))
+        text = pdf_text(response.content)
+        self.assertIn(f'(Invoice #{self.invoices[0].invoice_number})'.encode(), text)
+        self.assertIn(b'(Leak \\(Kitchen\\))', text)
+        self.assertIn(b'(Rs. 1,416.00)', text)
+
+    def test_other_users_are_turned_away(self):
+        self.client.force_login(User.objects.create_user(username="nosy", password="password"))
+        response = self.client.get(reverse('view_invoice', args=[self.bookings[0].id]))
+        self.assertRedirects(response, reverse('home'), fetch_redirect_response=False)
+
+    def test_month_export_streams_a_zip(self):
+        period = invoice_period()
+        url = reverse('export_invoices', args=[int(period[:4]), int(period[4:])])
+        self.client.force_login(User.objects.create_user(username="staff", password="password", is_staff=True))
+        response = self.client.get(url)
+        self.assertTrue(response.streaming)
+        archive = zipfile.ZipFile(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(archive.namelist(), [f'{invoice.invoice_number}.pdf' for invoice in self.invoices])
+        self.assertTrue(archive.read(archive.namelist()[0]).startswith(b'%PDF'))
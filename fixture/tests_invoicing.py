@@ -0,0 +1,96 @@
+import shutil
+import tempfile
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import OperationalError, close_old_connections, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .invoicing import allocate_numbers, invoice_period, issue_invoices
+from .lifecycle import transition
+from .models import Booking, Invoice, InvoiceLineItem
+from .testing import MarketplaceFixtures
+
+
+class InvoiceFixtures(MarketplaceFixtures):
+    def make_bookings(self, count, status='COMPLETED'):
+        self.make_marketplace(base_price=Decimal('499.99'))
+        return Booking.objects.bulk_create([
+            Booking(customer=self.customer, professional=self.pro_profile, service=self.service, status=status)
+            for _ in range(count)
+        ])
+
+
+class InvoicingTest(InvoiceFixtures, TestCase):
+    def test_completion_issues_numbered_invoice_with_tax(self):
+        booking, = self.make_bookings(1, status='PROCESSING')
+        transition(booking, 'COMPLETED')
+        invoice = Invoice.objects.get(booking=booking)
+        self.assertEqual(invoice.invoice_number, f"INV-{invoice_period()}-000001")
+        self.assertEqual((invoice.subtotal, invoice.tax_amount, invoice.total_amount), (Decimal('499.99'), Decimal('90.00'), Decimal('589.99')))
+        line, = invoice.line_items.all()
+        self.assertEqual((line.description, line.amount, line.tax_rate), ("Leak Fix", Decimal('499.99'), Decimal('18.00')))
+
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        self.client.force_login(self.customer)
+        with override_settings(MEDIA_ROOT=media, PRIVATE_MEDIA_ROOT=media):
+            response = self.client.get(reverse('view_invoice', args=[booking.id]))
+        self.assertContains(response, "INV-")
+        self.assertContains(response, "₹589.99")
+
+    def test_rolled_back_allocation_leaves_no_gap(self):
+        period = invoice_period()
+        with self.assertRaises(RuntimeError), transaction.atomic():
+            allocate_numbers(period, 5)
+            raise RuntimeError
+        self.assertEqual(list(allocate_numbers(period, 2)), [1, 2])
+
+    def test_command_invoices_pending_bookings_in_batches(self):
+        bookings = self.make_bookings(7)
+        issue_invoices([bookings[0]])
+        out = StringIO()
+        call_command('generate_invoices', batch_size=3, stdout=out)
+        self.assertIn("Issued 6 invoices", out.getvalue())
+        numbers = sorted(Invoice.objects.values_list('sequence', flat=True))
+        self.assertEqual(numbers, list(range(1, 8)))
+        self.assertEqual(InvoiceLineItem.objects.count(), 7)
+        call_command('generate_invoices', stdout=out)
+        self.assertIn("Issued 0 invoices", out.getvalue())
+
+
+class ConcurrentInvoicingTest(InvoiceFixtures, TransactionTestCase):
+    REQUESTS = 12
+
+    def test_concurrent_issues_get_distinct_consecutive_numbers(self):
+        bookings = self.make_bookings(self.REQUESTS)
+        barrier = threading.Barrier(self.REQUESTS)
+        errors = []
+
+        def attempt(booking):
+            try:
+                barrier.wait(timeout=30)
+                # In-memory SQLite reports table lock contention instead of waiting; retry like a client would.
+                for _ in range(200):
+                    try:
+                        issue_invoices([booking])
+                        break
+                    except OperationalError:
+                        time.sleep(0.005)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        threads = [threading.Thread(target=attempt, args=(b,)) for b in bookings]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(sorted(Invoice.objects.values_list('sequence', flat=True)), list(range(1, self.REQUESTS + 1)))
@@ -0,0 +1,117 @@
+import threading
+import time
+
+from django.db import OperationalError, close_old_connections
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from .lifecycle import TransitionError, transition
+from .models import Booking, Invoice, JobTracking, Notification
+from .testing import MarketplaceFixtures
+
+
+@override_settings(NOTIFICATION_DISPATCH='sync')
+class TransitionTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+        self.booking = self.make_booking()
+
+    def test_happy_path_and_final_states(self):
+        JobTracking.objects.create(booking=self.booking, latitude=12.9, longitude=77.6, status='ON_THE_WAY')
+        with self.captureOnCommitCallbacks(execute=True):
+            for status in ('CONFIRMED', 'PROCESSING', 'COMPLETED'):
+                transition(self.booking, status)
+        self.assertEqual(Booking.objects.get().status, 'COMPLETED')
+        self.assertTrue(Invoice.objects.filter(booking=self.booking).exists())
+        self.assertEqual(JobTracking.objects.get().status, 'ARRIVED')
+        self.assertEqual(Notification.objects.filter(user=self.customer).count(), 3)
+        for status in ('PENDING', 'CANCELLED', 'COMPLETED'):
+            with self.assertRaises(TransitionError):
+                transition(self.booking, status)
+
+    def test_skipping_a_step_is_refused(self):
+        with self.assertRaisesMessage(TransitionError, "A pending booking cannot be marked completed."):
+            transition(self.booking, 'COMPLETED')
+        self.assertEqual(Booking.objects.get().status, 'PENDING')
+
+    def test_stale_copy_loses_the_race(self):
+        Booking.objects.filter(pk=self.booking.pk).update(status='PROCESSING')
+        first, second = Booking.objects.get(), Booking.objects.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            transition(first, 'COMPLETED')
+            with self.assertRaisesMessage(TransitionError, "already moved to completed"):
+                transition(second, 'CANCELLED')
+        self.pro_profile.refresh_from_db()
+        self.assertEqual(self.pro_profile.total_jobs, 1)
+        self.assertEqual(Booking.objects.get().status, 'COMPLETED')
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_views_reject_illegal_moves(self):
+        self.client.force_login(self.pro_user)
+        url = reverse('update_booking_status', kwargs={'booking_id': self.booking.id, 'status': 'COMPLETED'})
+        self.assertContains(self.client.get(url, follow=True), "cannot be marked completed")
+        self.client.post(reverse('update_job', kwargs={'booking_id': self.booking.id}), {'status': 'CONFIRMED', 'requirements': 'Bring a ladder'})
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.status, self.booking.requirements), ('CONFIRMED', 'Bring a ladder'))
+        form = self.client.get(reverse('update_job', kwargs={'booking_id': self.booking.id})).context['form']
+        self.assertEqual([value for value, _ in form.fields['status'].choices], ['CONFIRMED', 'PROCESSING', 'CANCELLED'])
+
+    def test_notes_alone_touch_updated_at(self):
+        self.client.force_login(self.pro_user)
+        before = self.booking.updated_at
+        self.client.post(reverse('update_job', kwargs={'booking_id': self.booking.id}), {'status': 'PENDING', 'requirements': 'Side gate'})
+        self.booking.refresh_from_db()
+        self.assertEqual((self.booking.status, self.booking.requirements), ('PENDING', 'Side gate'))
+        self.assertGreater(self.booking.updated_at, before)
+
+
+@override_settings(NOTIFICATION_DISPATCH='sync')
+class ConcurrentTransitionTest(MarketplaceFixtures, TransactionTestCase):
+    REQUESTS = 20
+
+    def setUp(self):
+        self.make_marketplace()
+        self.booking = self.make_booking(status='PROCESSING')
+
+    def test_one_winner_and_one_set_of_side_effects(self):
+        barrier = threading.Barrier(self.REQUESTS)
+        outcomes, errors = [], []
+
+        def attempt(status):
+            try:
+                booking = Booking.objects.get(pk=self.booking.pk)
+                barrier.wait(timeout=30)
+                # In-memory SQLite reports table lock contention instead of waiting; retry like a client would.
+                for _ in range(200):
+                    try:
+                        transition(booking, status)
+                        outcomes.append(status)
+                        break
+                    except TransitionError:
+                        outcomes.append('lost')
+                        break
+                    except OperationalError:
+                        time.sleep(0.005)
+            except Exception as e:
+                errors.append(e)
+            finally:
+                close_old_connections()
+
+        # Half the requests complete the job, half cancel it.
+        statuses = ['COMPLETED', 'CANCELLED'] * (self.REQUESTS // 2)
+        threads = [threading.Thread(target=attempt, args=(status,)) for status in statuses]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(outcomes), self.REQUESTS)
+        winners = [o for o in outcomes if o != 'lost']
+        self.assertEqual(len(winners), 1)
+        self.assertEqual(Booking.objects.get().status, winners[0])
+        self.assertEqual(Notification.objects.count(), 1)
+        self.pro_profile.refresh_from_db()
+        expected_jobs = 1 if winners[0] == 'COMPLETED' else 0
+        self.assertEqual(self.pro_profile.total_jobs, expected_jobs)
+        self.assertEqual(Invoice.objects.count(), expected_jobs)
@@ -0,0 +1,114 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+from .models import Notification
+from .notifications import NotificationDispatcher, unread_count
+from .testing import MarketplaceFixtures, make_customer
+from . import views
+
+User = get_user_model()
+
+@override_settings(NOTIFICATION_DISPATCH='sync')
+class NotificationEventsTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+        self.staff = User.objects.create_user(username="staff", password="password", is_staff=True)
+
+    def test_booking_notifies_professional(self):
+        self.client.force_login(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('book_professional', kwargs={'pro_id': self.pro_profile.id}), {
+                'service': self.service.id,
+                'booking_date': (timezone.now() + timedelta(days=2)).date().isoformat(),
+                'time_slot': 'Morning',
+                'confirmation': 'on',
+            })
+        self.assertEqual(Notification.objects.filter(user=self.pro_user).count(), 1)
+
+    def test_complaint_fans_out_to_professional_and_staff(self):
+        booking = self.make_booking()
+        self.client.force_login(self.customer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('submit_complaint', kwargs={'booking_id': booking.id}), {'description': "Late"})
+        self.assertEqual(
+            set(Notification.objects.values_list('user__username', flat=True)), {"pro", "staff"}
+        )
+
+    def test_status_update_notifies_customer(self):
+        booking = self.make_booking()
+        self.client.force_login(self.pro_user)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('update_booking_status', kwargs={'booking_id': booking.id, 'status': 'CONFIRMED'}))
+        self.assertTrue(Notification.objects.filter(user=self.customer, message__contains="Confirmed").exists())
+
+    def test_rolled_back_action_sends_nothing(self):
+        booking = self.make_booking()
+        self.client.force_login(self.customer)
+        # No commit happens inside the test transaction, so nothing is enqueued.
+        self.client.post(reverse('submit_complaint', kwargs={'booking_id': booking.id}), {'description': "Late"})
+        self.assertFalse(Notification.objects.exists())
+
+
+class NotificationDispatcherTest(TransactionTestCase):
+    def test_worker_batches_inserts(self):
+        users = [User.objects.create(username=f"user{i}") for i in range(30)]
+        dispatcher = NotificationDispatcher(batch_size=200, flush_interval=0.2)
+        for i in range(20):
+            dispatcher.notify([u.id for u in users], f"Event {i}")
+        dispatcher.flush()
+
+        self.assertEqual(Notification.objects.count(), 600)
+        metrics = dispatcher.metrics()
+        self.assertEqual(metrics['enqueued'], 600)
+        self.assertEqual(metrics['delivered'], 600)
+        self.assertEqual(metrics['failed'], 0)
+        self.assertEqual(metrics['queue_depth'], 0)
+        self.assertLess(metrics['batches'], 20)
+
+    def test_duplicate_recipients_notified_once(self):
+        user = User.objects.create(username="solo")
+        dispatcher = NotificationDispatcher()
+        dispatcher.notify([user.id, user.id, None], "Hello")
+        dispatcher.flush()
+        self.assertEqual(Notification.objects.filter(user=user).count(), 1)
+
+
+class NotificationInboxTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = make_customer()
+        Notification.objects.bulk_create([Notification(user=self.user, message=f"Note {i}") for i in range(45)])
+        self.client.force_login(self.user)
+
+    def test_inbox_marks_only_displayed_page_read(self):
+        response = self.client.get(reverse('notifications'))
+        page = response.context['notifications']
+        self.assertEqual(len(page), views.NOTIFICATIONS_PER_PAGE)
+        self.assertEqual(Notification.objects.filter(is_read=True).count(), views.NOTIFICATIONS_PER_PAGE)
+        self.assertEqual(unread_count(self.user.id), 45 - views.NOTIFICATIONS_PER_PAGE)
+
+        response = self.client.get(reverse('notifications'), {'after': page.next_cursor})
+        self.assertEqual(Notification.objects.filter(is_read=False).count(), 5)
+        self.assertEqual(unread_count(self.user.id), 5)
+
+    def test_inbox_page_is_an_index_range_scan(self):
+        newest = self.user.notifications.order_by('-created_at', '-id')
+        plan = newest.filter(created_at__lte=timezone.now())[:views.NOTIFICATIONS_PER_PAGE + 1].explain()
+        self.assertIn('notification_inbox_order_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_unread_count_is_cached_and_kept_current(self):
+        self.assertEqual(unread_count(self.user.id), 45)
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.id), 45)
+        Notification.objects.create(user=self.user, message="One more")
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_count(self.user.id), 46)
+
+    def test_base_template_shows_unread_badge(self):
+        response = self.client.get(reverse('profile_view'))
+        self.assertContains(response, "45")
@@ -0,0 +1,78 @@
+from datetime import timedelta
+
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from .models import Booking
+from .pagination import keyset_paginate, decode_cursor
+from .testing import MarketplaceFixtures
+from . import views
+
+
+class BookingKeysetPaginationTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+
+        # Pairs of bookings share a timestamp so the id tie-breaker is exercised.
+        start = timezone.now()
+        Booking.objects.bulk_create([
+            Booking(
+                customer=self.customer,
+                professional=self.pro_profile,
+                service=self.service,
+                booking_date=start + timedelta(days=i // 2),
+            )
+            for i in range(45)
+        ])
+
+        self.client = Client()
+
+    def walk_pages(self, per_page):
+        seen, cursor = [], None
+        while True:
+            page = keyset_paginate(Booking.objects.filter(customer=self.customer), cursor=cursor, per_page=per_page)
+            seen.extend(page)
+            if not page.has_next:
+                return seen
+            cursor = page.next_cursor
+
+    def test_pages_cover_every_booking_once_in_order(self):
+        seen = self.walk_pages(per_page=10)
+        expected = list(Booking.objects.filter(customer=self.customer).order_by('-booking_date', '-id'))
+        self.assertEqual([b.id for b in seen], [b.id for b in expected])
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        self.assertIsNone(decode_cursor('not-a-cursor'))
+        page = keyset_paginate(Booking.objects.all(), cursor='garbage', per_page=5)
+        self.assertTrue(page.is_first)
+        self.assertEqual(len(page), 5)
+
+    def test_customer_bookings_view_pages(self):
+        self.client.login(username="customer", password="password")
+        url = reverse('customer_bookings')
+        response = self.client.get(url)
+        page = response.context['bookings']
+        self.assertEqual(len(page), views.BOOKINGS_PER_PAGE)
+        self.assertTrue(page.has_next)
+
+        with CaptureQueriesContext(connection) as first:
+            self.client.get(url)
+        with CaptureQueriesContext(connection) as later:
+            response = self.client.get(url, {'after': page.next_cursor})
+        self.assertEqual(len(first.captured_queries), len(later.captured_queries))
+        self.assertNotIn(page.items[0].id, [b.id for b in response.context['bookings']])
+
+    def test_professional_bookings_view_last_page(self):
+        self.client.login(username="pro", password="password")
+        url = reverse('professional_bookings')
+        cursor, total = None, 0
+        while True:
+            response = self.client.get(url, {'after': cursor} if cursor else {})
+            page = response.context['bookings']
+            total += len(page)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+        self.assertEqual(total, 45)
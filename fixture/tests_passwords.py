@@ -0,0 +1,68 @@
+import os
+from unittest import skipIf
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from home.settings import password_hashers
+
+from .hashers import TunedScryptPasswordHasher
+from .models import User
+
+# Production order with a cheap scrypt cost, so the tests stay quick.
+SCRYPT_FIRST = ['fixture.hashers.TunedScryptPasswordHasher', 'django.contrib.auth.hashers.PBKDF2PasswordHasher']
+CHEAP_SCRYPT = {'work_factor': 2**10, 'block_size': 8, 'parallelism': 1}
+
+
+class PasswordProfileTest(TestCase):
+    @skipIf(os.environ.get('FIXTURE_PASSWORDS'), "profile chosen explicitly")
+    def test_tests_hash_with_the_fast_profile(self):
+        self.assertEqual(settings.PASSWORD_PROFILE, 'fast')
+        self.assertTrue(make_password("password").startswith('md5$'))
+
+    def test_only_the_fast_profile_accepts_md5(self):
+        md5 = 'django.contrib.auth.hashers.MD5PasswordHasher'
+        self.assertEqual(password_hashers('fast')[0], md5)
+        for profile in ('scrypt', 'pbkdf2'):
+            self.assertNotIn(md5, password_hashers(profile), profile)
+
+
+@override_settings(PASSWORD_HASHERS=SCRYPT_FIRST, PASSWORD_SCRYPT=CHEAP_SCRYPT)
+class PasswordUpgradeTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="customer", password="password", is_customer=True)
+
+    def log_in(self):
+        return self.client.post(reverse('login'), {'username': "customer", 'password': "password"})
+
+    def stored_hash(self):
+        self.user.refresh_from_db(fields=['password'])
+        return self.user.password
+
+    def test_login_rehashes_a_pbkdf2_password_with_scrypt(self):
+        self.user.password = make_password("password", hasher='pbkdf2_sha256')
+        self.user.save(update_fields=['password'])
+        self.assertRedirects(self.log_in(), reverse('home'), fetch_redirect_response=False)
+        self.assertTrue(self.stored_hash().startswith('scrypt$1024$'))
+        self.assertTrue(self.user.check_password("password"))
+
+    def test_login_rehashes_when_the_work_factor_changes(self):
+        with override_settings(PASSWORD_SCRYPT={**CHEAP_SCRYPT, 'work_factor': 2**11}):
+            self.log_in()
+        self.assertTrue(self.stored_hash().startswith('scrypt$2048$'))
+
+    def test_failed_login_keeps_the_old_hash(self):
+        self.user.password = make_password("password", hasher='pbkdf2_sha256')
+        self.user.save(update_fields=['password'])
+        self.client.post(reverse('login'), {'username': "customer", 'password': "wrong"})
+        self.assertTrue(self.stored_hash().startswith('pbkdf2_sha256$'))
+
+    def test_stock_scrypt_hashes_verify(self):
+        hasher = TunedScryptPasswordHasher(work_factor=2**10, parallelism=5)
+        self.user.password = hasher.encode("password", hasher.salt())
+        self.user.save(update_fields=['password'])
+        self.log_in()
+        self.assertTrue(self.stored_hash().startswith('scrypt$1024$'))
+        self.assertEqual(self.user.password.split('$')[4], '1')
@@ -0,0 +1,56 @@
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from django.urls import reverse
+from .models import Booking, Payment, Review
+from .testing import MarketplaceFixtures
+
+
+class BookingListQueryCountTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+
+        self.client = Client()
+
+    def make_bookings(self, count):
+        for i in range(count):
+            booking = self.make_booking(status='COMPLETED' if i % 2 else 'CONFIRMED')
+            if i % 2:
+                Payment.objects.create(booking=booking, amount=50, payment_method='UPI')
+            if i % 4 == 1:
+                Review.objects.create(booking=booking, rating=5, comment="Great")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def assert_constant_queries(self, username, url):
+        self.client.login(username=username, password="password")
+        self.make_bookings(2)
+        small = self.count_queries(url)
+        self.make_bookings(20)
+        large = self.count_queries(url)
+        self.assertEqual(small, large)
+
+    def test_customer_bookings_query_count_is_constant(self):
+        self.assert_constant_queries("customer", reverse('customer_bookings'))
+
+    def test_professional_bookings_query_count_is_constant(self):
+        self.assert_constant_queries("pro", reverse('professional_bookings'))
+
+    def test_dashboard_query_count_is_constant(self):
+        self.assert_constant_queries("pro", reverse('dashboard'))
+
+    def test_list_profile_loads_rows_in_one_query(self):
+        self.make_bookings(10)
+        with self.assertNumQueries(1):
+            for booking in Booking.objects.for_list():
+                booking.service.name
+                booking.professional.user.username
+                booking.customer.username
+                getattr(booking, 'payment', None)
+                getattr(booking, 'review', None)
+                str(booking.professional)
+                str(booking.service)
@@ -0,0 +1,77 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Category, Service, SearchEntry, Booking, Review, UserProfile
+from .search import rebuild_search_index, search
+from .stats import record_review
+from .testing import make_category, make_customer, make_pro, make_service
+
+
+class SearchIndexTest(TestCase):
+    def setUp(self):
+        self.plumbing = make_category()
+        self.electrical = Category.objects.create(name="Electrical", description="Wiring")
+        self.leak = make_service(self.plumbing, base_price=400)
+        self.pipe = Service.objects.create(category=self.plumbing, name="Pipe Fit", base_price=1200, duration=60)
+        self.wiring = Service.objects.create(category=self.electrical, name="Wiring", base_price=800, duration=60)
+        self.pros = [
+            make_pro(category, f"pro{i}", rating=score, is_verified=verified)
+            for i, (category, score, verified) in enumerate([
+                (self.plumbing, 4.5, True), (self.plumbing, 3.0, False), (self.electrical, 4.8, True),
+            ])
+        ]
+
+    def test_signals_keep_index_current(self):
+        self.assertEqual(SearchEntry.objects.count(), 5)
+        # Changing category moves the pro's rows; deactivating a service drops its rows.
+        self.pros[1].category = self.electrical
+        self.pros[1].save()
+        self.assertEqual(set(SearchEntry.objects.filter(professional=self.pros[1]).values_list('service', flat=True)), {self.wiring.id})
+        self.pipe.is_active = False
+        self.pipe.save()
+        self.assertFalse(SearchEntry.objects.filter(service=self.pipe).exists())
+        # Location and rating changes that bypass ServiceProfessional.save() still land.
+        UserProfile.objects.create(user=self.pros[0].user, full_name="Pro", address="", latitude=12.97, longitude=77.59)
+        customer = make_customer()
+        booking = Booking.objects.create(customer=customer, professional=self.pros[0], service=self.leak)
+        record_review(Review.objects.create(booking=booking, rating=1))
+        entry = SearchEntry.objects.get(professional=self.pros[0], service=self.leak)
+        self.assertEqual((entry.rating, entry.rating_count), (1.0, 1))
+        self.assertIsNotNone(entry.geohash)
+
+        SearchEntry.objects.all().delete()
+        self.assertEqual(rebuild_search_index(), 3)
+
+    def test_facets_ignore_their_own_filter(self):
+        page, facets = search(category=self.plumbing, min_rating=4)
+        self.assertEqual([(e.professional_id, e.service_id) for e in page], [(self.pros[0].id, self.leak.id), (self.pros[0].id, self.pipe.id)])
+        # Category counts still reflect rating >= 4 but not the category choice.
+        self.assertEqual(facets['category'], [(self.plumbing.id, "Plumbing", 2), (self.electrical.id, "Electrical", 1)])
+        # Rating counts still reflect the category but not the rating choice.
+        self.assertEqual(dict(facets['rating']), {4: 2, 3: 4, 2: 4, 1: 4})
+        self.assertEqual(dict(facets['price'])[500], 1)
+        self.assertEqual(facets['verified'], 2)
+
+    def test_sort_and_unavailable(self):
+        self.pros[2].availability_status = False
+        self.pros[2].save()
+        page, _ = search(sort='price')
+        self.assertEqual([e.price for e in page], sorted(e.price for e in page))
+        self.assertNotIn(self.pros[2].id, [e.professional_id for e in page])
+
+    def test_search_view_renders_results_and_facets(self):
+        self.client.force_login(make_customer())
+        response = self.client.get(reverse('search_services'), {'rating': '4', 'sort': 'rating'})
+        results = response.context['results']
+        self.assertEqual(results.paginator.count, 3)
+        self.assertEqual(results[0].professional_id, self.pros[2].id)
+        self.assertContains(response, "Matching")
+
+    def test_service_page_lists_the_category_pros(self):
+        response = self.client.get(reverse('service_professionals', args=[self.leak.id]))
+        self.assertEqual(response.context['professionals'], [self.pros[0], self.pros[1]])
+        # An inactive service has no index rows, but its page still lists who does the work.
+        self.leak.is_active = False
+        self.leak.save()
+        response = self.client.get(reverse('service_professionals', args=[self.leak.id]))
+        self.assertEqual(list(response.context['professionals']), [self.pros[0], self.pros[1]])
@@ -0,0 +1,81 @@
+import os
+import runpy
+from datetime import timedelta
+from io import StringIO
+from unittest import mock, skipIf
+
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import User
+from .sessions import purge_expired
+
+
+class PurgeExpiredSessionsTest(TestCase):
+    def setUp(self):
+        now = timezone.now()
+        for i in range(5):
+            Session.objects.create(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(minutes=i + 1))
+        Session.objects.create(session_key='live', session_data='', expire_date=now + timedelta(days=1))
+
+    def test_deletes_expired_sessions_in_batches(self):
+        self.assertEqual(purge_expired(batch_size=2), 5)
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['live'])
+
+    def test_command_reports_the_count(self):
+        out = StringIO()
+        call_command('purge_sessions', '--batch-size', '3', stdout=out)
+        self.assertIn("Deleted 5 expired sessions", out.getvalue())
+
+    @override_settings(**settings.SESSION_PROFILES['signed_cookies'])
+    def test_cookie_sessions_have_no_rows_to_delete(self):
+        self.assertIsNone(purge_expired())
+        self.assertEqual(Session.objects.count(), 6)
+
+
+class SessionProfileTest(TestCase):
+    def setUp(self):
+        caches['sessions'].clear()
+        self.customer = User.objects.create_user(username="customer", password="password", is_customer=True)
+
+    def session_queries(self):
+        self.client.force_login(self.customer)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('customer_bookings'))
+        self.assertEqual(response.status_code, 200)
+        return [query['sql'] for query in queries if 'django_session' in query['sql']]
+
+    @skipIf(os.environ.get('FIXTURE_SESSIONS'), "profile chosen explicitly")
+    def test_database_sessions_are_the_default(self):
+        self.assertEqual(settings.SESSION_ENGINE, 'django.contrib.sessions.backends.db')
+
+    @override_settings(**settings.SESSION_PROFILES['cached_db'])
+    def test_cached_sessions_are_read_without_the_database(self):
+        self.assertEqual(self.session_queries(), [])
+
+    @override_settings(**settings.SESSION_PROFILES['db'])
+    def test_database_sessions_are_read_on_every_request(self):
+        self.assertEqual(len(self.session_queries()), 1)
+
+    @override_settings(**settings.SESSION_PROFILES['signed_cookies'])
+    def test_signed_cookie_sessions_store_nothing(self):
+        self.assertEqual(self.session_queries(), [])
+        self.assertFalse(Session.objects.exists())
+
+    def test_cached_db_needs_a_shared_cache(self):
+        path = settings.BASE_DIR / 'home' / 'settings.py'
+        with mock.patch.dict(os.environ, {'FIXTURE_SESSIONS': 'cached_db', 'FIXTURE_CACHE': 'locmem'}):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_path(str(path))
+        with mock.patch.dict(os.environ, {'FIXTURE_SESSIONS': 'cached_db', 'FIXTURE_CACHE': 'file'}):
+            shared = runpy.run_path(str(path))
+        self.assertEqual(shared['SESSION_ENGINE'], 'django.contrib.sessions.backends.cached_db')
+        self.assertTrue(shared['CACHES']['sessions']['BACKEND'].endswith('FileBasedCache'))
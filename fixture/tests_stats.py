@@ -0,0 +1,61 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from .models import Review
+from .testing import MarketplaceFixtures, make_customer
+
+
+class ProfessionalStatsTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        self.make_marketplace()
+        self.other = make_customer("other")
+
+        self.client = Client()
+
+    def book(self, customer, status='PROCESSING'):
+        return self.make_booking(customer=customer, status=status)
+
+    def complete(self, booking):
+        self.client.login(username="pro", password="password")
+        self.client.get(reverse('update_booking_status', kwargs={'booking_id': booking.id, 'status': 'COMPLETED'}))
+
+    def review(self, booking, rating):
+        self.client.login(username=booking.customer.username, password="password")
+        self.client.post(reverse('submit_review', kwargs={'booking_id': booking.id}), {'rating': rating, 'comment': "ok"})
+
+    def test_completion_and_reviews_update_aggregates(self):
+        first, second, third = self.book(self.customer), self.book(self.customer), self.book(self.other)
+        for booking in (first, second, third):
+            self.complete(booking)
+        # Completing twice must not double count.
+        self.complete(first)
+        self.review(first, 5)
+        self.review(third, 2)
+
+        self.pro_profile.refresh_from_db()
+        self.assertEqual(self.pro_profile.total_jobs, 3)
+        self.assertEqual(self.pro_profile.rating_count, 2)
+        self.assertEqual(self.pro_profile.rating_sum, 7)
+        self.assertAlmostEqual(self.pro_profile.rating, 3.5)
+        self.assertAlmostEqual(self.pro_profile.rehire_percentage, 50.0)
+
+    def test_update_job_counts_completion(self):
+        booking = self.book(self.customer, status='PROCESSING')
+        self.client.login(username="pro", password="password")
+        self.client.post(reverse('update_job', kwargs={'booking_id': booking.id}), {'status': 'COMPLETED', 'requirements': ''})
+        self.pro_profile.refresh_from_db()
+        self.assertEqual(self.pro_profile.total_jobs, 1)
+
+    def test_rebuild_command_matches_incremental(self):
+        first, second = self.book(self.customer, 'COMPLETED'), self.book(self.other, 'COMPLETED')
+        Review.objects.create(booking=first, rating=4, comment="ok")
+        Review.objects.create(booking=second, rating=3, comment="ok")
+
+        call_command('rebuild_pro_stats', stdout=StringIO())
+        self.pro_profile.refresh_from_db()
+        self.assertEqual(self.pro_profile.total_jobs, 2)
+        self.assertEqual((self.pro_profile.rating_sum, self.pro_profile.rating_count), (7, 2))
+        self.assertAlmostEqual(self.pro_profile.rating, 3.5)
+        self.assertEqual(self.pro_profile.rehire_percentage, 0.0)
@@ -0,0 +1,123 @@
+import os
+import sqlite3
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from .sync import fixture_tables, sync_databases
+
+class SyncDatabasesTest(TestCase):
+    TABLES = ['fixture_category', 'fixture_service']
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.source = os.path.join(tmp.name, 'source.sqlite3')
+        self.target = os.path.join(tmp.name, 'target.sqlite3')
+
+        # Build both files from the test database's own DDL.
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)", self.TABLES
+            )
+            ddl = [row[0] for row in cursor.fetchall()]
+        for path in (self.source, self.target):
+            conn = sqlite3.connect(path)
+            for statement in ddl:
+                conn.execute(statement)
+            conn.commit()
+            conn.close()
+
+        self.execute(self.source, "INSERT INTO fixture_category (id, name, icon, description) VALUES (?, ?, '', '')", [
+            (1, "Plumbing"), (2, "Electrical"), (3, "Painting"),
+        ])
+        self.execute(self.source, (
+            "INSERT INTO fixture_service (id, category_id, name, base_price, duration, description, is_active) "
+            "VALUES (?, ?, ?, 50, 60, '', 1)"
+        ), [(i, 1 + i % 3, f"Service {i}") for i in range(1, 101)])
+
+    def execute(self, path, sql, rows):
+        conn = sqlite3.connect(path)
+        conn.executemany(sql, rows)
+        conn.commit()
+        conn.close()
+
+    def fetch(self, path, sql):
+        conn = sqlite3.connect(path)
+        try:
+            return conn.execute(sql).fetchall()
+        finally:
+            conn.close()
+
+    def test_dependency_order(self):
+        tables = fixture_tables()
+        self.assertLess(tables.index('fixture_category'), tables.index('fixture_service'))
+        self.assertLess(tables.index('fixture_user'), tables.index('fixture_booking'))
+        self.assertLess(tables.index('fixture_booking'), tables.index('fixture_review'))
+
+    def test_initial_sync_then_incremental(self):
+        reports = sync_databases(self.source, self.target, tables=self.TABLES)
+        self.assertEqual([r.inserted for r in reports], [3, 100])
+        self.assertEqual(self.fetch(self.target, "SELECT COUNT(*) FROM fixture_service"), [(100,)])
+
+        self.execute(self.source, "UPDATE fixture_service SET base_price = ? WHERE id = ?", [(75, 5), (80, 6)])
+        reports = sync_databases(self.source, self.target, tables=self.TABLES)
+        service = reports[1]
+        self.assertEqual((service.inserted, service.updated, service.unchanged), (0, 2, 98))
+        self.assertEqual(self.fetch(self.target, "SELECT base_price FROM fixture_service WHERE id = 5"), [(75,)])
+
+    def test_changes_that_collide_under_hash_are_seen(self):
+        # hash(-1) == hash(-2) in CPython, which is how the old comparison missed this.
+        self.execute(self.source, "UPDATE fixture_service SET duration = ? WHERE id = ?", [(-1, 7)])
+        sync_databases(self.source, self.target, tables=self.TABLES)
+        self.execute(self.source, "UPDATE fixture_service SET duration = ? WHERE id = ?", [(-2, 7)])
+        reports = sync_databases(self.source, self.target, tables=self.TABLES)
+        self.assertEqual((reports[1].updated, reports[1].changed_ids), (1, []))
+        self.assertEqual(self.fetch(self.target, "SELECT duration FROM fixture_service WHERE id = 7"), [(-2,)])
+
+    def test_tables_with_updated_at_sync_from_a_watermark(self):
+        for path in (self.source, self.target):
+            conn = sqlite3.connect(path)
+            conn.execute("CREATE TABLE stamped (id INTEGER PRIMARY KEY, value TEXT, updated_at TEXT)")
+            conn.close()
+        self.execute(self.source, "INSERT INTO stamped VALUES (?, ?, ?)", [
+            *((i, f"v{i}", '2020-01-01 00:00:00') for i in range(1, 51)), (51, "v51", '2021-01-01 00:00:00.5'),
+        ])
+        self.assertEqual(sync_databases(self.source, self.target, tables=['stamped'])[0].inserted, 51)
+
+        # A no-op re-sync only reads what changed at or just before the watermark.
+        report = sync_databases(self.source, self.target, tables=['stamped'])[0]
+        self.assertEqual((report.scanned, report.unchanged), (1, 1))
+
+        self.execute(self.source, "UPDATE stamped SET value = 'new', updated_at = ? WHERE id = ?", [('2022-01-01 00:00:00', 3)])
+        self.execute(self.source, "DELETE FROM stamped WHERE id = ?", [(4,)])
+        report = sync_databases(self.source, self.target, tables=['stamped'], prune=True)[0]
+        self.assertEqual((report.scanned, report.updated, report.deleted), (2, 1, 1))
+        self.assertEqual(self.fetch(self.target, "SELECT value FROM stamped WHERE id = 3"), [("new",)])
+
+        # A change that did not touch updated_at is only found by a full comparison.
+        self.execute(self.source, "UPDATE stamped SET value = 'quiet' WHERE id = ?", [(5,)])
+        self.assertEqual(sync_databases(self.source, self.target, tables=['stamped'])[0].updated, 0)
+        report = sync_databases(self.source, self.target, tables=['stamped'], full=True)[0]
+        self.assertEqual((report.scanned, report.updated), (50, 1))
+
+    def test_dry_run_writes_nothing(self):
+        reports = sync_databases(self.source, self.target, tables=self.TABLES, dry_run=True, keep_ids=5)
+        self.assertEqual(reports[0].inserted, 3)
+        self.assertEqual(reports[0].changed_ids, [1, 2, 3])
+        self.assertEqual(self.fetch(self.target, "SELECT COUNT(*) FROM fixture_category"), [(0,)])
+
+    def test_prune_removes_rows_missing_from_source(self):
+        sync_databases(self.source, self.target, tables=self.TABLES)
+        self.execute(self.source, "DELETE FROM fixture_service WHERE id = ?", [(1,), (2,)])
+        reports = sync_databases(self.source, self.target, tables=self.TABLES, prune=True)
+        self.assertEqual(reports[1].deleted, 2)
+        self.assertEqual(self.fetch(self.target, "SELECT COUNT(*) FROM fixture_service"), [(98,)])
+
+    def test_command_reports_throughput(self):
+        out = StringIO()
+        call_command('sync_fixture_db', source=self.source, target=self.target, tables=self.TABLES, stdout=out)
+        self.assertIn("fixture_service: 100 new", out.getvalue())
+        self.assertIn("rows/s", out.getvalue())
@@ -0,0 +1,68 @@
+import io
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.template import Context, Template
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .models import Category
+from .testing import make_category
+from . import thumbnails
+
+
+def photo(size=(1200, 900), color=(200, 40, 40)):
+    buf = io.BytesIO()
+    Image.new('RGB', size, color).save(buf, 'JPEG')
+    return buf.getvalue()
+
+
+class ThumbnailTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.media = tempfile.mkdtemp()
+        self.settings_override = override_settings(MEDIA_ROOT=self.media)
+        self.settings_override.enable()
+
+    def tearDown(self):
+        self.settings_override.disable()
+        shutil.rmtree(self.media, ignore_errors=True)
+
+    def test_generate_writes_every_size_under_content_hash(self):
+        name = default_storage.save('pro_pics/a.jpg', ContentFile(photo()))
+        digest = thumbnails.generate(name)
+
+        for size in thumbnails.SIZES:
+            for ext in thumbnails.FORMATS:
+                with default_storage.open(thumbnails.derivative_name(digest, size, ext)) as f:
+                    self.assertEqual(Image.open(f).size, (size, size))
+        # The same bytes uploaded under another name reuse the derivatives.
+        copy = default_storage.save('pro_pics/b.jpg', ContentFile(photo()))
+        self.assertEqual(thumbnails.generate(copy), digest)
+
+    def test_tag_falls_back_until_generated(self):
+        category = make_category()
+        category.icon.save('icon.jpg', ContentFile(photo()), save=False)
+        template = Template('{% load thumbnails %}{% thumbnail cat.icon 48 class="mb-3" %}')
+
+        html = template.render(Context({'cat': category}))
+        self.assertIn(f'src="{category.icon.url}"', html)
+
+        # The miss queued generation; once it lands the tag serves derivatives.
+        thumbnails.schedule(category.icon.name).result()
+        html = template.render(Context({'cat': category}))
+        self.assertIn('<picture>', html)
+        self.assertIn('-48.webp 1x', html)
+        self.assertIn('-100.webp 2x', html)
+        self.assertIn('class="mb-3"', html)
+        self.assertEqual(Template('{% load thumbnails %}{% thumbnail cat.icon 48 %}').render(Context({'cat': Category()})), '')
+
+    def test_backfill_command(self):
+        names = [default_storage.save(f'pro_pics/{i}.jpg', ContentFile(photo(color=(i, i, i)))) for i in range(3)]
+        call_command('build_thumbnails', stdout=io.StringIO())
+        for name in names:
+            self.assertIsNotNone(cache.get(thumbnails.ready_key(name)))
@@ -0,0 +1,146 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Booking, JobTracking, TrackingPoint
+from .testing import MarketplaceFixtures
+from .tracking import E6, simplify
+
+User = get_user_model()
+
+
+def pings(start, count, step_m=0.0, lat=12.9716, lon=77.5946):
+    """`count` pings one second apart from `start`, heading north `step_m` metres a ping."""
+    t0 = start.timestamp()
+    return [{'lat': lat + i * step_m / 111_195, 'lon': lon, 't': t0 + i} for i in range(count)]
+
+
+class SimplifyTest(TestCase):
+    def point(self, i, lat, lon):
+        return (i, round(lat * E6), round(lon * E6))
+
+    def test_straight_line_keeps_its_ends(self):
+        points = [self.point(i, 12.9 + i * 0.0001, 77.6 + i * 0.0001) for i in range(100)]
+        self.assertEqual(simplify(points, 10), [points[0], points[-1]])
+
+    def test_corner_survives(self):
+        points = [self.point(i, 12.9, 77.6 + i * 0.0001) for i in range(50)]
+        points += [self.point(50 + i, 12.9 + (i + 1) * 0.0001, 77.6049) for i in range(50)]
+        kept = simplify(points, 10)
+        self.assertEqual(len(kept), 3)
+        self.assertEqual(kept[1], points[49])
+
+
+@override_settings(TRACKING_WRITE_INTERVAL=15, TRACKING_TOLERANCE_M=10)
+class TrackingEndpointTest(MarketplaceFixtures, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.make_marketplace()
+        self.booking = self.make_booking(status='CONFIRMED')
+        self.url = reverse('tracking_points', args=[self.booking.id])
+        self.start = timezone.now() - timedelta(hours=2)
+
+    def post(self, points, status=None, user=None):
+        self.client.force_login(user or self.pro_user)
+        body = {} if points is None else {'points': points}
+        if status:
+            body['status'] = status
+        return self.client.post(self.url, json.dumps(body), content_type='application/json')
+
+    def test_stationary_hour_is_stored_as_two_points(self):
+        response = self.post(pings(self.start, 3600))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'received': 3600, 'stored': 2, 'position_updated': True})
+        tracking = JobTracking.objects.get(booking=self.booking)
+        self.assertEqual(tracking.status, 'ON_THE_WAY')
+        self.assertEqual(str(tracking.latitude), '12.971600')
+
+        # Replayed points are ignored; the next batch extends the trail from its last point.
+        self.post(pings(self.start, 10))
+        self.assertEqual(TrackingPoint.objects.count(), 2)
+        self.post(pings(self.start + timedelta(hours=1), 600, step_m=5))
+        self.assertEqual(TrackingPoint.objects.count(), 3)
+
+        self.client.force_login(self.customer)
+        trail = self.client.get(self.url).json()['points']
+        self.assertEqual(len(trail), 3)
+        self.assertAlmostEqual(trail[-1][0], 12.9716 + 599 * 5 / 111_195, places=6)
+
+    def test_position_writes_are_coalesced(self):
+        self.post(pings(self.start, 5))
+        first = JobTracking.objects.get().updated_at
+        response = self.post(pings(self.start + timedelta(seconds=5), 5, step_m=50))
+        self.assertEqual(response.json()['position_updated'], False)
+        self.assertEqual(JobTracking.objects.get().updated_at, first)
+
+        # Once the interval has passed, the next batch moves the marker.
+        cache.clear()
+        JobTracking.objects.update(updated_at=first - timedelta(seconds=15))
+        response = self.post(pings(self.start + timedelta(seconds=10), 5, step_m=50, lat=13.0))
+        self.assertTrue(response.json()['position_updated'])
+        self.assertEqual(str(JobTracking.objects.get().latitude)[:5], '13.00')
+
+    def test_status_change_is_written_immediately(self):
+        self.post(pings(self.start, 5))
+        response = self.post(pings(self.start + timedelta(seconds=5), 1), status='ARRIVED')
+        self.assertTrue(response.json()['position_updated'])
+        self.assertEqual(JobTracking.objects.get().status, 'ARRIVED')
+
+    def test_status_without_points(self):
+        # Nowhere to put a status before the first ping.
+        self.assertEqual(self.post(None, status='ARRIVED').json()['position_updated'], False)
+        self.post(pings(self.start, 5))
+        response = self.post(None, status='ARRIVED')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'received': 0, 'stored': 0, 'position_updated': True})
+        self.assertEqual(JobTracking.objects.get().status, 'ARRIVED')
+        self.assertEqual(self.post([], status='ON_THE_WAY').status_code, 200)
+        self.assertEqual(TrackingPoint.objects.count(), 2)
+        # Without a status there is nothing to report.
+        self.assertEqual(self.post(None).status_code, 400)
+        self.assertEqual(self.post([]).status_code, 400)
+
+    def test_permissions_and_validation(self):
+        self.assertEqual(self.post(pings(self.start, 2), user=self.customer).status_code, 403)
+        self.assertEqual(self.post([{'lat': 95, 'lon': 0, 't': self.start.timestamp()}]).status_code, 400)
+        self.assertEqual(self.post([{'lat': 1, 'lon': 1}]).status_code, 400)
+        for t in (1e20, -1e20):
+            self.assertEqual(self.post([{'lat': 1, 'lon': 1, 't': t}]).status_code, 400)
+        self.assertEqual(self.post(pings(timezone.now() + timedelta(hours=1), 2)).status_code, 400)
+        self.assertEqual(self.post(pings(self.start, 2), status='LOST').status_code, 400)
+        self.client.force_login(self.pro_user)
+        self.assertEqual(self.client.post(self.url, 'nope', content_type='application/json').status_code, 400)
+        stranger = User.objects.create_user(username="stranger", password="password")
+        self.client.force_login(stranger)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        Booking.objects.filter(pk=self.booking.pk).update(status='COMPLETED')
+        self.assertEqual(self.post(pings(self.start, 2)).status_code, 409)
+        self.assertFalse(TrackingPoint.objects.exists())
+
+    def test_track_page_before_first_ping(self):
+        self.client.force_login(self.customer)
+        response = self.client.get(reverse('track_job', args=[self.booking.id]))
+        self.assertContains(response, "Awaiting location")
+        self.assertFalse(JobTracking.objects.exists())
+
+    def test_compact_tracking_merges_batch_boundaries(self):
+        for batch in range(3):
+            self.post(pings(self.start + timedelta(seconds=batch * 100), 100, step_m=5, lat=12.9716 + batch * 500 / 111_195))
+        # One straight line, but each batch boundary was kept as an end point.
+        self.assertEqual(TrackingPoint.objects.count(), 4)
+        call_command('compact_tracking', stdout=StringIO())
+        self.assertEqual(TrackingPoint.objects.count(), 4)
+
+        Booking.objects.filter(pk=self.booking.pk).update(status='COMPLETED')
+        out = StringIO()
+        call_command('compact_tracking', stdout=out)
+        self.assertIn("Compacted 1 trails, deleted 2 points", out.getvalue())
+        self.assertEqual(TrackingPoint.objects.count(), 2)
@@ -0,0 +1,114 @@
+import hashlib
+import io
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Square edge lengths, in pixels, that derivatives are generated at. Templates ask
+# for a display size and get the smallest derivative at least that large.
+SIZES = (32, 48, 64, 100, 160, 320)
+FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+THUMB_DIR = 'thumbs'
+
+executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='thumbnails')
+pending = {}
+pending_lock = threading.Lock()
+
+
+def ready_key(name):
+    return 'thumbs:' + hashlib.md5(name.encode()).hexdigest()
+
+
+def content_digest(name):
+    sha = hashlib.sha256()
+    with default_storage.open(name, 'rb') as f:
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            sha.update(chunk)
+    return sha.hexdigest()[:24]
+
+
+def derivative_name(digest, size, ext):
+    return f'{THUMB_DIR}/{digest[:2]}/{digest}-{size}.{ext}'
+
+
+def pick_size(px):
+    return next((size for size in SIZES if size >= px), SIZES[-1])
+
+
+def generate(name):
+    """
+    Write every missing derivative of the stored image `name` and mark it ready.
+    Derivatives are named by the source's content hash, so re-uploads of the same
+    photo share files and a name never changes meaning. Returns the digest.
+    """
+    digest = content_digest(name)
+    missing = [
+        (size, ext) for size in SIZES for ext in FORMATS
+        if not default_storage.exists(derivative_name(digest, size, ext))
+    ]
+    if missing:
+        with default_storage.open(name, 'rb') as f:
+            source = ImageOps.exif_transpose(Image.open(f))
+            source.load()
+        if source.mode not in ('RGB', 'RGBA'):
+            source = source.convert('RGBA')
+        for size, ext in missing:
+            image = ImageOps.fit(source, (size, size), Image.LANCZOS)
+            pil_format, options = FORMATS[ext]
+            if pil_format == 'JPEG' and image.mode == 'RGBA':
+                flat = Image.new('RGB', image.size, (255, 255, 255))
+                flat.paste(image, mask=image.getchannel('A'))
+                image = flat
+            buf = io.BytesIO()
+            image.save(buf, pil_format, **options)
+            default_storage.save(derivative_name(digest, size, ext), ContentFile(buf.getvalue()))
+    cache.set(ready_key(name), digest, None)
+    if missing:
+        # Cached page fragments may still point at the original upload.
+        from .catalogue import invalidate_catalogue
+        invalidate_catalogue()
+    return digest
+
+
+def generate_safely(name):
+    try:
+        return generate(name)
+    except Exception:
+        logger.exception("Could not build thumbnails for %s", name)
+    finally:
+        with pending_lock:
+            pending.pop(name, None)
+
+
+def schedule(name):
+    """Queue derivative generation for `name` on the worker pool; returns the future."""
+    with pending_lock:
+        if name not in pending:
+            pending[name] = executor.submit(generate_safely, name)
+        return pending[name]
+
+
+def thumbnail_urls(name, px):
+    """
+    (1x, 2x) URLs per format for displaying `name` at `px` pixels, or None while
+    derivatives are still being generated (generation is queued on a miss).
+    """
+    digest = cache.get(ready_key(name))
+    if digest is None:
+        schedule(name)
+        return None
+    sizes = (pick_size(px), pick_size(px * 2))
+    return {
+        ext: [default_storage.url(derivative_name(digest, size, ext)) for size in sizes]
+        for ext in FORMATS
+    }
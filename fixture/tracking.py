@@ -0,0 +1,249 @@
+import math
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.utils import timezone
+
+from .broker import (
+    FINAL_STATUSES, HEARTBEAT, booking_topic, broker, position_event, publish_on_commit, sse, status_event,
+)
+from .geo import EARTH_RADIUS_KM, geohash_encode
+from .models import Booking, JobTracking, TrackingPoint
+
+# Most points accepted per request: an hour of 1 Hz pings.
+MAX_BATCH = 3600
+# Points may not claim to be from further ahead than this, for clock skew.
+MAX_FUTURE_SKEW = timedelta(seconds=60)
+# Points further than this from the simplified trail are kept; the rest are dropped.
+DEFAULT_TOLERANCE_M = 10.0
+# The current-position row is rewritten at most once per this many seconds per booking.
+DEFAULT_WRITE_INTERVAL = 15
+TRACKABLE_STATUSES = ('CONFIRMED', 'PROCESSING')
+STATUS_DISPLAY = dict(Booking.STATUS_CHOICES)
+E6 = 1_000_000
+
+
+class InvalidPoints(Exception):
+    pass
+
+
+def tolerance_m():
+    return getattr(settings, 'TRACKING_TOLERANCE_M', DEFAULT_TOLERANCE_M)
+
+
+def write_interval():
+    return getattr(settings, 'TRACKING_WRITE_INTERVAL', DEFAULT_WRITE_INTERVAL)
+
+
+def written_key(booking_id):
+    return f'tracking-written:{booking_id}'
+
+
+def parse_points(raw):
+    """
+    Validate a batch of {'lat', 'lon', 't'} dicts (t in epoch seconds) into
+    (recorded_at, lat_e6, lon_e6) tuples in time order. Raises InvalidPoints.
+    """
+    if not isinstance(raw, list) or not raw:
+        raise InvalidPoints("Send a non-empty list of points.")
+    if len(raw) > MAX_BATCH:
+        raise InvalidPoints(f"Send at most {MAX_BATCH} points per request.")
+    latest = timezone.now() + MAX_FUTURE_SKEW
+    points = []
+    for item in raw:
+        try:
+            lat, lon, t = float(item['lat']), float(item['lon']), float(item['t'])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidPoints("Every point needs numeric lat, lon and t.")
+        if not (-90 <= lat <= 90 and -180 <= lon <= 180) or not math.isfinite(t):
+            raise InvalidPoints("Point out of range.")
+        try:
+            recorded_at = datetime.fromtimestamp(t, tz=dt_timezone.utc)
+        except (OverflowError, OSError, ValueError):
+            raise InvalidPoints("Point out of range.")
+        if recorded_at > latest:
+            raise InvalidPoints("Point recorded in the future.")
+        points.append((recorded_at, round(lat * E6), round(lon * E6)))
+    points.sort()
+    return points
+
+
+def offset_m(origin, point):
+    """Local east/north offset in metres of `point` from `origin`, both (lat_e6, lon_e6)."""
+    scale = EARTH_RADIUS_KM * 1000 * math.pi / 180 / E6
+    east = (point[1] - origin[1]) * scale * math.cos(math.radians(origin[0] / E6))
+    north = (point[0] - origin[0]) * scale
+    return east, north
+
+
+def simplify(points, tolerance):
+    """
+    Douglas-Peucker over (recorded_at, lat_e6, lon_e6) points: keep the ends and
+    every point further than `tolerance` metres from the line through its kept
+    neighbours. Distances use a flat projection around the first point, which
+    is exact enough over the span of a single trip. Returns the kept points.
+    """
+    if len(points) < 3:
+        return list(points)
+    origin = points[0][1:]
+    xy = [offset_m(origin, p[1:]) for p in points]
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+        furthest, index = -1.0, None
+        for i in range(first + 1, last):
+            x, y = xy[i]
+            if length:
+                distance = abs(dy * (x - x1) - dx * (y - y1)) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > furthest:
+                furthest, index = distance, i
+        if index is not None and furthest > tolerance:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [p for p, kept in zip(points, keep) if kept]
+
+
+def last_point(booking_id):
+    row = (
+        TrackingPoint.objects.filter(booking_id=booking_id)
+        .order_by('-recorded_at')
+        .values_list('recorded_at', 'lat_e6', 'lon_e6')
+        .first()
+    )
+    return tuple(row) if row else None
+
+
+def ingest(booking, raw_points, status=None):
+    """
+    Store a batch of pings for `booking`. Points no newer than the trail's last
+    point are dropped as replays; the rest are simplified together with that
+    last point, so a stationary hour collapses to its two ends, and appended to
+    the trail. The current-position row takes the newest point, but at most
+    once per write interval unless `status` changes. With a `status`, the
+    points may be left out: the status lands on the last known position.
+    Returns a summary dict.
+    """
+    status_only = status is not None and raw_points in (None, [])
+    points = [] if status_only else parse_points(raw_points)
+    previous = last_point(booking.pk)
+    if previous:
+        points = [p for p in points if p[0] > previous[0]]
+    summary = {'received': 0 if status_only else len(raw_points), 'stored': 0, 'position_updated': False}
+    if not points and status is None:
+        return summary
+
+    with transaction.atomic():
+        if points:
+            anchor = [previous] if previous else []
+            kept = simplify(anchor + points, tolerance_m())[len(anchor):]
+            # The newest point always survives, so the trail ends where the pro is.
+            TrackingPoint.objects.bulk_create([
+                TrackingPoint(booking_id=booking.pk, recorded_at=t, lat_e6=lat, lon_e6=lon) for t, lat, lon in kept
+            ])
+            summary['stored'] = len(kept)
+        summary['position_updated'] = update_position(booking, points[-1] if points else previous, status)
+    return summary
+
+
+def update_position(booking, point, status=None):
+    """
+    Coalesced write of the current-position row. A cache marker skips most
+    attempts without touching the database; the conditional UPDATE on
+    updated_at is what holds the limit across processes.
+    """
+    now = timezone.now()
+    interval = write_interval()
+    if status is None and not cache.add(written_key(booking.pk), True, interval):
+        return False
+    if point is None:
+        return False
+    _, lat_e6, lon_e6 = point
+    lat, lon = Decimal(lat_e6).scaleb(-6), Decimal(lon_e6).scaleb(-6)
+    fields = {'latitude': lat, 'longitude': lon, 'geohash': geohash_encode(lat, lon), 'updated_at': now}
+    if status is not None:
+        fields['status'] = status
+    rows = JobTracking.objects.filter(booking_id=booking.pk)
+    if status is None:
+        rows = rows.filter(updated_at__lte=now - timedelta(seconds=interval))
+    if not rows.update(**fields):
+        _, created = JobTracking.objects.get_or_create(
+            booking_id=booking.pk, defaults={**fields, 'status': status or 'ON_THE_WAY'},
+        )
+        if not created:
+            return False
+        status = status or 'ON_THE_WAY'
+    publish_on_commit(booking.pk, 'position', position_event(lat, lon, now, status))
+    return True
+
+
+def trail(booking_id):
+    """The stored breadcrumb trail as [lat, lon, epoch seconds] lists, oldest first."""
+    return [
+        [lat / E6, lon / E6, recorded_at.timestamp()]
+        for recorded_at, lat, lon in TrackingPoint.objects.filter(booking_id=booking_id)
+        .order_by('recorded_at')
+        .values_list('recorded_at', 'lat_e6', 'lon_e6')
+    ]
+
+
+def compact_trail(booking_id, tolerance=None):
+    """
+    Re-simplify a whole stored trail, removing points that per-batch
+    simplification had to keep at batch boundaries. Returns the rows deleted.
+    """
+    rows = list(
+        TrackingPoint.objects.filter(booking_id=booking_id)
+        .order_by('recorded_at')
+        .values_list('recorded_at', 'lat_e6', 'lon_e6', 'id')
+    )
+    kept = {row[3] for row in simplify(rows, tolerance_m() if tolerance is None else tolerance)}
+    dropped = [row[3] for row in rows if row[3] not in kept]
+    for start in range(0, len(dropped), 500):
+        TrackingPoint.objects.filter(pk__in=dropped[start:start + 500]).delete()
+    return len(dropped)
+
+
+async def event_stream(booking_id):
+    """
+    Server-Sent Events for one booking: the current position and status, then
+    each change as it is published, with keepalive comments while idle. Ends
+    after a final status. Subscribing before reading the snapshot means an
+    update landing in between is sent twice rather than lost.
+    """
+    subscription = broker.subscribe(booking_topic(booking_id))
+    try:
+        yield 'retry: 5000\n\n'
+        status = await Booking.objects.filter(pk=booking_id).values_list('status', flat=True).afirst()
+        current = await (
+            JobTracking.objects.filter(booking_id=booking_id)
+            .values('latitude', 'longitude', 'updated_at', 'status').afirst()
+        )
+        if current is not None:
+            yield sse('position', position_event(**current))
+        yield sse('status', status_event(status, STATUS_DISPLAY.get(status, status)))
+        # Everything after this comes from the broker. Hand back this request's
+        # database connection now rather than holding it for the stream's life.
+        await sync_to_async(connections.close_all)()
+        while status not in FINAL_STATUSES:
+            event = await subscription.get(HEARTBEAT)
+            if event is None:
+                yield ': keepalive\n\n'
+                continue
+            name, data, message = event
+            if name == 'status':
+                status = data['status']
+            yield message
+    finally:
+        broker.unsubscribe(subscription)
@@ -22,16 +22,22 @@ urlpatterns = [
     path('bookings/update/<int:booking_id>/<str:status>/', views.update_booking_status, name='update_booking_status'),
     path('profile/documents/', views.upload_documents, name='upload_documents'),
     path('invoice/<int:booking_id>/', views.view_invoice, name='view_invoice'),
+    path('invoice/<int:booking_id>/pdf/', views.invoice_pdf, name='invoice_pdf'),
     path('review/<int:booking_id>/', views.submit_review, name='submit_review'),
     path('complaint/<int:booking_id>/', views.submit_complaint, name='submit_complaint'),
     path('notifications/', views.notifications_view, name='notifications'),
     path('track/<int:booking_id>/', views.track_job, name='track_job'),
+    path('track/<int:booking_id>/points/', views.tracking_points, name='tracking_points'),
+    path('track/<int:booking_id>/events/', views.tracking_events, name='tracking_events'),
     path('search/', views.search_services, name='search_services'),
+    path('search/text/', views.text_search, name='text_search'),
     path('service/list/', views.list_service, name='list_service'),
     path('payment/<int:booking_id>/', views.process_payment, name='process_payment'),
     path('job/details/<int:booking_id>/', views.job_details, name='job_details'),
     path('job/update/<int:booking_id>/', views.update_job, name='update_job'),
     path('profile/', views.profile_view, name='profile_view'),
     path('admin/management/', views.admin_management, name='admin_management'),
+    path('staff/metrics/', views.request_metrics, name='request_metrics'),
+    path('staff/invoices/<int:year>/<int:month>/export/', views.export_invoices, name='export_invoices'),
 ]
 
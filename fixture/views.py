@@ -1,5 +1,7 @@
+import json
+
 from django.shortcuts import render, redirect
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
@@ -9,9 +11,34 @@ from .forms import (
     BookingForm, PaymentForm, ReviewForm, AdminManagementForm,
     JobUpdateForm
 )
-from .models import Category, ServiceProfessional, Booking, Service, JobTracking, UserProfile, Payment, Review
+from .models import User, Category, ServiceProfessional, Booking, Service, JobTracking, UserProfile, Payment, Review, SearchEntry
 
 from django.shortcuts import get_object_or_404
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.db import transaction
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from .pagination import keyset_paginate
+from .geo import nearby_professionals
+from .stats import record_review
+from .catalogue import get_catalogue
+from .notifications import dispatcher, notify, mark_read
+from .availability import SlotUnavailable, book_slot, slot_calendar
+from .documents import DocumentUploadHandler, UploadRejected, check_document
+from .search import search
+from .fulltext import KINDS, MAX_RESULTS, matching, search_text
+from .instrumentation import LATENCY_BUCKETS_MS, metrics
+from .lifecycle import TransitionError, transition
+from .tracking import TRACKABLE_STATUSES, InvalidPoints, event_stream, ingest, trail
+from .invoice_documents import CONTENT_TYPES, export_period, invoice_document, invoice_etag, invoice_queryset
+
+BOOKINGS_PER_PAGE = 20
+NOTIFICATIONS_PER_PAGE = 20
+DEFAULT_SEARCH_RADIUS_KM = 10
+NEARBY_PROS_LIMIT = 20
 
 
 def index(request):
@@ -24,26 +51,22 @@ def index(request):
 
 
 def home(request):
-    categories = Category.objects.all()
-    services = Service.objects.all()
-    # Relaxed filter for development/testing visibility
-    top_pros = ServiceProfessional.objects.all().order_by('-safety_score')[:4]
-    
-    context = {
-        'categories': categories,
-        'services': services,
-        'top_pros': top_pros
-    }
-    return render(request, 'home.html', context)
+    # Categories, services and top pros come from the versioned catalogue cache.
+    return render(request, 'home.html', get_catalogue())
 
 def category_professionals(request, category_id):
     category = get_object_or_404(Category, id=category_id)
-    professionals = ServiceProfessional.objects.filter(category=category)
+    professionals = ServiceProfessional.objects.filter(category=category).select_related('user').order_by('-rating')
     return render(request, 'category_pros.html', {'category': category, 'professionals': professionals})
 
 def service_professionals(request, service_id):
     service = get_object_or_404(Service, id=service_id)
-    professionals = ServiceProfessional.objects.filter(category=service.category)
+    if service.is_active:
+        entries = SearchEntry.objects.filter(service=service).select_related('professional__user').order_by('-rating')
+        professionals = [entry.professional for entry in entries]
+    else:
+        # Inactive services are left out of the search index; their page still lists the category's pros.
+        professionals = ServiceProfessional.objects.filter(category=service.category).select_related('user').order_by('-rating')
     return render(request, 'service_pros.html', {'service': service, 'professionals': professionals})
 
 def register_view(request):
@@ -61,18 +84,14 @@ def login_view(request):
     if request.method == 'POST':
         form = LoginForm(request, data=request.POST)
         if form.is_valid():
-            username = form.cleaned_data.get('username')
-            password = form.cleaned_data.get('password')
-            user = authenticate(username=username, password=password)
-            if user is not None:
-                login(request, user)
-                messages.info(request, f"You are now logged in as {username}.")
-                if user.is_professional:
-                    return redirect('dashboard')
-                else:
-                    return redirect('home')
+            # The form has authenticated already; authenticating again would hash the password twice.
+            user = form.get_user()
+            login(request, user)
+            messages.info(request, f"You are now logged in as {form.cleaned_data['username']}.")
+            if user.is_professional:
+                return redirect('dashboard')
             else:
-                messages.error(request, "Invalid username or password.")
+                return redirect('home')
         else:
             messages.error(request, "Invalid username or password.")
     
@@ -88,7 +107,7 @@ def logout_view(request):
 def dashboard(request):
     if request.user.is_professional:
         profile = get_object_or_404(ServiceProfessional, user=request.user)
-        recent_bookings = Booking.objects.filter(professional=profile).order_by('-created_at')[:5]
+        recent_bookings = Booking.objects.for_list().filter(professional=profile).order_by('-created_at')[:5]
         return render(request, 'pro_dashboard.html', {
             'profile': profile,
             'recent_bookings': recent_bookings
@@ -158,9 +177,16 @@ def book_professional(request, pro_id):
             booking = form.save(commit=False)
             booking.customer = request.user
             booking.professional = professional
-            booking.save()
-            messages.success(request, f"Booking request for {booking.service.name} sent!")
-            return redirect('customer_bookings')
+            try:
+                book_slot(booking)
+            except SlotUnavailable as e:
+                free = [name for name, count in slot_calendar(professional, form.cleaned_data['booking_date'].date(), booking.service).items() if count]
+                hint = f" Still free that day: {', '.join(free)}." if free else ""
+                form.add_error('time_slot', f"{e}{hint}")
+            else:
+                notify([professional.user_id], f"New booking request #{booking.id} for {booking.service.name} on {booking.booking_date:%b %d, %Y} ({booking.time_slot}).")
+                messages.success(request, f"Booking request for {booking.service.name} sent!")
+                return redirect('customer_bookings')
     else:
         selected_service_id = request.GET.get('service')
         initial_data = {}
@@ -180,7 +206,11 @@ def book_professional(request, pro_id):
 def customer_bookings(request):
     if not request.user.is_customer:
         return redirect('home')
-    bookings = Booking.objects.filter(customer=request.user).order_by('-booking_date')
+    bookings = keyset_paginate(
+        Booking.objects.for_list().filter(customer=request.user),
+        cursor=request.GET.get('after'),
+        per_page=BOOKINGS_PER_PAGE,
+    )
     return render(request, 'customer_bookings.html', {'bookings': bookings})
 
 @login_required
@@ -189,42 +219,43 @@ def professional_bookings(request):
         return redirect('home')
     
     profile = get_object_or_404(ServiceProfessional, user=request.user)
-    bookings = Booking.objects.filter(professional=profile).order_by('-booking_date')
+    bookings = keyset_paginate(
+        Booking.objects.for_list().filter(professional=profile),
+        cursor=request.GET.get('after'),
+        per_page=BOOKINGS_PER_PAGE,
+    )
     return render(request, 'professional_bookings.html', {'bookings': bookings})
 
 @login_required
 def update_booking_status(request, booking_id, status):
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_object_or_404(Booking.objects.select_related('professional', 'service'), id=booking_id)
     
     # Check permission (only professional can update status)
-    if not request.user.is_professional or booking.professional.user != request.user:
+    if not request.user.is_professional or booking.professional.user_id != request.user.id:
         messages.error(request, "You do not have permission to update this booking.")
         return redirect('home')
     
-    status_upper = status.upper()
-    if status_upper in dict(Booking.STATUS_CHOICES):
-        booking.status = status_upper
-        booking.save()
-        messages.success(request, f"Booking status updated to {status.capitalize()}.")
-        
-        # Auto-generate invoice if completed
-        if status_upper == 'COMPLETED':
-            from .models import Invoice
-            import uuid
-            Invoice.objects.get_or_create(
-                booking=booking,
-                defaults={
-                    'invoice_number': str(uuid.uuid4())[:8].upper(),
-                    'total_amount': booking.service.base_price if booking.service else 0
-                }
-            )
-            messages.success(request, "Invoice generated.")
+    try:
+        transition(booking, status.upper())
+    except TransitionError as e:
+        messages.error(request, str(e))
     else:
-        messages.error(request, "Invalid status update.")
+        messages.success(request, f"Booking status updated to {booking.get_status_display()}.")
+        if booking.status == 'COMPLETED':
+            messages.success(request, "Invoice generated.")
         
     return redirect('professional_bookings')
+@csrf_exempt
 @login_required
 def upload_documents(request):
+    # Upload handlers must be swapped before anything reads request.POST, which
+    # is why CSRF is checked by handle_document_upload rather than the middleware.
+    handler = DocumentUploadHandler(request)
+    request.upload_handlers = [handler]
+    return handle_document_upload(request, handler)
+
+@csrf_protect
+def handle_document_upload(request, handler):
     if not request.user.is_professional:
         return redirect('home')
     
@@ -235,27 +266,66 @@ def upload_documents(request):
         doc_type = request.POST.get('document_type')
         doc_file = request.FILES.get('document_file')
         
-        if doc_type and doc_file:
-            ProfessionalDocuments.objects.create(
-                professional=profile,
-                document_type=doc_type,
-                document_file=doc_file
-            )
-            messages.success(request, "Document uploaded for verification.")
-            return redirect('upload_documents')
+        if handler.error:
+            messages.error(request, handler.error)
+        elif doc_type and doc_file:
+            try:
+                check_document(doc_type, doc_file)
+            except UploadRejected as e:
+                messages.error(request, str(e))
+            else:
+                ProfessionalDocuments.objects.create(
+                    professional=profile,
+                    document_type=doc_type,
+                    document_file=doc_file
+                )
+                messages.success(request, "Document uploaded for verification.")
+                return redirect('upload_documents')
             
     docs = ProfessionalDocuments.objects.filter(professional=profile)
     return render(request, 'upload_docs.html', {'docs': docs})
 
 @login_required
-def view_invoice(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
-    if request.user != booking.customer and request.user != booking.professional.user:
+def view_invoice(request, booking_id, fmt='html'):
+    invoice = get_object_or_404(invoice_queryset(), booking_id=booking_id)
+    booking = invoice.booking
+    if request.user.id not in (booking.customer_id, booking.professional.user_id):
         return redirect('home')
-    
-    from .models import Invoice
-    invoice = get_object_or_404(Invoice, booking=booking)
-    return render(request, 'invoice.html', {'invoice': invoice, 'booking': booking})
+    return invoice_response(request, invoice, fmt)
+
+def invoice_pdf(request, booking_id):
+    return view_invoice(request, booking_id, fmt='pdf')
+
+def invoice_response(request, invoice, fmt):
+    """
+    Serve a stored invoice document. Repeat views answer 304 from the cached
+    ETag before the document is read, let alone rendered.
+    """
+    last_modified = int(invoice.generated_at.timestamp())
+    etag = invoice_etag(invoice, fmt)
+    response = None
+    if etag is not None:
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        content, etag = invoice_document(invoice, fmt)
+        response = HttpResponse(content, content_type=CONTENT_TYPES[fmt])
+        response.headers['Last-Modified'] = http_date(last_modified)
+        if fmt == 'pdf':
+            response.headers['Content-Disposition'] = f'inline; filename="{invoice.invoice_number}.pdf"'
+    response.headers['ETag'] = etag
+    # Browsers may keep a copy but must revalidate, and shared caches must not serve it to other users.
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
+
+@login_required
+def export_invoices(request, year, month):
+    if not request.user.is_staff:
+        return redirect('home')
+    fmt = 'html' if request.GET.get('format') == 'html' else 'pdf'
+    period = f'{year:04d}{month:02d}'
+    response = StreamingHttpResponse(export_period(period, fmt), content_type='application/zip')
+    response.headers['Content-Disposition'] = f'attachment; filename="invoices-{period}-{fmt}.zip"'
+    return response
 
 @login_required
 def submit_review(request, booking_id):
@@ -273,7 +343,10 @@ def submit_review(request, booking_id):
         if form.is_valid():
             review = form.save(commit=False)
             review.booking = booking
-            review.save()
+            with transaction.atomic():
+                review.save()
+                record_review(review)
+                notify([booking.professional.user_id], f"{request.user.username} rated booking #{booking.id} {review.rating}/5.")
             messages.success(request, "Thank you for your feedback!")
             return redirect('customer_bookings')
     else:
@@ -291,7 +364,10 @@ def submit_complaint(request, booking_id):
         description = request.POST.get('description')
         if description:
             from .models import Complaint
-            Complaint.objects.create(booking=booking, description=description)
+            with transaction.atomic():
+                Complaint.objects.create(booking=booking, description=description)
+                staff = User.objects.filter(is_staff=True).values_list('id', flat=True)
+                notify([booking.professional.user_id, *staff], f"Complaint raised on booking #{booking.id} by {request.user.username}.")
             messages.success(request, "Complaint submitted. Our admin will look into it.")
             return redirect('customer_bookings')
             
@@ -299,40 +375,99 @@ def submit_complaint(request, booking_id):
 
 @login_required
 def notifications_view(request):
-    notifications = request.user.notifications.all().order_by('-created_at')
-    notifications.update(is_read=True)
+    notifications = keyset_paginate(
+        request.user.notifications.all(),
+        cursor=request.GET.get('after'),
+        per_page=NOTIFICATIONS_PER_PAGE,
+        date_field='created_at',
+    )
+    # Only what is on screen counts as read; rows keep their old flag for this render.
+    mark_read(request.user.id, [note.id for note in notifications if not note.is_read])
     return render(request, 'notifications.html', {'notifications': notifications})
 
 @login_required
 def track_job(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_object_or_404(Booking.objects.for_detail(), id=booking_id)
     if request.user != booking.customer and request.user != booking.professional.user:
         return redirect('home')
     
-    # Mock tracking status or get existing
-    tracking, created = JobTracking.objects.get_or_create(
-        booking=booking,
-        defaults={'latitude': 12.9716, 'longitude': 77.5946, 'status': 'ON_THE_WAY'}
-    )
+    # No row until the pro's device sends its first position
+    tracking = JobTracking.objects.filter(booking=booking).first()
+    tracking_status = tracking.status if tracking else None
     
     # Timeline steps based on status
     steps = [
         {'id': 'PENDING', 'label': 'Booking Received', 'completed': True},
         {'id': 'CONFIRMED', 'label': 'Pro Confirmed', 'completed': booking.status in ['CONFIRMED', 'PROCESSING', 'COMPLETED']},
-        {'id': 'ON_THE_WAY', 'label': 'On the Way', 'completed': tracking.status in ['ON_THE_WAY', 'ARRIVED'] or booking.status in ['PROCESSING', 'COMPLETED']},
-        {'id': 'ARRIVED', 'label': 'Work in Progress', 'completed': tracking.status == 'ARRIVED' or booking.status in ['PROCESSING', 'COMPLETED']},
+        {'id': 'ON_THE_WAY', 'label': 'On the Way', 'completed': tracking_status in ['ON_THE_WAY', 'ARRIVED'] or booking.status in ['PROCESSING', 'COMPLETED']},
+        {'id': 'ARRIVED', 'label': 'Work in Progress', 'completed': tracking_status == 'ARRIVED' or booking.status in ['PROCESSING', 'COMPLETED']},
         {'id': 'COMPLETED', 'label': 'Service Finished', 'completed': booking.status == 'COMPLETED'},
     ]
 
     return render(request, 'tracking.html', {
         'booking': booking, 
         'tracking': tracking,
-        'steps': steps
+        'steps': steps,
+        # The event stream needs the async stack; under WSGI it would tie up a worker.
+        'live_updates': isinstance(request, ASGIRequest),
     })
 
+@login_required
+def tracking_points(request, booking_id):
+    """
+    POST: the booking's professional sends a batch of pings as JSON,
+    {"points": [{"lat": .., "lon": .., "t": <epoch seconds>}, ...], "status": "ARRIVED"}
+    with `status` optional, or `points` optional when a `status` is given.
+    GET: the stored trail, for the customer or the pro.
+    """
+    booking = get_object_or_404(Booking.objects.select_related('professional'), id=booking_id)
+    is_pro = request.user.id == booking.professional.user_id
+    if request.method == 'GET':
+        if not is_pro and request.user.id != booking.customer_id:
+            return JsonResponse({'error': "Not your booking."}, status=403)
+        return JsonResponse({'points': trail(booking.id)})
+    if request.method != 'POST':
+        return HttpResponse(status=405, headers={'Allow': 'GET, POST'})
+    if not is_pro:
+        return JsonResponse({'error': "Only the assigned professional can report a location."}, status=403)
+    if booking.status not in TRACKABLE_STATUSES:
+        return JsonResponse({'error': f"A {booking.status.lower()} booking is not being tracked."}, status=409)
+    try:
+        payload = json.loads(request.body)
+    except ValueError:
+        payload = None
+    if not isinstance(payload, dict):
+        return JsonResponse({'error': "Send a JSON object."}, status=400)
+    status = payload.get('status')
+    if status is not None and status not in dict(JobTracking.STATUS_CHOICES):
+        return JsonResponse({'error': "Unknown tracking status."}, status=400)
+    try:
+        summary = ingest(booking, payload.get('points'), status=status)
+    except InvalidPoints as e:
+        return JsonResponse({'error': str(e)}, status=400)
+    return JsonResponse(summary)
+
+@login_required
+async def tracking_events(request, booking_id):
+    """
+    Live tracking for the customer and the pro as Server-Sent Events. Async, so
+    an open stream holds a queue on the event loop rather than a worker thread.
+    """
+    user = await request.auser()
+    booking = await Booking.objects.filter(pk=booking_id).values('customer_id', 'professional__user_id').afirst()
+    if booking is None:
+        raise Http404("No such booking.")
+    if user.id not in (booking['customer_id'], booking['professional__user_id']):
+        return HttpResponse(status=403)
+    response = StreamingHttpResponse(event_stream(booking_id), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stops nginx from buffering the stream.
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
 @login_required
 def job_details(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
+    booking = get_object_or_404(Booking.objects.for_detail(), id=booking_id)
     if request.user != booking.customer and request.user != booking.professional.user:
         return redirect('home')
     
@@ -349,14 +484,82 @@ def job_details(request, booking_id):
 def search_services(request):
     form = ServiceSearchForm(request.GET or None)
     services = Service.objects.all()
+    professionals = None
+    results = facets = None
     if form.is_valid():
         if form.cleaned_data.get('category'):
             services = services.filter(category=form.cleaned_data['category'])
         if form.cleaned_data.get('price_range'):
             services = services.filter(base_price__lte=form.cleaned_data['price_range'])
-        # Location and Rating filtering would require geolocation or complex queries
-        
-    return render(request, 'search_results.html', {'form': form, 'services': services})
+        if form.cleaned_data.get('q'):
+            matches = matching('service', form.cleaned_data['q'])
+            if matches is not None:
+                services = services.filter(pk__in=matches)
+
+        origin = search_origin(request.user, form.cleaned_data)
+        radius = form.cleaned_data.get('radius') or DEFAULT_SEARCH_RADIUS_KM
+        if origin:
+            pros = ServiceProfessional.objects.filter(availability_status=True)
+            if form.cleaned_data.get('category'):
+                pros = pros.filter(category=form.cleaned_data['category'])
+            if form.cleaned_data.get('rating'):
+                pros = pros.filter(rating__gte=int(form.cleaned_data['rating']))
+            professionals = nearby_professionals(
+                *origin,
+                radius_km=radius,
+                queryset=pros,
+                limit=NEARBY_PROS_LIMIT,
+            )
+        results, facets = search(
+            category=form.cleaned_data.get('category'),
+            max_price=form.cleaned_data.get('price_range'),
+            min_rating=int(form.cleaned_data['rating']) if form.cleaned_data.get('rating') else None,
+            verified=form.cleaned_data.get('verified'),
+            origin=origin,
+            radius_km=radius,
+            text=form.cleaned_data.get('q'),
+            sort=form.cleaned_data.get('sort') or 'rating',
+            page=request.GET.get('page'),
+        )
+
+    return render(request, 'search_results.html', {
+        'form': form, 'services': services, 'professionals': professionals, 'results': results, 'facets': facets,
+    })
+
+@login_required
+def text_search(request):
+    """
+    JSON full-text search over services, categories and professionals.
+    `q` is the query, `type` (repeatable) restricts document kinds, `prefix=1`
+    matches the last word as a prefix for typeahead, `limit` caps the results.
+    """
+    kinds = [kind for kind in request.GET.getlist('type') if kind in KINDS]
+    try:
+        limit = int(request.GET.get('limit', 10))
+    except ValueError:
+        limit = 10
+    results = search_text(
+        request.GET.get('q', '')[:100], kinds=kinds or None,
+        prefix=request.GET.get('prefix') == '1', limit=min(limit, MAX_RESULTS),
+    )
+    return JsonResponse({'results': results})
+
+def search_origin(user, cleaned_data):
+    """
+    Resolve the point to search around: explicit coordinates from the form, else a
+    known profile in the typed city, else the searching user's own saved location.
+    Returns None when location search was not requested or nothing resolves.
+    """
+    if cleaned_data.get('latitude') is not None and cleaned_data.get('longitude') is not None:
+        return cleaned_data['latitude'], cleaned_data['longitude']
+    location = cleaned_data.get('location')
+    if not location:
+        return None
+    located = UserProfile.objects.filter(latitude__isnull=False, longitude__isnull=False)
+    origin = located.filter(city__iexact=location.strip()).values_list('latitude', 'longitude').first()
+    if origin is None:
+        origin = located.filter(user=user).values_list('latitude', 'longitude').first()
+    return origin
 
 @login_required
 def list_service(request):
@@ -389,9 +592,14 @@ def process_payment(request, booking_id):
         form = PaymentForm(request.POST, instance=payment)
         if form.is_valid():
             try:
-                payment = form.save()
-                payment.payment_status = 'SUCCESS'
-                payment.save()
+                with transaction.atomic():
+                    payment = form.save()
+                    payment.payment_status = 'SUCCESS'
+                    payment.save()
+                    notify(
+                        [booking.customer_id, booking.professional.user_id],
+                        f"Payment of ₹{payment.amount} received for booking #{booking.id}.",
+                    )
                 messages.success(request, f"Payment of ₹{payment.amount} processed successfully!")
                 return redirect('job_details', booking_id=booking.id)
             except Exception as e:
@@ -421,36 +629,36 @@ def admin_management(request):
     
     return render(request, 'admin_management.html', {'form': form})
 @login_required
+def request_metrics(request):
+    if not request.user.is_staff:
+        return redirect('home')
+    bounds = [f"≤{bound}" for bound in LATENCY_BUCKETS_MS] + [f">{LATENCY_BUCKETS_MS[-1]}"]
+    return render(request, 'request_metrics.html', {
+        'views': metrics.snapshot(), 'buckets': bounds, 'dispatcher': dispatcher.metrics(),
+    })
+
+@login_required
 def update_job(request, booking_id):
-    booking = get_object_or_404(Booking, id=booking_id)
-    if not request.user.is_professional or booking.professional.user != request.user:
+    booking = get_object_or_404(Booking.objects.select_related('professional', 'service'), id=booking_id)
+    if not request.user.is_professional or booking.professional.user_id != request.user.id:
         messages.error(request, "Access denied.")
         return redirect('home')
     
     if request.method == 'POST':
         form = JobUpdateForm(request.POST, instance=booking)
         if form.is_valid():
-            booking = form.save()
-            # If status changed to completed, ensure invoice exists
-            if booking.status == 'COMPLETED':
-                from .models import Invoice
-                import uuid
-                Invoice.objects.get_or_create(
-                    booking=booking,
-                    defaults={
-                        'invoice_number': str(uuid.uuid4())[:8].upper(),
-                        'total_amount': booking.service.base_price if booking.service else 0
-                    }
-                )
-            
-            # Update tracking status if applicable
-            tracking = getattr(booking, 'tracking', None)
-            if tracking:
-                if booking.status == 'COMPLETED':
-                    tracking.status = 'ARRIVED' # Or add a 'FINISHED' status if models allow
-                    tracking.save()
-
-            messages.success(request, "Job updated successfully.")
+            # Notes are saved on their own; the status only moves through transition().
+            # update() skips auto_now, and the sync watermark relies on updated_at moving.
+            Booking.objects.filter(pk=booking.pk).update(requirements=form.cleaned_data['requirements'], updated_at=timezone.now())
+            status = form.cleaned_data['status']
+            try:
+                if status != form.initial['status']:
+                    booking.status = form.initial['status']
+                    transition(booking, status)
+            except TransitionError as e:
+                messages.error(request, str(e))
+            else:
+                messages.success(request, "Job updated successfully.")
             return redirect('professional_bookings')
     else:
         form = JobUpdateForm(instance=booking)
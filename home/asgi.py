@@ -5,6 +5,11 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Live tracking (fixture.views.tracking_events) is an async Server-Sent Events
+stream fed by an in-process broker, so serve it from this application, e.g.
+``uvicorn home.asgi:application``, with the workers that publish tracking
+updates in the same process as the streams that deliver them.
 """
 
 import os
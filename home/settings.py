@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -41,6 +44,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost, so its timings and query counts include every other middleware.
+    'fixture.instrumentation.QueryMetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -62,6 +67,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'fixture.context_processors.notifications',
             ],
         },
     },
@@ -72,15 +78,191 @@ WSGI_APPLICATION = 'home.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# FIXTURE_DB selects the profile:
+#   sqlite        WAL journal and tuned pragmas on every connection (default)
+#   sqlite-basic  Django's stock SQLite settings, kept for benchmarking
+#   postgres      PostgreSQL through psycopg's connection pool (pip install "psycopg[pool]")
+
+DB_PROFILES = ('sqlite', 'sqlite-basic', 'postgres')
+DB_PROFILE = os.environ.get('FIXTURE_DB', 'sqlite')
+if DB_PROFILE not in DB_PROFILES:
+    # A typo would otherwise run on SQLite without anyone noticing.
+    raise ImproperlyConfigured(f"FIXTURE_DB={DB_PROFILE!r} is not one of {', '.join(DB_PROFILES)}.")
+
+SQLITE_PRAGMAS = ';'.join([
+    'PRAGMA journal_mode=WAL',
+    'PRAGMA synchronous=NORMAL',
+    'PRAGMA busy_timeout=5000',
+    'PRAGMA mmap_size=268435456',
+    'PRAGMA cache_size=-20000',
+    'PRAGMA temp_store=MEMORY',
+])
+
+if DB_PROFILE == 'postgres':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('FIXTURE_DB_NAME', 'fixture'),
+            'USER': os.environ.get('FIXTURE_DB_USER', 'fixture'),
+            'PASSWORD': os.environ.get('FIXTURE_DB_PASSWORD', ''),
+            'HOST': os.environ.get('FIXTURE_DB_HOST', 'localhost'),
+            'PORT': os.environ.get('FIXTURE_DB_PORT', '5432'),
+            # The pool owns connection lifetime, so Django must not keep its own.
+            'CONN_MAX_AGE': 0,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('FIXTURE_DB_POOL_MIN', 2)),
+                    'max_size': int(os.environ.get('FIXTURE_DB_POOL_MAX', 10)),
+                    'timeout': 10,
+                },
+            },
+        }
+    }
+elif DB_PROFILE == 'sqlite-basic':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('FIXTURE_DB_NAME', BASE_DIR / 'db.sqlite3'),
+        }
+    }
+elif DB_PROFILE == 'sqlite':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.environ.get('FIXTURE_DB_NAME', BASE_DIR / 'db.sqlite3'),
+            'CONN_MAX_AGE': int(os.environ.get('FIXTURE_DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'init_command': SQLITE_PRAGMAS,
+                # Take the write lock at BEGIN so writers queue on busy_timeout
+                # instead of failing when a read transaction upgrades.
+                'transaction_mode': 'IMMEDIATE',
+            },
+        }
+    }
+
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# FIXTURE_CACHE=file keeps the catalogue cache on disk so it is shared between
+# worker processes; the default is per-process local memory.
+
+if os.environ.get('FIXTURE_CACHE', 'locmem') == 'file':
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': os.environ.get('FIXTURE_CACHE_DIR', BASE_DIR / 'cache'),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'fixture',
+        }
+    }
+
+# Sessions
+# https://docs.djangoproject.com/en/5.2/topics/http/sessions/
+# FIXTURE_SESSIONS selects the profile:
+#   db              Django's stock database sessions: a SELECT on every authenticated request (default)
+#   cached_db       database rows read through the 'sessions' cache. A logout, flush() or
+#                   cycle_key() only evicts the key from the cache of the process that ran it,
+#                   so every process must share that cache: it is only allowed with
+#                   FIXTURE_CACHE=file, which keeps it on disk next to the catalogue cache
+#   file            one file per session under FIXTURE_SESSION_DIR (the temp dir by default)
+#   signed_cookies  the session lives in the signed cookie itself; nothing is stored, but a
+#                   logout cannot revoke a copied cookie before it expires
+# Database-backed profiles need purge_sessions run periodically; bench_sessions
+# compares the profiles.
+
+if CACHES['default']['BACKEND'].endswith('FileBasedCache'):
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(CACHES['default']['LOCATION'], 'sessions'),
+    }
+else:
+    # Per process: fine for tests and benchmarks, which run in one.
+    CACHES['sessions'] = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'sessions',
     }
+
+SESSION_PROFILES = {
+    'db': {'SESSION_ENGINE': 'django.contrib.sessions.backends.db'},
+    'cached_db': {'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db', 'SESSION_CACHE_ALIAS': 'sessions'},
+    'file': {'SESSION_ENGINE': 'django.contrib.sessions.backends.file', 'SESSION_FILE_PATH': os.environ.get('FIXTURE_SESSION_DIR')},
+    'signed_cookies': {'SESSION_ENGINE': 'django.contrib.sessions.backends.signed_cookies'},
+}
+SESSION_PROFILE = os.environ.get('FIXTURE_SESSIONS', 'db')
+if SESSION_PROFILE == 'cached_db' and CACHES['sessions']['BACKEND'].endswith('LocMemCache'):
+    raise ImproperlyConfigured(
+        "FIXTURE_SESSIONS=cached_db needs a session cache shared by every process; set FIXTURE_CACHE=file."
+    )
+globals().update(SESSION_PROFILES[SESSION_PROFILE])
+
+# Notifications are written by a background thread in batches; 'sync' writes
+# them on commit in the request thread.
+
+NOTIFICATION_DISPATCH = os.environ.get('FIXTURE_NOTIFICATIONS', 'thread')
+
+# Request metrics: one JSON line per request on the fixture.instrumentation
+# logger. FIXTURE_REQUEST_LOG=INFO turns the lines on.
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'fixture.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('FIXTURE_REQUEST_LOG', 'WARNING'),
+            'propagate': False,
+        },
+    },
+}
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.2/topics/auth/passwords/
+# FIXTURE_PASSWORDS selects the profile:
+#   scrypt  scrypt at PASSWORD_SCRYPT's cost, one lane over 32 MiB (default)
+#   pbkdf2  Django's stock PBKDF2
+#   fast    salted MD5, for tests only: home.test_settings selects it, and no
+#           other profile accepts MD5 hashes
+# The scrypt and pbkdf2 profiles keep each other's hashers after their own, so
+# every stored hash still verifies and is rehashed with the profile's hasher at
+# its owner's next login. bench_login reports login latency per profile and
+# calibrates the scrypt cost.
+
+PASSWORD_PROFILE = os.environ.get('FIXTURE_PASSWORDS', 'scrypt')
+
+PASSWORD_HASHER_PROFILES = {
+    'scrypt': ['fixture.hashers.TunedScryptPasswordHasher'],
+    'pbkdf2': ['django.contrib.auth.hashers.PBKDF2PasswordHasher'],
+    'fast': ['django.contrib.auth.hashers.MD5PasswordHasher'],
 }
 
 
+def password_hashers(profile):
+    return PASSWORD_HASHER_PROFILES[profile] + [
+        hasher for name, hashers in PASSWORD_HASHER_PROFILES.items() if name not in (profile, 'fast') for hasher in hashers
+    ] + [
+        # Stock scrypt hashes verify through the tuned hasher: same algorithm name,
+        # and a second 'scrypt' entry would take its place in lookups.
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    ]
+
+
+PASSWORD_HASHERS = password_hashers(PASSWORD_PROFILE)
+
+PASSWORD_SCRYPT = {
+    'work_factor': int(os.environ.get('FIXTURE_SCRYPT_WORK_FACTOR', 2**15)),
+    'block_size': 8,
+    'parallelism': 1,
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -112,6 +294,8 @@ USE_I18N = True
 USE_TZ = True
 
 AUTH_USER_MODEL = 'fixture.User'
+# Usernames, emails and phone numbers all log in; see fixture.backends.
+AUTHENTICATION_BACKENDS = ['fixture.backends.IdentifierBackend']
 # Static files (CSS, JavaScript, Images)
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
@@ -121,7 +305,9 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-import os
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Files only views may hand out, after their permission checks: never under
+# MEDIA_ROOT, which is served to anyone at MEDIA_URL.
+PRIVATE_MEDIA_ROOT = os.environ.get('FIXTURE_PRIVATE_ROOT', os.path.join(BASE_DIR, 'private'))
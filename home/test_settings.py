@@ -0,0 +1,14 @@
+"""
+Settings for test runs. `manage.py test` uses them unless DJANGO_SETTINGS_MODULE
+says otherwise; other runners name them, e.g. DJANGO_SETTINGS_MODULE=home.test_settings
+pytest. Everything else comes from home.settings and its FIXTURE_* variables.
+"""
+import os
+
+from .settings import *  # noqa: F401,F403
+from .settings import password_hashers
+
+# Salted MD5: thousands of users are created at full scrypt cost otherwise.
+# FIXTURE_PASSWORDS still picks another profile for the run.
+PASSWORD_PROFILE = os.environ.get('FIXTURE_PASSWORDS', 'fast')
+PASSWORD_HASHERS = password_hashers(PASSWORD_PROFILE)
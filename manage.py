@@ -6,7 +6,8 @@ import sys
 
 def main():
     """Run administrative tasks."""
-    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'home.settings')
+    # The test runner gets the test overrides; see home/test_settings.py.
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'home.test_settings' if sys.argv[1:2] == ['test'] else 'home.settings')
     try:
         from django.core.management import execute_from_command_line
     except ImportError as exc: